@@ -0,0 +1,333 @@
+"""JSON HTTP API over the analysis and prediction functions, for clients that only want numbers.
+
+Usage:
+    python api.py --port 8080 --workers 4
+    python api.py --csv-dir fixtures   # offline: bars from <dir>/<TICKER>.csv, no fundamentals
+    python api.py --csv-dir fixtures --store-dir /tmp/offline-store
+
+Endpoints (all GET):
+    /indicators/<TICKER>?period=2y       Close, MA20, MA50 and RSI per bar
+    /forecast/<TICKER>?period=2y         Prophet forecast (ds, yhat, yhat_lower, yhat_upper)
+    /linear/<TICKER>?period=5y&days=365  Linear-trend fit and future predictions
+    /valuation?tickers=AAPL,MSFT         Fair-value and valuation signals
+    /health                              Cache and worker-pool counters
+
+Every response carries an ETag derived from the input data hash and the request
+parameters. A matching If-None-Match returns 304 before anything is computed,
+and rendered bodies are kept in a bounded LRU keyed by the same tag. Prophet
+fits run on a bounded worker pool; identical concurrent requests share one fit
+and requests beyond ``max_pending`` queued fits get 503 with Retry-After.
+"""
+import argparse
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+import fundamentals
+from forecast_cache import ForecastCache, series_hash
+from history_store import PERIODS, CSVProvider, HistoryStore, get_default_store
+from model_registry import ModelRegistry
+from regression import date_ordinals, fit_trends, predict_trends
+from stock_analysis import FORECAST_SETTINGS, calculate_technical_indicators, predict_stock_price
+from warm_start import WarmStartStore
+
+
+class ApiError(Exception):
+    """Error with an HTTP status, reported to the client as a JSON body"""
+
+    def __init__(self, status, message, headers=None):
+        super().__init__(message)
+        self.status = status
+        self.headers = headers or {}
+
+
+def _etag(*parts):
+    digest = hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+    return f'"{digest[:32]}"'
+
+
+def _records(df):
+    return json.loads(df.to_json(orient='records', date_format='iso'))
+
+
+class ApiService:
+    """Routing, ETags, response caching and the fit pool, independent of the HTTP server.
+
+    ``store``, ``fundamentals_cache``, ``forecast_cache``, ``registry`` and
+    ``warm_starts`` default to the process-wide instances; ``offline_service``
+    builds them all over CSV files and one scratch directory.
+    """
+
+    def __init__(self, store=None, fundamentals_cache=None, forecast_cache=None, registry=None, warm_starts=None,
+                 workers=2, max_pending=16, max_responses=256):
+        self.store = store if store is not None else get_default_store()
+        self.fundamentals = fundamentals_cache if fundamentals_cache is not None else fundamentals.get_default_cache()
+        self.forecast_cache = forecast_cache
+        self.registry = registry
+        self.warm_starts = warm_starts
+        self.max_pending = max_pending
+        self.max_responses = max_responses
+        self.requests = 0
+        self.not_modified = 0
+        self.cached = 0
+        self.computed = 0
+        self.rejected = 0
+        self._responses = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._fits = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='api-fit')
+        self._routes = {
+            'indicators': self._indicators,
+            'forecast': self._forecast,
+            'linear': self._linear,
+            'valuation': self._valuation,
+            'health': self._health,
+        }
+
+    def handle(self, path, if_none_match=None):
+        """Return (status, headers, body bytes) for a GET of ``path``"""
+        with self._lock:
+            self.requests += 1
+        url = urlsplit(path)
+        parts = [part for part in url.path.split('/') if part]
+        query = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        try:
+            if not parts or parts[0] not in self._routes or len(parts) > 2:
+                raise ApiError(404, f"Unknown endpoint: {url.path}")
+            route = self._routes[parts[0]]
+            if parts[0] == 'health':
+                return 200, {'Cache-Control': 'no-store'}, self._json(route())
+
+            etag, compute, slow = route(parts[1] if len(parts) > 1 else None, query)
+            headers = {'ETag': etag, 'Cache-Control': 'no-cache'}
+            if if_none_match and etag in [tag.strip() for tag in if_none_match.split(',')]:
+                with self._lock:
+                    self.not_modified += 1
+                return 304, headers, b''
+            return 200, headers, self._body(etag, compute, slow)
+        except ApiError as e:
+            return e.status, e.headers, self._json({'error': str(e)})
+        except ValueError as e:
+            return 400, {}, self._json({'error': str(e)})
+        except Exception as e:
+            return 500, {}, self._json({'error': f"{type(e).__name__}: {e}"})
+
+    def close(self):
+        self._fits.shutdown(wait=False, cancel_futures=True)
+
+    def _json(self, payload):
+        return json.dumps(payload, default=str).encode()
+
+    def _body(self, etag, compute, slow):
+        """Serve from the response cache, or compute (on the fit pool when ``slow``)"""
+        with self._lock:
+            if etag in self._responses:
+                self._responses.move_to_end(etag)
+                self.cached += 1
+                return self._responses[etag]
+            future = self._inflight.get(etag)
+            submitted = False
+            if future is None and slow:
+                if len(self._inflight) >= self.max_pending:
+                    self.rejected += 1
+                    raise ApiError(503, "Too many pending model fits", {'Retry-After': '5'})
+                future = self._fits.submit(lambda: self._json(compute()))
+                self._inflight[etag] = future
+                submitted = True
+
+        if submitted:
+            # Registered outside the lock: a job that has already finished runs the
+            # callback right here, and _finish takes the lock itself
+            future.add_done_callback(lambda f: self._finish(etag, f))
+        if future is not None:
+            return future.result()
+        body = self._json(compute())
+        self._store(etag, body)
+        return body
+
+    def _finish(self, etag, future):
+        with self._lock:
+            self._inflight.pop(etag, None)
+        if future.exception() is None:
+            self._store(etag, future.result())
+
+    def _store(self, etag, body):
+        with self._lock:
+            self.computed += 1
+            self._responses[etag] = body
+            self._responses.move_to_end(etag)
+            while len(self._responses) > self.max_responses:
+                self._responses.popitem(last=False)
+
+    def _history(self, ticker, query, default_period='2y'):
+        if not ticker:
+            raise ApiError(404, "Missing ticker")
+        period = query.get('period', default_period)
+        if period not in PERIODS:
+            raise ValueError(f"Unsupported period: {period}")
+        df = self.store.history(ticker, period=period)
+        if df.empty:
+            raise ApiError(404, f"No data found for ticker {ticker.upper()}.")
+        return ticker.upper(), period, df
+
+    # Routes return (etag, compute, slow); compute returns a JSON-serializable payload
+
+    def _indicators(self, ticker, query):
+        ticker, period, df = self._history(ticker, query)
+        data_hash = series_hash(df['Close'])
+
+        def compute():
+            out = calculate_technical_indicators(df.copy())[['Close', 'MA20', 'MA50', 'RSI']]
+            return {'ticker': ticker, 'period': period, 'rows': _records(out.reset_index())}
+        return _etag('indicators', ticker, period, data_hash), compute, False
+
+    def _forecast(self, ticker, query):
+        ticker, period, df = self._history(ticker, query)
+        data_hash = series_hash(df['Close'])
+
+        def compute():
+            forecast = predict_stock_price(df, ticker, period, cache=self.forecast_cache,
+                                           registry=self.registry, warm_starts=self.warm_starts)
+            rows = _records(forecast[['ds', 'yhat', 'yhat_lower', 'yhat_upper']])
+            return {'ticker': ticker, 'period': period, 'rows': rows}
+        return _etag('forecast', ticker, period, FORECAST_SETTINGS, data_hash), compute, True
+
+    def _linear(self, ticker, query):
+        ticker, period, df = self._history(ticker, query, default_period='5y')
+        days = int(query.get('days', 365))
+        if not 1 <= days <= 3650:
+            raise ValueError("days must be between 1 and 3650")
+        data_hash = series_hash(df['Close'])
+
+        def compute():
+            # Same least-squares trend as prediction.train_model, solved in closed form
+            x = date_ordinals(df.index)
+            fit = fit_trends(x, df['Close'].to_numpy(dtype='float64'))
+            future_dates = pd.date_range(df.index[-1].tz_localize(None).normalize(), periods=days, freq='D')
+            future = predict_trends(fit, date_ordinals(future_dates))[0]
+            return {
+                'ticker': ticker,
+                'period': period,
+                'coef': float(fit.coef[0]),
+                'intercept': float(fit.intercept[0]),
+                'last_close': float(df['Close'].iloc[-1]),
+                'predictions': [{'Date': ts.isoformat(), 'Predicted': float(v)}
+                                for ts, v in zip(future_dates, future)],
+            }
+        return _etag('linear', ticker, period, days, data_hash), compute, False
+
+    def _valuation(self, _, query):
+        tickers = [t.strip().upper() for t in query.get('tickers', '').split(',') if t.strip()]
+        if not tickers:
+            raise ValueError("tickers is required, e.g. ?tickers=AAPL,MSFT")
+        infos = {ticker: self.fundamentals.info(ticker) for ticker in tickers}
+        prices = {}
+        for ticker in tickers:
+            df = self.store.history(ticker, period='5d')
+            prices[ticker] = float(df['Close'].iloc[-1]) if not df.empty else np.nan
+
+        def compute():
+            frame = fundamentals.fair_value_signals(infos, prices).join(
+                fundamentals.evaluate_signals(infos, prices)['Valuation'])
+            frame.index.name = 'Ticker'
+            return {'rows': _records(frame.reset_index())}
+        fields = ['forwardPE', 'forwardEps', 'fiftyTwoWeekHigh']
+        basis = {t: [infos[t].get(field) for field in fields] + [prices[t]] for t in tickers}
+        return _etag('valuation', basis), compute, False
+
+    def _health(self):
+        with self._lock:
+            return {
+                'requests': self.requests,
+                'not_modified': self.not_modified,
+                'cached': self.cached,
+                'computed': self.computed,
+                'rejected': self.rejected,
+                'pending_fits': len(self._inflight),
+                'cached_responses': len(self._responses),
+            }
+
+
+def make_handler(service):
+    """Build a request handler class bound to ``service``"""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            status, headers, body = service.handle(self.path, self.headers.get('If-None-Match'))
+            self.send_response(status)
+            if status != 304:
+                self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(body)))
+            for name, value in headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    return Handler
+
+
+def offline_service(csv_dir, root=None, **kwargs):
+    """ApiService that never touches the network or the live ``data/`` stores.
+
+    Bars come from ``<csv_dir>/<TICKER>.csv``, fundamentals are empty (so
+    valuations report N/A), and the history, forecast, model and warm-start
+    stores all live under ``root`` (a fresh temporary directory by default).
+    """
+    root = root or tempfile.mkdtemp(prefix='api-offline-')
+    return ApiService(
+        store=HistoryStore(os.path.join(root, 'history'), provider=CSVProvider(csv_dir)),
+        fundamentals_cache=fundamentals.FundamentalsCache(os.path.join(root, 'fundamentals'),
+                                                          fetcher=lambda ticker: {}),
+        forecast_cache=ForecastCache(os.path.join(root, 'forecasts')),
+        registry=ModelRegistry(os.path.join(root, 'models')),
+        warm_starts=WarmStartStore(os.path.join(root, 'warm_start')),
+        **kwargs)
+
+
+def serve(service, host='127.0.0.1', port=8080):
+    """Create (but do not start) a threaded HTTP server for ``service``"""
+    return ThreadingHTTPServer((host, port), make_handler(service))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the stock analysis functions as a JSON API")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--workers', type=int, default=2, help="Concurrent Prophet fits")
+    parser.add_argument('--max-pending', type=int, default=16, help="Queued fits before returning 503")
+    parser.add_argument('--csv-dir', default=None, help="Serve bars from <dir>/<TICKER>.csv instead of yfinance")
+    parser.add_argument('--store-dir', default=None,
+                        help="Scratch directory for every --csv-dir store (default: a fresh temporary directory)")
+    args = parser.parse_args()
+
+    if args.csv_dir:
+        service = offline_service(args.csv_dir, args.store_dir, workers=args.workers, max_pending=args.max_pending)
+    else:
+        service = ApiService(workers=args.workers, max_pending=args.max_pending)
+    server = serve(service, args.host, args.port)
+    print(f"Serving on http://{args.host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+
+
+if __name__ == "__main__":
+    main()
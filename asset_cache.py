@@ -0,0 +1,112 @@
+import os
+import threading
+from collections import OrderedDict
+
+from PIL import Image, ImageFont
+
+# Decoded pixels kept in memory before the least recently used assets are dropped
+DEFAULT_MAX_BYTES = int(os.environ.get("IMAGE_ASSET_MAX_BYTES", 128 * 1024 * 1024))
+
+
+def _mtime(path):
+    """Modification time of ``path``, or 0 for names PIL resolves itself (e.g. a system font)"""
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return 0
+
+
+def _image_bytes(img):
+    return img.width * img.height * len(img.getbands())
+
+
+class AssetCache:
+    """Bounded LRU of decoded frames, logos and fonts shared by every Streamlit session.
+
+    Entries are keyed by (path, mtime, size, mode), so editing an asset on disk
+    is picked up on the next lookup. The full-size decode is cached on its own
+    and each resized variant is derived from it, so a new target size costs a
+    resize but never another decode. Assets larger than ``max_bytes`` are
+    returned without being cached. Returned images are shared: paste from
+    them, never draw on them.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._assets = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def image(self, path, size=None, mode='RGBA'):
+        """Return ``path`` decoded, converted to ``mode`` and resized to ``size`` (width, height) if given"""
+        key = ('image', os.path.abspath(path), _mtime(path), tuple(size) if size else None, mode)
+        img = self._get(key)
+        if img is None:
+            if size:
+                img = self.image(path, None, mode).resize(tuple(size))
+            else:
+                with Image.open(path) as source:
+                    img = source.convert(mode)
+            self._put(key, img, _image_bytes(img))
+        return img
+
+    def font(self, path, size):
+        """Return the TrueType font at ``path`` loaded at ``size`` points"""
+        key = ('font', path, _mtime(path), size, None)
+        font = self._get(key)
+        if font is None:
+            font = ImageFont.truetype(path, size)
+            self._put(key, font, os.path.getsize(path) if os.path.exists(path) else 0)
+        return font
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._assets),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._assets.clear()
+            self._bytes = 0
+
+    def _get(self, key):
+        with self._lock:
+            if key in self._assets:
+                self._assets.move_to_end(key)
+                self.hits += 1
+                return self._assets[key][0]
+            self.misses += 1
+            return None
+
+    def _put(self, key, asset, size):
+        # An asset bigger than the whole budget (e.g. a frame resized for a full-resolution
+        # render) would only flush everything else
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._assets:
+                return
+            self._assets[key] = (asset, size)
+            self._bytes += size
+            while self._assets and self._bytes > self.max_bytes:
+                _, (_, old) = self._assets.popitem(last=False)
+                self._bytes -= old
+
+
+_default_cache = None
+
+
+def get_default_cache():
+    """Return the process-wide asset cache shared by Streamlit sessions"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = AssetCache()
+    return _default_cache
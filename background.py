@@ -0,0 +1,103 @@
+import threading
+import time
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+
+import forecasters
+from stock_analysis import calculate_technical_indicators, get_stock_data
+import tracing
+
+# Shared by every Streamlit session; fits queue here instead of blocking the script thread
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix='analysis')
+
+
+class AnalysisJob:
+    """History fetch followed by a forecast fit for one (ticker, period), run off the script thread.
+
+    ``history`` resolves to ``(stock, df)`` with indicators; the forecast fit is
+    queued as soon as the history is ready, so it overlaps with chart rendering.
+    ``cancel`` drops queued work and marks the job superseded; a Prophet fit that
+    is already inside the Stan optimizer cannot be interrupted and simply runs to
+    completion (its result still lands in the forecast cache).
+    """
+
+    def __init__(self, ticker, period, settings=None):
+        self.ticker = ticker
+        self.period = period
+        self.settings = settings
+        # Stages run on the executor threads report into the job's trace
+        self.trace = tracing.Trace('stock-analyzer', ticker=ticker, period=period,
+                                   engine=(settings or {}).get('engine', 'prophet'))
+        self.started = time.perf_counter()
+        self.forecast_started = None
+        self.forecast_finished = None
+        self.forecast = None
+        self._cancelled = threading.Event()
+        self._forecast_ready = threading.Event()
+        self.history = _executor.submit(self._load)
+
+    def matches(self, ticker, period, settings=None):
+        return (self.ticker == ticker and self.period == period and self.settings == settings
+                and not self.cancelled)
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def cancel(self):
+        self._cancelled.set()
+        self.history.cancel()
+        if self.forecast is not None:
+            self.forecast.cancel()
+
+    def wait_forecast(self, timeout=None):
+        """Block until the forecast future exists, then return it"""
+        self._forecast_ready.wait(timeout)
+        return self.forecast
+
+    def forecast_elapsed(self):
+        started = self.forecast_started or self.started
+        return (self.forecast_finished or time.perf_counter()) - started
+
+    def _load(self):
+        try:
+            if self.cancelled:
+                raise CancelledError()
+            with self.trace.span('fetch', ticker=self.ticker) as tags:
+                stock, df = get_stock_data(self.ticker, period=self.period)
+                tags['rows'] = len(df)
+            with self.trace.span('indicators', rows=len(df)):
+                df = calculate_technical_indicators(df)
+            if not self.cancelled:
+                self.forecast_started = time.perf_counter()
+                self.forecast = _executor.submit(self._fit, df.copy())
+            return stock, df
+        finally:
+            self._forecast_ready.set()
+
+    def _fit(self, df):
+        try:
+            if self.cancelled:
+                raise CancelledError()
+            with self.trace.span('forecast', rows=len(df)):
+                return forecasters.forecast(df, self.settings, self.ticker, self.period)
+        finally:
+            self.forecast_finished = time.perf_counter()
+
+
+def start_analysis(state, ticker, period, settings=None):
+    """Return the session's job for (ticker, period, settings), cancelling any job for a different one"""
+    job = state.get('analysis_job')
+    if job is not None and job.matches(ticker, period, settings) and not job.history.done():
+        return job
+    cancel_stale(state, None, None)
+    job = AnalysisJob(ticker, period, settings)
+    state['analysis_job'] = job
+    return job
+
+
+def cancel_stale(state, ticker, period, settings=None):
+    """Cancel the session's in-flight job if it was started for a different ticker, period or settings"""
+    job = state.get('analysis_job')
+    if job is not None and not job.matches(ticker, period, settings):
+        job.cancel()
+        del state['analysis_job']
@@ -0,0 +1,214 @@
+"""Walk-forward backtest of the linear-trend and Prophet predictors.
+
+Usage:
+    python backtest.py --csv fixtures/AAPL.csv --train-window 500 --step 5 --horizons 1 5 20
+    python backtest.py --ticker AAPL --period 5y --models linear prophet --workers 8
+
+Each fold trains on ``train_window`` bars and predicts ``horizons`` bars past the
+end of the window; the window then advances by ``step`` bars. Prophet folds run
+in a process pool and are cached on disk by the content of their training
+slice, so adding data or folds only fits the folds that are new.
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from forecast_cache import series_hash
+from regression import date_ordinals, fit_trends, rolling_windows
+
+# Root directory for cached fold predictions
+DEFAULT_ROOT = os.environ.get("STOCK_BACKTEST_DIR", os.path.join("data", "backtest"))
+
+# Prophet settings for backtest folds; only point forecasts are scored, so skip uncertainty sampling
+PROPHET_SETTINGS = {
+    'daily_seasonality': True,
+    'weekly_seasonality': True,
+    'uncertainty_samples': 0,
+}
+
+MODELS = ['linear', 'prophet']
+
+
+def make_folds(n_bars, train_window, step, horizons):
+    """Return the start index of every fold that has all horizons inside the data"""
+    last_start = n_bars - train_window - max(horizons)
+    if last_start < 0:
+        raise ValueError("Not enough data for the requested train window and horizons.")
+    return list(range(0, last_start + 1, step))
+
+
+def linear_predictions(ds, y, folds, train_window, horizons):
+    """Fit the linear trend for every fold at once; returns (n_folds, n_horizons) predictions"""
+    x = date_ordinals(ds).astype('float64')
+    xs, ys = rolling_windows(x, y, train_window)
+    fit = fit_trends(xs[folds], ys[folds])
+    targets = np.array([[x[start + train_window - 1 + h] for h in horizons] for start in folds])
+    return fit.intercept[:, None] + fit.coef[:, None] * targets
+
+
+def prophet_fold(train_ds, train_y, target_ds, settings):
+    """Fit Prophet on one training slice and predict the target dates (runs in a worker)"""
+    from prophet import Prophet
+
+    logging.getLogger('cmdstanpy').disabled = True
+    logging.getLogger('prophet').disabled = True
+    model = Prophet(**settings)
+    model.fit(pd.DataFrame({'ds': train_ds, 'y': train_y}))
+    forecast = model.predict(pd.DataFrame({'ds': target_ds}))
+    return forecast['yhat'].tolist()
+
+
+class FoldCache:
+    """JSON file per fold, keyed by model, settings, training slice and target dates"""
+
+    def __init__(self, root=DEFAULT_ROOT):
+        self.root = root
+
+    def key(self, model, settings, train, target_ds):
+        payload = json.dumps({
+            'model': model,
+            'settings': settings,
+            'train': series_hash(train),
+            'targets': [str(ts) for ts in target_ds],
+        }, sort_keys=True)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key):
+        try:
+            with open(os.path.join(self.root, f"{key}.json")) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def put(self, key, value):
+        os.makedirs(self.root, exist_ok=True)
+        path = os.path.join(self.root, f"{key}.json")
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(value, f)
+        os.replace(tmp, path)
+
+
+def prophet_predictions(ds, y, folds, train_window, horizons, workers=None, cache=None, settings=PROPHET_SETTINGS):
+    """Prophet predictions for every fold, fitting only folds missing from the cache"""
+    cache = cache if cache is not None else FoldCache()
+    ds = pd.DatetimeIndex(ds)
+    if ds.tz is not None:
+        ds = ds.tz_localize(None)
+
+    out = np.empty((len(folds), len(horizons)))
+    pending = {}
+    for i, start in enumerate(folds):
+        end = start + train_window
+        train = pd.Series(y[start:end], index=ds[start:end])
+        target_ds = ds[[end - 1 + h for h in horizons]]
+        key = cache.key('prophet', settings, train, target_ds)
+        cached = cache.get(key)
+        if cached is not None:
+            out[i] = cached
+        else:
+            pending[i] = (key, train, target_ds)
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as executor:
+            futures = {
+                i: executor.submit(prophet_fold, train.index.to_numpy(), train.to_numpy(), target_ds.to_numpy(), settings)
+                for i, (key, train, target_ds) in pending.items()
+            }
+            for i, future in futures.items():
+                out[i] = future.result()
+                cache.put(pending[i][0], out[i].tolist())
+    return out, len(pending)
+
+
+def score(predictions, y, folds, train_window, horizons):
+    """MAE, MAPE and directional accuracy per horizon for one model's (n_folds, n_horizons) predictions"""
+    rows = []
+    for j, h in enumerate(horizons):
+        last = np.array([y[start + train_window - 1] for start in folds])
+        actual = np.array([y[start + train_window - 1 + h] for start in folds])
+        pred = predictions[:, j]
+        error = pred - actual
+        rows.append({
+            'horizon': h,
+            'folds': len(folds),
+            'MAE': float(np.mean(np.abs(error))),
+            'MAPE': float(np.mean(np.abs(error / actual)) * 100),
+            'Directional Accuracy': float(np.mean(np.sign(pred - last) == np.sign(actual - last)) * 100),
+        })
+    return rows
+
+
+def read_history_csv(path):
+    """Read a CSV with Date and Close columns into a frame indexed by UTC bar time.
+
+    yfinance exports carry the exchange's UTC offset, which changes with DST, so
+    the dates only parse to one DatetimeIndex once they are converted to UTC.
+    """
+    df = pd.read_csv(path)
+    if 'Date' not in df.columns:
+        raise ValueError(f"{path} has no Date column")
+    df['Date'] = pd.to_datetime(df['Date'], utc=True)
+    return df.set_index('Date').sort_index()
+
+
+def walk_forward(df, train_window=500, step=5, horizons=(1, 5, 20), models=MODELS, workers=None, cache=None):
+    """Run the walk-forward backtest on a history frame with a Close column and a DatetimeIndex.
+
+    Returns a DataFrame with one row per (model, horizon).
+    """
+    if not isinstance(df.index, pd.DatetimeIndex):
+        raise ValueError(f"walk_forward needs a DatetimeIndex of bar dates, got {type(df.index).__name__}")
+    horizons = list(horizons)
+    ds = df.index
+    y = df['Close'].to_numpy(dtype='float64')
+    folds = make_folds(len(y), train_window, step, horizons)
+
+    rows = []
+    for model in models:
+        if model == 'linear':
+            predictions = linear_predictions(ds, y, folds, train_window, horizons)
+        elif model == 'prophet':
+            predictions, fitted = prophet_predictions(ds, y, folds, train_window, horizons, workers, cache)
+            logging.getLogger(__name__).info("prophet: fitted %d of %d folds", fitted, len(folds))
+        else:
+            raise ValueError(f"Unknown model: {model}")
+        rows += [dict(model=model, **row) for row in score(predictions, y, folds, train_window, horizons)]
+    return pd.DataFrame(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Walk-forward backtest of the stock predictors")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--csv', help="CSV file with Date and Close columns")
+    source.add_argument('--ticker', help="Ticker to read through the local history store")
+    parser.add_argument('--period', default='5y')
+    parser.add_argument('--train-window', type=int, default=500)
+    parser.add_argument('--step', type=int, default=5)
+    parser.add_argument('--horizons', type=int, nargs='+', default=[1, 5, 20])
+    parser.add_argument('--models', nargs='+', default=MODELS, choices=MODELS)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--out', default=None, help="Optional JSON file for the results")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    if args.csv:
+        df = read_history_csv(args.csv)
+    else:
+        from history_store import get_default_store
+        df = get_default_store().history(args.ticker, period=args.period)
+
+    results = walk_forward(df, args.train_window, args.step, args.horizons, args.models, args.workers)
+    print(results.to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+    if args.out:
+        results.to_json(args.out, orient='records', indent=2)
+
+
+if __name__ == "__main__":
+    main()
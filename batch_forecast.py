@@ -0,0 +1,192 @@
+"""Nightly watchlist job: indicators, Prophet forecast and fair-value signal for every ticker.
+
+Usage:
+    python batch_forecast.py watchlist.txt --period 2y --workers 8
+
+Results are written to ``<results-dir>/<period>/<TICKER>/`` where stock-analyzer.py
+picks them up instead of computing the analysis live.
+"""
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+import fundamentals
+from stock_analysis import (
+    calculate_fair_value,
+    calculate_technical_indicators,
+    get_stock_data,
+    predict_stock_price,
+)
+
+# Root directory for batch results read by the Streamlit UI
+DEFAULT_RESULTS_DIR = os.environ.get("STOCK_RESULTS_DIR", os.path.join("data", "results"))
+
+# Batch results older than this are ignored by the UI (the nightly job has stopped running)
+DEFAULT_MAX_AGE = pd.Timedelta(hours=float(os.environ.get("STOCK_RESULTS_MAX_AGE_HOURS", 36)))
+
+
+def read_watchlist(path):
+    """Read tickers from a file, one per line or comma separated; '#' starts a comment"""
+    with open(path) as f:
+        return parse_watchlist(f.read())
+
+
+def parse_watchlist(text):
+    """Parse watchlist text into a de-duplicated list of upper-case tickers"""
+    tickers = []
+    for line in text.splitlines():
+        line = line.split('#', 1)[0]
+        for ticker in line.replace(',', ' ').split():
+            ticker = ticker.strip().upper()
+            if ticker and ticker not in tickers:
+                tickers.append(ticker)
+    return tickers
+
+
+def results_path(ticker, period, results_dir=DEFAULT_RESULTS_DIR):
+    return os.path.join(results_dir, period, ticker.upper())
+
+
+def analyze_ticker(ticker, period='2y', results_dir=DEFAULT_RESULTS_DIR):
+    """Run the full analysis for one ticker and write its results; never raises"""
+    started = time.perf_counter()
+    summary = {'ticker': ticker, 'period': period}
+    try:
+        stock, df = get_stock_data(ticker, period=period)
+        if df.empty:
+            raise ValueError(f"No data found for ticker {ticker}.")
+        df = calculate_technical_indicators(df)
+        forecast = predict_stock_price(df, ticker, period)
+        fair_value, signal = calculate_fair_value(stock, df)
+
+        path = results_path(ticker, period, results_dir)
+        os.makedirs(path, exist_ok=True)
+        _replace(os.path.join(path, 'indicators.pkl'), df.to_pickle)
+        _replace(os.path.join(path, 'forecast.pkl'), forecast.to_pickle)
+        summary.update({
+            'status': 'ok',
+            'rows': len(df),
+            'last_date': df.index[-1].isoformat(),
+            'last_close': float(df['Close'].iloc[-1]),
+            'rsi': None if pd.isna(df['RSI'].iloc[-1]) else float(df['RSI'].iloc[-1]),
+            'fair_value': fair_value,
+            'signal': signal,
+        })
+    except Exception as e:
+        summary.update({'status': 'error', 'error': f"{type(e).__name__}: {e}"})
+
+    summary['seconds'] = time.perf_counter() - started
+    summary['generated_at'] = pd.Timestamp.now(tz='UTC').isoformat()
+    if summary['status'] == 'ok':
+        # Written last: load_results only trusts a directory once its summary is in place
+        _replace(os.path.join(results_path(ticker, period, results_dir), 'summary.json'),
+                 lambda tmp: _dump_json(summary, tmp))
+    return summary
+
+
+def _replace(path, write):
+    """Call ``write(tmp)`` on a per-process temp file and rename it over ``path``, so readers never see a partial file"""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    try:
+        write(tmp)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+def _dump_json(payload, path):
+    with open(path, 'w') as f:
+        json.dump(payload, f)
+
+
+def load_results(ticker, period, results_dir=DEFAULT_RESULTS_DIR, max_age=DEFAULT_MAX_AGE, last_bar=None,
+                 now=None):
+    """Return (indicators, forecast, summary) written by the batch job, or None if absent or stale.
+
+    Results are stale once they are older than ``max_age`` or when ``last_bar``
+    (e.g. the history store's newest bar) is later than the last bar they cover.
+    """
+    path = results_path(ticker, period, results_dir)
+    try:
+        with open(os.path.join(path, 'summary.json')) as f:
+            summary = json.load(f)
+        now = pd.Timestamp.now(tz='UTC') if now is None else pd.Timestamp(now)
+        if now - pd.Timestamp(summary['generated_at']) > pd.Timedelta(max_age):
+            return None
+        if last_bar is not None and pd.Timestamp(last_bar) > pd.Timestamp(summary['last_date']):
+            return None
+        df = pd.read_pickle(os.path.join(path, 'indicators.pkl'))
+        forecast = pd.read_pickle(os.path.join(path, 'forecast.pkl'))
+    except (OSError, ValueError, KeyError):
+        return None
+    return df, forecast, summary
+
+
+def run_batch(tickers, period='2y', workers=None, results_dir=DEFAULT_RESULTS_DIR, log=print):
+    """Analyze ``tickers`` across a process pool and return the run report"""
+    workers = workers or os.cpu_count() or 1
+    started = time.perf_counter()
+    results = []
+
+    # Warm the shared on-disk fundamentals tier with parallel requests before the workers start
+    fundamentals.get_default_cache().prefetch(tickers)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(analyze_ticker, ticker, period, results_dir): ticker for ticker in tickers}
+        for future in as_completed(futures):
+            try:
+                summary = future.result()
+            except Exception as e:
+                # A crashed worker process still must not take the rest of the run down
+                summary = {'ticker': futures[future], 'period': period, 'status': 'error',
+                           'error': f"{type(e).__name__}: {e}"}
+            results.append(summary)
+            if log:
+                status = summary['status'] if summary['status'] == 'ok' else f"error ({summary['error']})"
+                log(f"[{len(results)}/{len(tickers)}] {summary['ticker']}: {status}")
+
+    elapsed = time.perf_counter() - started
+    failed = [r for r in results if r['status'] != 'ok']
+    report = {
+        'period': period,
+        'workers': workers,
+        'tickers': len(tickers),
+        'succeeded': len(results) - len(failed),
+        'failed': len(failed),
+        'seconds': elapsed,
+        'tickers_per_second': len(tickers) / elapsed if elapsed else 0.0,
+        'errors': {r['ticker']: r['error'] for r in failed},
+    }
+    os.makedirs(os.path.join(results_dir, period), exist_ok=True)
+    with open(os.path.join(results_dir, period, 'run.json'), 'w') as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Batch forecast every ticker in a watchlist")
+    parser.add_argument('watchlist', help="File with one ticker per line")
+    parser.add_argument('--period', default='2y', choices=['1mo', '3mo', '6mo', '1y', '2y', '5y'])
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all cores)")
+    parser.add_argument('--results-dir', default=DEFAULT_RESULTS_DIR)
+    args = parser.parse_args()
+
+    tickers = read_watchlist(args.watchlist)
+    report = run_batch(tickers, args.period, args.workers, args.results_dir)
+
+    print("\nBatch Summary")
+    print(f"Tickers: {report['tickers']} ({report['succeeded']} ok, {report['failed']} failed)")
+    print(f"Elapsed: {report['seconds']:.1f}s with {report['workers']} workers")
+    print(f"Throughput: {report['tickers_per_second']:.2f} tickers/sec")
+    for ticker, error in report['errors'].items():
+        print(f"  {ticker}: {error}")
+
+
+if __name__ == "__main__":
+    main()
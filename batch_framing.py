@@ -0,0 +1,206 @@
+"""Bulk product-image framing: frame every photo of a ZIP or folder with its catalog ID and price.
+
+Usage:
+    python batch_framing.py photos.zip catalog.csv --output framed.zip
+    python batch_framing.py photos/ catalog.csv --output framed.zip --workers 8 --format JPEG
+
+The catalog CSV needs ``filename``, ``product_id`` and ``price`` columns. Each
+image runs fix_orientation -> add_frame -> encode on a process pool, and the
+framed results are written into the output ZIP as they complete, so at most a
+few images per worker are ever held in memory. Each framed image keeps its
+path inside the source ZIP, so photos with the same name never overwrite
+each other.
+"""
+import argparse
+import csv
+import io
+import os
+import time
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from PIL import Image, UnidentifiedImageError
+
+from framing import add_frame, fix_orientation
+
+DEFAULT_FRAME_PATH = os.path.join("images", "firm1.png")
+
+IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png')
+
+# Output formats by name: (PIL format, file extension)
+FORMATS = {
+    'PNG': ('PNG', '.png'),
+    'JPEG': ('JPEG', '.jpg'),
+}
+
+
+def read_catalog(source):
+    """Read {filename: (product_id, price)} from a CSV path or text file object"""
+    if isinstance(source, str):
+        with open(source, newline='', encoding='utf-8-sig') as f:
+            return read_catalog(f)
+    reader = csv.DictReader(source)
+    missing = {'filename', 'product_id', 'price'} - set(reader.fieldnames or [])
+    if missing:
+        raise ValueError(f"Catalog is missing columns: {', '.join(sorted(missing))}")
+    return {os.path.basename(row['filename'].strip()): (row['product_id'].strip(), row['price'].strip())
+            for row in reader if row['filename'].strip()}
+
+
+def list_images(source):
+    """Return (name, loader) for every image in a folder path, ZIP path or ZIP file object.
+
+    ``loader()`` returns what ``frame_image`` accepts (a path or the raw bytes),
+    so ZIP members are only read when they are about to be submitted.
+    """
+    if isinstance(source, str) and os.path.isdir(source):
+        names = sorted(n for n in os.listdir(source) if n.lower().endswith(IMAGE_EXTENSIONS))
+        return [(name, lambda path=os.path.join(source, name): path) for name in names]
+
+    archive = zipfile.ZipFile(source)
+    members = sorted(
+        (info for info in archive.infolist()
+         if not info.is_dir() and info.filename.lower().endswith(IMAGE_EXTENSIONS)
+         and not os.path.basename(info.filename).startswith('.')),
+        key=lambda info: info.filename,
+    )
+    return [(info.filename, lambda info=info: archive.read(info)) for info in members]
+
+
+def output_names(names, extension):
+    """Map each input name to a unique output name: its relative path with ``extension``.
+
+    ZIP members in different folders, or photos differing only in extension,
+    would otherwise overwrite each other; clashes (ignoring case, as most
+    file systems do on extraction) get -2, -3, ... in input order.
+    """
+    used = set()
+    outputs = {}
+    for name in names:
+        stem = os.path.splitext(name)[0]
+        output = stem + extension
+        counter = 1
+        while output.lower() in used:
+            counter += 1
+            output = f"{stem}-{counter}{extension}"
+        used.add(output.lower())
+        outputs[name] = output
+    return outputs
+
+
+def frame_image(name, data, product_id, price, frame_path=DEFAULT_FRAME_PATH, fmt='PNG'):
+    """Frame one image (a path or raw bytes) and encode it; returns a result dict and never raises"""
+    started = time.perf_counter()
+    pil_format, extension = FORMATS[fmt]
+    result = {'name': name, 'output': os.path.splitext(name)[0] + extension, 'data': None, 'error': None}
+    try:
+        with Image.open(data if isinstance(data, str) else io.BytesIO(data)) as img:
+            img = fix_orientation(img)
+            # add_frame pastes an RGBA overlay, so palette and greyscale photos are widened first
+            if img.mode not in ('RGB', 'RGBA'):
+                img = img.convert('RGB')
+            framed = add_frame(img, frame_path, product_id, price)
+        if pil_format == 'JPEG' and framed.mode != 'RGB':
+            framed = framed.convert('RGB')
+        buffer = io.BytesIO()
+        framed.save(buffer, format=pil_format)
+        result['data'] = buffer.getvalue()
+    except UnidentifiedImageError:
+        result['error'] = "Not a valid image file"
+    except Exception as e:
+        result['error'] = f"{type(e).__name__}: {e}"
+    result['seconds'] = time.perf_counter() - started
+    return result
+
+
+def run_batch(source, catalog, output, frame_path=DEFAULT_FRAME_PATH, fmt='PNG', workers=None, on_result=None):
+    """Frame every image of ``source`` into the ZIP ``output`` (a path or binary file object).
+
+    ``catalog`` maps file names to (product_id, price); images without an entry
+    are reported as errors. ``on_result(done, total, result)`` is called as each
+    image finishes. Returns the run report.
+    """
+    workers = workers or os.cpu_count() or 1
+    images = list_images(source)
+    outputs = output_names([name for name, _ in images], FORMATS[fmt][1])
+    started = time.perf_counter()
+    errors = {}
+    done = 0
+
+    def finish(result):
+        nonlocal done
+        done += 1
+        if result['error']:
+            errors[result['name']] = result['error']
+        else:
+            # Framed PNG/JPEG data is already compressed; deflating it again only costs time
+            archive.writestr(outputs[result['name']], result['data'], compress_type=zipfile.ZIP_STORED)
+        if on_result:
+            on_result(done, len(images), result)
+
+    with zipfile.ZipFile(output, 'w') as archive, ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = set()
+        for name, loader in images:
+            details = catalog.get(os.path.basename(name))
+            if details is None:
+                finish({'name': name, 'output': None, 'data': None, 'error': "No catalog entry", 'seconds': 0.0})
+                continue
+            # Bound the in-flight work so inputs and encoded results never pile up in memory
+            while len(pending) >= 2 * workers:
+                completed, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in completed:
+                    finish(_result(future))
+            future = executor.submit(frame_image, name, loader(), *details, frame_path, fmt)
+            future.name = name
+            pending.add(future)
+        for future in wait(pending).done:
+            finish(_result(future))
+
+    elapsed = time.perf_counter() - started
+    return {
+        'images': len(images),
+        'succeeded': len(images) - len(errors),
+        'failed': len(errors),
+        'workers': workers,
+        'seconds': elapsed,
+        'images_per_second': len(images) / elapsed if elapsed else 0.0,
+        'errors': errors,
+    }
+
+
+def _result(future):
+    try:
+        return future.result()
+    except Exception as e:
+        # A crashed worker process still must not take the rest of the run down
+        return {'name': future.name, 'output': None, 'data': None, 'error': f"{type(e).__name__}: {e}",
+                'seconds': 0.0}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Frame every product photo with its catalog ID and price")
+    parser.add_argument('source', help="ZIP file or folder of images")
+    parser.add_argument('catalog', help="CSV with filename, product_id and price columns")
+    parser.add_argument('--output', default='framed_images.zip')
+    parser.add_argument('--frame', default=DEFAULT_FRAME_PATH)
+    parser.add_argument('--format', default='PNG', choices=list(FORMATS))
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all cores)")
+    args = parser.parse_args()
+
+    def on_result(done, total, result):
+        status = 'ok' if result['error'] is None else f"error ({result['error']})"
+        print(f"[{done}/{total}] {result['name']}: {status}")
+
+    report = run_batch(args.source, read_catalog(args.catalog), args.output, args.frame, args.format,
+                       args.workers, on_result)
+
+    print("\nBatch Summary")
+    print(f"Images: {report['images']} ({report['succeeded']} ok, {report['failed']} failed)")
+    print(f"Elapsed: {report['seconds']:.1f}s with {report['workers']} workers")
+    print(f"Throughput: {report['images_per_second']:.2f} images/sec")
+    for name, error in report['errors'].items():
+        print(f"  {name}: {error}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,205 @@
+"""Offline benchmarks for the analysis and prediction hot paths.
+
+Usage:
+    python bench.py run --out bench.json            # full suite
+    python bench.py run --quick --filter indicators # subset, fewer repeats
+    python bench.py compare baseline.json bench.json --threshold 0.2
+
+Every case runs on deterministic synthetic OHLCV data; nothing touches yfinance.
+``compare`` exits with status 1 when any case is slower (or uses more peak memory)
+than the baseline by more than the threshold.
+"""
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+# Synthetic datasets: name -> (bars, frequency)
+DATASETS = {
+    '1y': (252, 'B'),
+    '5y': (1260, 'B'),
+    '20y': (5040, 'B'),
+    'minute': (390 * 252, 'min'),
+}
+
+
+def synthetic_ohlcv(bars, freq='B', seed=0, start='2000-01-03'):
+    """Deterministic geometric random walk with consistent OHLCV columns, indexed like yfinance"""
+    rng = np.random.default_rng(seed)
+    step = 0.01 if freq == 'B' else 0.0005
+    close = 100 * np.exp(np.cumsum(rng.normal(0.0002, step, bars)))
+    open_ = np.r_[close[0], close[:-1]] * (1 + rng.normal(0, step / 4, bars))
+    high = np.maximum(open_, close) * (1 + np.abs(rng.normal(0, step / 2, bars)))
+    low = np.minimum(open_, close) * (1 - np.abs(rng.normal(0, step / 2, bars)))
+    volume = rng.integers(1_000_000, 10_000_000, bars).astype('float64')
+    index = pd.date_range(start, periods=bars, freq=freq, tz='America/New_York', name='Date')
+    return pd.DataFrame({
+        'Open': open_, 'High': high, 'Low': low, 'Close': close,
+        'Volume': volume, 'Dividends': 0.0, 'Stock Splits': 0.0,
+    }, index=index)
+
+
+def measure(fn, repeat):
+    """Return (best wall seconds over ``repeat`` runs, peak traced MB of one run)"""
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - started)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return min(times), peak / 1e6
+
+
+def cases(quick=False, selected=lambda key: True):
+    """Yield (name, dataset, callable, repeat) for every benchmark case.
+
+    Setup too slow to run for nothing (a Prophet fit) is skipped unless
+    ``selected(f"{name}[{dataset}]")`` is true for the case that needs it.
+    """
+    import forecasters
+    import stock_analysis
+    import prediction
+    from crossover import crossover_returns
+    from figures import build_analysis_figure, build_forecast_figure
+
+    from rendering import PlotCache
+
+    repeat = 1 if quick else 5
+    datasets = ['1y', '5y'] if quick else list(DATASETS)
+    prophet_datasets = ['1y'] if quick else ['1y', '5y']
+
+    for name in datasets:
+        df = synthetic_ohlcv(*DATASETS[name])
+        yield 'calculate_technical_indicators', name, lambda df=df: stock_analysis.calculate_technical_indicators(df.copy()), repeat
+
+        data = df.reset_index()
+        data['Date'] = data['Date'].dt.tz_localize(None)
+        yield 'prepare_data', name, lambda data=data: prediction.prepare_data(data.copy()), repeat
+        X, y, dates = prediction.prepare_data(data.copy())
+        yield 'train_model', name, lambda X=X, y=y: prediction.train_model(X, y), repeat
+        yield 'calculate_moving_averages', name, lambda data=data: prediction.calculate_moving_averages(data.copy()), repeat
+        if name != 'minute':
+            yield 'crossover_returns', name, lambda data=data: crossover_returns(data['Close']), repeat
+
+        if DATASETS[name][1] == 'B':
+            model = prediction.train_model(X, y)
+
+            # Caching disabled so every repeat measures a full rasterization
+            def plot(model=model, X=X, y=y, dates=dates):
+                prediction.plot_predictions(model, X, y, dates, cache=PlotCache(max_entries=0))
+            yield 'plot_predictions', name, plot, repeat
+
+        if DATASETS[name][1] == 'B':
+            for engine in forecasters.FORECASTERS:
+                yield f'forecast_{engine}', name, lambda df=df, engine=engine: forecasters.forecast(df, {'engine': engine}), repeat
+
+        indicators = stock_analysis.calculate_technical_indicators(df.copy())
+        yield 'build_analysis_figure', name, lambda d=indicators: build_analysis_figure('BENCH', d).to_json(), repeat
+
+    settings = dict(stock_analysis.FORECAST_SETTINGS, warm_start=False)
+    fast_settings = dict(stock_analysis.FAST_FORECAST_SETTINGS, warm_start=False)
+    for name in prophet_datasets:
+        df = synthetic_ohlcv(*DATASETS[name])
+        yield 'fit_prophet_forecast', name, lambda df=df: stock_analysis.fit_prophet_forecast(df, settings), 1
+        yield 'fit_prophet_forecast_fast', name, lambda df=df: stock_analysis.fit_prophet_forecast(df, fast_settings), 1
+
+    if selected('build_forecast_figure[1y]'):
+        df = synthetic_ohlcv(*DATASETS['1y'])
+        forecast = stock_analysis.fit_prophet_forecast(df, settings)
+        yield 'build_forecast_figure', '1y', lambda: build_forecast_figure('BENCH', df, forecast).to_json(), repeat
+
+
+def run(args):
+    import logging
+    logging.getLogger('cmdstanpy').disabled = True
+    logging.getLogger('prophet').disabled = True
+
+    def selected(key):
+        return not args.filter or args.filter in key
+
+    results = {}
+    for name, dataset, fn, repeat in cases(args.quick, selected):
+        key = f"{name}[{dataset}]"
+        if not selected(key):
+            continue
+        seconds, peak_mb = measure(fn, repeat)
+        results[key] = {'seconds': seconds, 'peak_mb': peak_mb, 'repeat': repeat}
+        print(f"{key:45s} {seconds * 1000:10.2f} ms {peak_mb:10.2f} MB")
+
+    report = {
+        'meta': {
+            'created': pd.Timestamp.now(tz='UTC').isoformat(),
+            'python': sys.version.split()[0],
+            'platform': platform.platform(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+        },
+        'results': results,
+    }
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"\nSaved {len(results)} results to {args.out}")
+
+
+def compare(args):
+    with open(args.baseline) as f:
+        baseline = json.load(f)['results']
+    with open(args.current) as f:
+        current = json.load(f)['results']
+
+    regressions = []
+    for key in sorted(set(baseline) & set(current)):
+        old, new = baseline[key], current[key]
+        time_ratio = new['seconds'] / old['seconds'] if old['seconds'] else 1.0
+        mem_ratio = new['peak_mb'] / old['peak_mb'] if old['peak_mb'] else 1.0
+        flag = ''
+        if time_ratio > 1 + args.threshold or mem_ratio > 1 + args.threshold:
+            flag = 'REGRESSION'
+            regressions.append(key)
+        print(f"{key:45s} time x{time_ratio:5.2f}  mem x{mem_ratio:5.2f}  {flag}")
+
+    for key in sorted(set(baseline) ^ set(current)):
+        print(f"{key:45s} only in {'baseline' if key in baseline else 'current'}")
+
+    print(f"\n{len(regressions)} regression(s) above {args.threshold:.0%}")
+    return 1 if regressions else 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the analysis and prediction hot paths offline")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = sub.add_parser('run', help="Run the benchmark suite")
+    run_parser.add_argument('--out', default='bench.json')
+    run_parser.add_argument('--quick', action='store_true', help="Smaller datasets and a single repeat")
+    run_parser.add_argument('--filter', default=None, help="Only run cases whose name contains this text")
+
+    compare_parser = sub.add_parser('compare', help="Compare two result files")
+    compare_parser.add_argument('baseline')
+    compare_parser.add_argument('current')
+    compare_parser.add_argument('--threshold', type=float, default=0.2,
+                                help="Allowed slowdown or memory growth as a fraction (default 0.2)")
+
+    args = parser.parse_args()
+    if args.command == 'run':
+        run(args)
+    else:
+        sys.exit(compare(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from forecast_cache import series_hash
+
+# Upper bound on candles and line points sent to the browser per trace
+MAX_CANDLES = 500
+MAX_LINE_POINTS = 1000
+
+# Pyramid levels from finest to coarsest, as pandas period frequencies ('Bars' is the raw data)
+LEVELS = [('Bars', None), ('Daily', 'D'), ('Weekly', 'W'), ('Monthly', 'M'), ('Quarterly', 'Q')]
+
+
+def bucket_starts(index, freq):
+    """Return the position of the first bar of every ``freq`` period in a sorted DatetimeIndex"""
+    if freq is None:
+        return np.arange(len(index))
+    naive = index.tz_localize(None) if index.tz is not None else index
+    codes = naive.to_period(freq).asi8
+    return np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+
+
+def aggregate_ohlc(df, starts):
+    """Aggregate OHLCV bars into buckets beginning at ``starts`` (positions into ``df``)"""
+    if len(starts) == len(df):
+        return df[['Open', 'High', 'Low', 'Close']].copy()
+    ends = np.r_[starts[1:], len(df)] - 1
+    data = {
+        'Open': df['Open'].to_numpy()[starts],
+        'High': np.fmax.reduceat(df['High'].to_numpy(), starts),
+        'Low': np.fmin.reduceat(df['Low'].to_numpy(), starts),
+        'Close': df['Close'].to_numpy()[ends],
+    }
+    if 'Volume' in df:
+        data['Volume'] = np.add.reduceat(df['Volume'].to_numpy(), starts)
+    return pd.DataFrame(data, index=df.index[starts])
+
+
+def build_pyramid(df):
+    """Build the raw/Daily/Weekly/Monthly/Quarterly OHLC levels for a history frame"""
+    pyramid = []
+    for name, freq in LEVELS:
+        starts = bucket_starts(df.index, freq)
+        # Daily aggregation of daily bars adds nothing
+        if pyramid and len(starts) == len(pyramid[-1][1]):
+            continue
+        pyramid.append((name, aggregate_ohlc(df, starts)))
+    return pyramid
+
+
+def select_level(pyramid, start=None, end=None, max_points=MAX_CANDLES):
+    """Pick the finest pyramid level that shows [start, end] in at most ``max_points`` candles.
+
+    If even the coarsest level is too dense, its bars are merged into equal N-bar buckets.
+    """
+    for name, level in pyramid:
+        view = level.loc[start:end]
+        if len(view) <= max_points:
+            return name, view
+    step = int(np.ceil(len(view) / max_points))
+    return f"{name} x{step}", aggregate_ohlc(view, np.arange(0, len(view), step))
+
+
+def lttb_indices(x, y, threshold):
+    """Largest-Triangle-Three-Buckets: indices of ``threshold`` points preserving the shape of (x, y)"""
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+    edges = np.linspace(1, n - 1, threshold - 1).astype(int)
+    picked = np.empty(threshold, dtype=int)
+    picked[0] = 0
+    picked[-1] = n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Average of the next bucket (or the last point for the final bucket)
+        nlo, nhi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = x[nlo:nhi].mean()
+        avg_y = y[nlo:nhi].mean()
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        picked[i + 1] = a
+    return picked
+
+
+def downsample_line(series, max_points=MAX_LINE_POINTS):
+    """Drop NaNs and reduce a time series to at most ``max_points`` points with LTTB"""
+    series = series.dropna()
+    if len(series) <= max_points:
+        return series
+    x = series.index.asi8 if isinstance(series.index, pd.DatetimeIndex) else np.arange(len(series))
+    return series.iloc[lttb_indices(x, series.to_numpy(), max_points)]
+
+
+class PyramidCache:
+    """Small LRU of OHLC pyramids keyed by ticker and a hash of the history"""
+
+    def __init__(self, max_entries=16):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, ticker, df):
+        key = (ticker, len(df), series_hash(df['Close']))
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return self._entries[key]
+        pyramid = build_pyramid(df)
+        with self._lock:
+            self._entries[key] = pyramid
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return pyramid
+
+
+_default_cache = PyramidCache()
+
+
+def chart_data(ticker, df, start=None, end=None, max_candles=MAX_CANDLES, max_points=MAX_LINE_POINTS):
+    """Return (level name, candles, {column: downsampled line}) for the indicator chart"""
+    level, candles = select_level(_default_cache.get(ticker, df), start, end, max_candles)
+    view = df.loc[start:end]
+    lines = {c: downsample_line(view[c], max_points) for c in ['MA20', 'MA50', 'RSI'] if c in view}
+    return level, candles, lines
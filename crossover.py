@@ -0,0 +1,53 @@
+import numpy as np
+
+# Slider ranges on the Moving Average Analysis page
+SHORT_WINDOWS = range(5, 51)
+LONG_WINDOWS = range(20, 201)
+
+
+class PrefixSums:
+    """Prefix sums of a price series, so any trailing moving average is one O(T) subtraction.
+
+    Prices are offset by their first value before summing to keep the running
+    totals small and the differences accurate.
+    """
+
+    def __init__(self, close):
+        close = np.asarray(close, dtype='float64')
+        self.offset = close[0] if len(close) else 0.0
+        self.csum = np.concatenate([[0.0], np.cumsum(close - self.offset)])
+        self.n = len(close)
+
+    def moving_average(self, window):
+        """Trailing ``window``-bar mean, NaN for the first ``window - 1`` bars"""
+        out = np.full(self.n, np.nan)
+        if window <= self.n:
+            out[window - 1:] = (self.csum[window:] - self.csum[:-window]) / window + self.offset
+        return out
+
+    def moving_averages(self, windows):
+        """Stack of moving averages for several windows, shape (len(windows), T)"""
+        return np.vstack([self.moving_average(w) for w in windows])
+
+
+def crossover_returns(close, short_windows=SHORT_WINDOWS, long_windows=LONG_WINDOWS, prefix=None):
+    """Total return of a long-only MA crossover strategy for every (short, long) window pair.
+
+    The strategy holds the stock on the bar after the short MA closes above the
+    long MA and is flat otherwise. Returns an array of shape
+    (len(short_windows), len(long_windows)) in percent, NaN where short >= long.
+    """
+    close = np.asarray(close, dtype='float64')
+    prefix = prefix if prefix is not None else PrefixSums(close)
+    short_windows = np.asarray(list(short_windows))
+    long_windows = np.asarray(list(long_windows))
+
+    short_ma = prefix.moving_averages(short_windows)[:, None, :-1]
+    long_ma = prefix.moving_averages(long_windows)[None, :, :-1]
+    # NaN comparisons are False, so there is no position until both MAs exist
+    position = short_ma > long_ma
+
+    log_returns = np.diff(np.log(close))
+    total = np.exp(np.einsum('slt,t->sl', position, log_returns)) - 1
+    total[short_windows[:, None] >= long_windows[None, :]] = np.nan
+    return total * 100
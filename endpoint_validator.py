@@ -0,0 +1,376 @@
+"""Concurrent validation of every host x port x app endpoint in a JSON matrix.
+
+Checks run on a thread pool bounded by ``concurrency``; each (scheme, host,
+port) has its own pool of keep-alive connections and at most ``per_host``
+requests in flight. Every request has separate connect and read timeouts (the
+connect timeout also bounds name resolution) and is retried with exponential
+backoff on connection errors, timeouts and retryable status codes, so a hung
+host or resolver costs at most its timeouts and a full run takes roughly as
+long as the slowest endpoint.
+
+Each result carries the status code, the error class and the DNS, connect
+(TCP and TLS), time-to-first-byte and total latency of its last attempt.
+``ReportWriter`` streams results to a JSON-lines or CSV file as they
+complete; ``summarize`` gives p50/p95/p99 latency per host or app and
+``slo_violations`` checks them against the ``slo`` thresholds of the matrix.
+"""
+import csv
+import http.client
+import json
+import random
+import socket
+import ssl
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+
+import numpy as np
+
+DEFAULT_CONFIG = {
+    'hosts': [],
+    'ports': [80],
+    'apps': [],
+    # Scheme per port (as a string key); ports not listed use 'http'
+    'schemes': {'443': 'https'},
+    'concurrency': 64,
+    'per_host': 8,
+    'connect_timeout': 3.0,
+    'read_timeout': 10.0,
+    'retries': 2,
+    'backoff': 0.5,
+    'expected_status': [200],
+    'retry_status': [429, 502, 503, 504],
+    # Optional thresholds in seconds ('p50', 'p95', 'p99' per host and per app,
+    # 'max' per endpoint) and 'max_failures' as a count of failed endpoints
+    'slo': {},
+}
+
+SLO_KEYS = ['p50', 'p95', 'p99', 'max', 'max_failures']
+
+# Columns of the streamed report, in order
+REPORT_FIELDS = ['url', 'host', 'port', 'app', 'status', 'ok', 'error', 'attempts',
+                 'dns', 'connect', 'ttfb', 'total', 'seconds']
+
+Endpoint = namedtuple('Endpoint', ['scheme', 'host', 'port', 'app'])
+
+
+def endpoint_url(endpoint):
+    return f"{endpoint.scheme}://{endpoint.host}:{endpoint.port}/{endpoint.app}"
+
+
+def load_matrix(path):
+    """Read a JSON matrix file and fill in defaults for every missing setting"""
+    with open(path) as f:
+        config = json.load(f)
+    unknown = set(config) - set(DEFAULT_CONFIG)
+    if unknown:
+        raise ValueError(f"Unknown matrix settings: {', '.join(sorted(unknown))}")
+    unknown = set(config.get('slo', {})) - set(SLO_KEYS)
+    if unknown:
+        raise ValueError(f"Unknown SLO thresholds: {', '.join(sorted(unknown))}")
+    return dict(DEFAULT_CONFIG, **config)
+
+
+def endpoints(config):
+    """Every endpoint of the matrix, interleaved across hosts so one slow host never fills the pool"""
+    schemes = config['schemes']
+    per_host = [
+        [Endpoint(schemes.get(str(port), 'http'), host, port, app) for port in config['ports'] for app in config['apps']]
+        for host in config['hosts']
+    ]
+    ordered = []
+    for i in range(max((len(items) for items in per_host), default=0)):
+        ordered += [items[i] for items in per_host if i < len(items)]
+    return ordered
+
+
+class HostPool:
+    """Keep-alive connections to one (scheme, host, port).
+
+    ``slots`` is a semaphore shared by every port of the same host, so the
+    per-host limit holds across ports.
+    """
+
+    def __init__(self, scheme, host, port, slots, connect_timeout, read_timeout, ssl_context=None):
+        self.scheme = scheme
+        self.host = host
+        self.port = port
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.ssl_context = ssl_context
+        self._slots = slots
+        self._idle = []
+        self._lock = threading.Lock()
+
+    def request(self, path):
+        """GET ``path``; returns (status, reused, timings) and leaves the connection idle or closed.
+
+        ``timings`` holds 'dns', 'connect', 'ttfb' and 'total' in seconds;
+        dns and connect are 0 on a reused connection.
+        """
+        with self._slots:
+            started = time.perf_counter()
+            timings = {'dns': 0.0, 'connect': 0.0}
+            conn, reused = self._checkout(timings)
+            try:
+                response = self._get(conn, path, timings)
+            except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+                conn.close()
+                if not reused:
+                    raise
+                # The server dropped an idle keep-alive connection; that is not the endpoint's fault
+                started = time.perf_counter()
+                conn, reused = self._connect(timings), False
+                try:
+                    response = self._get(conn, path, timings)
+                except BaseException:
+                    conn.close()
+                    raise
+            except BaseException:
+                conn.close()
+                raise
+            if response.will_close:
+                conn.close()
+            else:
+                with self._lock:
+                    self._idle.append(conn)
+            timings['total'] = time.perf_counter() - started
+            return response.status, reused, timings
+
+    def _get(self, conn, path, timings):
+        sent = time.perf_counter()
+        conn.request('GET', path, headers={'Connection': 'keep-alive'})
+        response = conn.getresponse()
+        # Status line and headers are in: close enough to the first byte
+        timings['ttfb'] = time.perf_counter() - sent
+        # Drain the body so the connection can carry the next request
+        response.read()
+        return response
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn in idle:
+            conn.close()
+
+    def _checkout(self, timings):
+        with self._lock:
+            if self._idle:
+                return self._idle.pop(), True
+        return self._connect(timings), False
+
+    def _connect(self, timings):
+        # Resolve and connect separately (http.client does both in one call) to time each step
+        started = time.perf_counter()
+        family, socktype, proto, _, address = _resolve(self.host, self.port, self.connect_timeout)
+        resolved = time.perf_counter()
+        timings['dns'] = resolved - started
+
+        sock = socket.socket(family, socktype, proto)
+        try:
+            sock.settimeout(self.connect_timeout)
+            sock.connect(address)
+            if self.scheme == 'https':
+                context = self.ssl_context or ssl.create_default_context()
+                sock = context.wrap_socket(sock, server_hostname=self.host)
+        except BaseException:
+            sock.close()
+            raise
+        timings['connect'] = time.perf_counter() - resolved
+
+        # The connect timeout only covers the handshake; reads get their own limit
+        sock.settimeout(self.read_timeout)
+        conn = http.client.HTTPConnection(self.host, self.port)
+        conn.sock = sock
+        return conn
+
+
+def _resolve(host, port, timeout):
+    """First getaddrinfo entry for (host, port), failing with a 'dns' error after ``timeout`` seconds.
+
+    getaddrinfo has no timeout of its own, so it runs on a daemon thread: a
+    resolver that never answers costs the check ``timeout`` and cannot hold up
+    interpreter exit.
+    """
+    future = Future()
+
+    def resolve():
+        try:
+            future.set_result(socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)[0])
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=resolve, name='resolve', daemon=True).start()
+    try:
+        return future.result(timeout)
+    except TimeoutError:
+        raise socket.gaierror(socket.EAI_AGAIN, f"Resolving {host} timed out after {timeout}s") from None
+
+
+class Validator:
+    """Run the matrix in ``config`` (see DEFAULT_CONFIG) and report one result dict per endpoint"""
+
+    def __init__(self, config, ssl_context=None, sleep=time.sleep):
+        self.config = dict(DEFAULT_CONFIG, **config)
+        self.ssl_context = ssl_context
+        self.sleep = sleep
+        self._pools = {}
+        self._host_slots = {}
+        self._lock = threading.Lock()
+
+    def run(self, on_result=None):
+        """Check every endpoint; ``on_result(result)`` is called as each one finishes"""
+        results = []
+        try:
+            with ThreadPoolExecutor(max_workers=self.config['concurrency'], thread_name_prefix='validate') as executor:
+                futures = [executor.submit(self.check, endpoint) for endpoint in endpoints(self.config)]
+                for future in as_completed(futures):
+                    result = future.result()
+                    results.append(result)
+                    if on_result:
+                        on_result(result)
+        finally:
+            for pool in self._pools.values():
+                pool.close()
+        return results
+
+    def check(self, endpoint):
+        """Validate one endpoint with retries; never raises"""
+        config = self.config
+        pool = self._pool(endpoint)
+        started = time.perf_counter()
+        status, error = None, None
+        timings = {}
+        attempts = 0
+        while True:
+            attempts += 1
+            try:
+                status, _, timings = pool.request(f"/{endpoint.app}")
+                error = None
+                retryable = status in config['retry_status']
+            except (OSError, http.client.HTTPException) as e:
+                status, error, timings = None, _error_class(e), {}
+                retryable = True
+            if not retryable or attempts > config['retries']:
+                break
+            # Exponential backoff with full jitter
+            self.sleep(random.uniform(0, config['backoff'] * 2 ** (attempts - 1)))
+
+        return {
+            'url': endpoint_url(endpoint),
+            'host': endpoint.host,
+            'port': endpoint.port,
+            'app': endpoint.app,
+            'status': status,
+            'ok': status in config['expected_status'],
+            'error': error,
+            'attempts': attempts,
+            'dns': timings.get('dns'),
+            'connect': timings.get('connect'),
+            'ttfb': timings.get('ttfb'),
+            'total': timings.get('total'),
+            # Wall time of the check including retries and backoff
+            'seconds': time.perf_counter() - started,
+        }
+
+    def _pool(self, endpoint):
+        key = (endpoint.scheme, endpoint.host, endpoint.port)
+        with self._lock:
+            if key not in self._pools:
+                if endpoint.host not in self._host_slots:
+                    self._host_slots[endpoint.host] = threading.BoundedSemaphore(self.config['per_host'])
+                self._pools[key] = HostPool(
+                    endpoint.scheme, endpoint.host, endpoint.port, self._host_slots[endpoint.host],
+                    self.config['connect_timeout'], self.config['read_timeout'], self.ssl_context)
+            return self._pools[key]
+
+
+class ReportWriter:
+    """Append each result to a JSON-lines or CSV file (by extension) as soon as it completes.
+
+    Every row is flushed, so a crashed or interrupted run keeps what it checked.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.format = 'csv' if path.endswith('.csv') else 'jsonl'
+        self._file = open(path, 'w', newline='')
+        self._writer = None
+        if self.format == 'csv':
+            self._writer = csv.DictWriter(self._file, fieldnames=REPORT_FIELDS, extrasaction='ignore')
+            self._writer.writeheader()
+        self._lock = threading.Lock()
+
+    def write(self, result):
+        with self._lock:
+            if self._writer is not None:
+                self._writer.writerow(result)
+            else:
+                self._file.write(json.dumps({k: result.get(k) for k in REPORT_FIELDS}) + '\n')
+            self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def summarize(results, by='host'):
+    """Return {host or app: {'count', 'failed', 'p50', 'p95', 'p99', 'max'}} of request latency in seconds.
+
+    Latency is the 'total' of the last attempt; endpoints that never got a
+    response only count as failed.
+    """
+    groups = {}
+    for result in results:
+        group = groups.setdefault(result[by], {'count': 0, 'failed': 0, 'latency': []})
+        group['count'] += 1
+        group['failed'] += not result['ok']
+        if result['total'] is not None:
+            group['latency'].append(result['total'])
+    summary = {}
+    for key, group in groups.items():
+        latency = group.pop('latency')
+        for name, q in [('p50', 50), ('p95', 95), ('p99', 99)]:
+            group[name] = float(np.percentile(latency, q)) if latency else None
+        group['max'] = max(latency) if latency else None
+        summary[key] = group
+    return summary
+
+
+def slo_violations(results, slo):
+    """Return one message per breached threshold of ``slo`` (see DEFAULT_CONFIG); empty when all pass"""
+    violations = []
+    failed = sum(not result['ok'] for result in results)
+    if slo.get('max_failures') is not None and failed > slo['max_failures']:
+        violations.append(f"{failed} failed endpoints (max_failures {slo['max_failures']})")
+    for by in ['host', 'app']:
+        for key, stats in summarize(results, by).items():
+            for name in ['p50', 'p95', 'p99']:
+                limit = slo.get(name)
+                if limit is not None and stats[name] is not None and stats[name] > limit:
+                    violations.append(f"{by} {key}: {name} {stats[name]:.3f}s > {limit}s")
+    if slo.get('max') is not None:
+        for result in results:
+            if result['total'] is not None and result['total'] > slo['max']:
+                violations.append(f"{result['url']}: {result['total']:.3f}s > max {slo['max']}s")
+    return violations
+
+
+def _error_class(error):
+    if isinstance(error, (socket.timeout, TimeoutError)):
+        return 'timeout'
+    if isinstance(error, socket.gaierror):
+        return 'dns'
+    if isinstance(error, ssl.SSLError):
+        return 'tls'
+    if isinstance(error, ConnectionRefusedError):
+        return 'refused'
+    if isinstance(error, http.client.HTTPException):
+        return 'protocol'
+    return type(error).__name__
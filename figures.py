@@ -0,0 +1,167 @@
+import pandas as pd
+
+from chart_data import chart_data, downsample_line, lttb_indices, MAX_LINE_POINTS
+
+
+def build_analysis_figure(ticker, df):
+    """Build the candlestick, moving average and RSI figure for the analysis page"""
+    import plotly.graph_objects as go
+    from plotly.subplots import make_subplots
+
+    # Stock price chart
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True,
+                        vertical_spacing=0.03, row_heights=[0.7, 0.3])
+
+    # Candles come from the cached OHLC pyramid level that fits the range;
+    # indicator lines are LTTB-downsampled and drawn with WebGL
+    level, candles, lines = chart_data(ticker, df)
+
+    # Candlestick chart
+    fig.add_trace(
+        go.Candlestick(
+            x=candles.index,
+            open=candles['Open'],
+            high=candles['High'],
+            low=candles['Low'],
+            close=candles['Close'],
+            name='OHLC' if level == 'Bars' else f'OHLC ({level})'
+        ),
+        row=1, col=1
+    )
+
+    # Add Moving Averages
+    fig.add_trace(
+        go.Scattergl(
+            x=lines['MA20'].index,
+            y=lines['MA20'],
+            name='MA20',
+            line=dict(color='orange', width=2)
+        ),
+        row=1, col=1
+    )
+
+    fig.add_trace(
+        go.Scattergl(
+            x=lines['MA50'].index,
+            y=lines['MA50'],
+            name='MA50',
+            line=dict(color='blue', width=2)
+        ),
+        row=1, col=1
+    )
+
+    # Add RSI
+    fig.add_trace(
+        go.Scattergl(
+            x=lines['RSI'].index,
+            y=lines['RSI'],
+            name='RSI',
+            line=dict(color='purple', width=2)
+        ),
+        row=2, col=1
+    )
+
+    # Update layout
+    fig.update_layout(
+        title=f'{ticker} Stock Analysis',
+        title_font=dict(size=24),  # Adjust title font size
+        yaxis_title='Stock Price (USD)',
+        yaxis2_title='RSI',
+        xaxis_rangeslider_visible=False,
+        height=800,
+        margin=dict(l=0, r=0, t=80, b=40)
+    )
+
+    # Add RSI lines
+    fig.add_hline(y=70, line_dash="dash", line_color="red", row=2, col=1)
+    fig.add_hline(y=30, line_dash="dash", line_color="green", row=2, col=1)
+
+    return fig
+
+
+def build_forecast_figure(ticker, df, forecast):
+    """Build the historical vs. Prophet forecast figure with its confidence band"""
+    import plotly.graph_objects as go
+
+    fig2 = go.Figure()
+    title = f"{ticker} Stock Price Prediction{_horizon_label(df, forecast)}"
+
+    # Downsample history and forecast; the bounds reuse the forecast's
+    # indices so the confidence band stays aligned with yhat
+    history = downsample_line(df['Close'])
+    keep = lttb_indices(forecast['ds'].astype('int64'), forecast['yhat'], MAX_LINE_POINTS)
+    forecast = forecast.iloc[keep]
+
+    # Add historical data
+    fig2.add_trace(go.Scattergl(
+        x=history.index, y=history, name='Historical',
+        mode='lines', line=dict(color='blue', width=2),
+        hovertemplate="<b>Date:</b> %{x}<br><b>Price:</b> $%{y:.2f}<extra></extra>"
+    ))
+
+    # Add forecast data
+    fig2.add_trace(go.Scattergl(
+        x=forecast['ds'], y=forecast['yhat'], name='Forecast',
+        mode='lines', line=dict(color='green', width=2, dash='dash'),
+        hovertemplate="<b>Forecast Date:</b> %{x}<br><b>Predicted Price:</b> $%{y:.2f}<extra></extra>"
+    ))
+
+    # Add upper bound (yhat_upper) for confidence interval
+    fig2.add_trace(go.Scattergl(
+        x=forecast['ds'], y=forecast['yhat_upper'], name='Upper Bound',
+        mode='lines', line=dict(color='rgba(0, 255, 0, 0.2)', width=0),
+        showlegend=False, hoverinfo='skip'
+    ))
+
+    # Add lower bound (yhat_lower) for confidence interval
+    fig2.add_trace(go.Scattergl(
+        x=forecast['ds'], y=forecast['yhat_lower'], name='Lower Bound',
+        mode='lines', fill='tonexty', fillcolor='rgba(0, 255, 0, 0.1)',
+        line=dict(color='rgba(0, 255, 0, 0.2)', width=0),
+        showlegend=False, hoverinfo='skip'
+    ))
+
+    # Customize layout to make it more attractive
+    fig2.update_layout(
+        xaxis=dict(
+            title="Date",
+            tickformat="%B",  # Display month names
+            showgrid=True, gridcolor='rgba(200, 200, 200, 0.2)',  # Light grid lines
+        ),
+        yaxis=dict(
+            title="Stock Price (USD)",
+            showgrid=True, gridcolor='rgba(200, 200, 200, 0.2)',  # Light grid lines
+        ),
+        title={
+            'text': title,
+            'y': 0.9,
+            'x': 0.5,
+            'xanchor': 'center',
+            'yanchor': 'top',
+            'font': dict(size=24, color='darkblue')  # Title styling
+        },
+        legend=dict(
+            orientation="h",  # Horizontal legend
+            yanchor="bottom", y=1.02, xanchor="center", x=0.5,
+            bgcolor='rgba(255, 255, 255, 0.7)', bordercolor='rgba(0, 0, 0, 0.1)',
+            borderwidth=1
+        ),
+        hovermode="x",  # Hover mode to show details on the x-axis
+        plot_bgcolor='rgba(0, 0, 0, 0)',  # Transparent background
+        paper_bgcolor='rgba(0, 0, 0, 0)',  # Transparent background
+        height=600  # Adjust height
+    )
+
+    return fig2
+
+
+def _horizon_label(df, forecast):
+    """' for the Next N Days (to <end date>)' from the forecast rows past the last historical bar"""
+    last = pd.Timestamp(df.index[-1])
+    if last.tzinfo is not None:
+        last = last.tz_localize(None)
+    future = forecast['ds'][forecast['ds'] > last]
+    if future.empty:
+        return ""
+    end = future.iloc[-1]
+    return f" for the Next {len(future)} Days (to {end:%b} {end.day}, {end.year})"
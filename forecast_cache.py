@@ -0,0 +1,157 @@
+import hashlib
+import json
+import os
+import pickle
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Root directory of the on-disk forecast tier
+DEFAULT_ROOT = os.environ.get("STOCK_FORECAST_CACHE_DIR", os.path.join("data", "forecasts"))
+
+
+def series_hash(series):
+    """Hash the dates and values of a price series"""
+    digest = hashlib.sha256()
+    index = pd.DatetimeIndex(series.index)
+    if index.tz is not None:
+        index = index.tz_convert('UTC')
+    digest.update(index.as_unit('ns').asi8.tobytes())
+    digest.update(np.ascontiguousarray(series.to_numpy(dtype='float64')).tobytes())
+    return digest.hexdigest()
+
+
+def forecast_key(ticker, period, settings, series):
+    """Build the cache key for a forecast of ``series`` fitted with ``settings``"""
+    payload = json.dumps({
+        'ticker': (ticker or '').upper(),
+        'period': period,
+        'settings': settings,
+        'data': series_hash(series),
+    }, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ForecastCache:
+    """Two-tier forecast cache: a bounded in-memory LRU in front of pickled files on disk.
+
+    Entries are keyed by ticker, period, model settings and a hash of the input
+    series, so a changed bar or a different setting is simply a different key and
+    stale entries never need to be invalidated explicitly. The disk tier keeps at
+    most ``max_disk_entries`` files and drops the least recently used first.
+    """
+
+    def __init__(self, root=DEFAULT_ROOT, max_entries=32, max_disk_entries=512):
+        self.root = root
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Return the cached forecast for ``key`` or None"""
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return self._memory[key].copy()
+
+            value = self._load(key)
+            if value is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+            self._remember(key, value)
+            return value.copy()
+
+    def put(self, key, forecast):
+        """Store ``forecast`` under ``key`` in both tiers"""
+        with self._lock:
+            self._remember(key, forecast.copy())
+            self._save(key, forecast)
+
+    def get_or_compute(self, key, compute):
+        """Return the cached forecast for ``key``, calling ``compute()`` on a miss"""
+        forecast = self.get(key)
+        if forecast is None:
+            forecast = compute()
+            self.put(key, forecast)
+        return forecast
+
+    def stats(self):
+        """Return hit/miss counters and tier sizes"""
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+                'memory_entries': len(self._memory),
+            }
+
+    def clear(self):
+        """Drop every entry from both tiers"""
+        with self._lock:
+            self._memory.clear()
+            if os.path.isdir(self.root):
+                for name in os.listdir(self.root):
+                    if name.endswith('.pkl'):
+                        os.remove(os.path.join(self.root, name))
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _path(self, key):
+        return os.path.join(self.root, f"{key}.pkl")
+
+    def _load(self, key):
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                value = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+        # Touch the file so disk eviction follows recency of use
+        os.utime(path)
+        return value
+
+    def _save(self, key, value):
+        os.makedirs(self.root, exist_ok=True)
+        path = self._path(key)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'wb') as f:
+            pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+        self._evict_disk()
+
+    def _evict_disk(self):
+        files = [os.path.join(self.root, name) for name in os.listdir(self.root) if name.endswith('.pkl')]
+        if len(files) <= self.max_disk_entries:
+            return
+        # Other processes (the batch job) may be evicting the same files concurrently
+        files.sort(key=lambda path: os.path.getmtime(path) if os.path.exists(path) else 0)
+        for path in files[:len(files) - self.max_disk_entries]:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+_default_cache = None
+
+
+def get_default_cache():
+    """Return the process-wide forecast cache shared by Streamlit sessions"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ForecastCache()
+    return _default_cache
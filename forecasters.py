@@ -0,0 +1,210 @@
+"""Pluggable forecasters that all return Prophet's ``ds/yhat/yhat_lower/yhat_upper`` frame.
+
+``forecast(df, settings)`` dispatches on ``settings['engine']``: 'prophet' goes
+through ``predict_stock_price`` (cached, registry-backed); the NumPy engines fit
+in milliseconds and are meant for interactive use:
+
+    holt_winters  additive damped-trend Holt-Winters (ETS(A,Ad,A)) on log prices,
+                  smoothing parameters picked by a vectorized grid search
+    drift         random walk with drift on log prices
+    ridge         ridge regression of the next log return on the last ``lags`` returns
+
+Every engine returns in-sample one-step fits for the history followed by
+``settings['periods']`` future dates on ``settings['calendar']``, with an
+``interval_width`` prediction interval.
+"""
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from market_calendar import future_dates
+
+# Defaults shared by the NumPy engines
+FORECASTER_SETTINGS = {
+    'periods': 252,
+    'calendar': 'nyse',
+    'interval_width': 0.8,
+    # holt_winters: bars per seasonal cycle (5 = one trading week, 1 = no seasonality)
+    'season_length': 5,
+    # ridge: number of lagged returns and penalty relative to the mean feature variance
+    'lags': 10,
+    'ridge_alpha': 0.1,
+}
+
+# Smoothing-parameter grid searched by holt_winters
+ALPHAS = np.linspace(0.05, 1.0, 20)
+BETAS = np.array([0.0, 0.01, 0.05, 0.1, 0.2])
+PHIS = np.array([0.9, 0.95, 0.98, 1.0])
+GAMMAS = np.array([0.0, 0.05, 0.1])
+
+
+def _frame(ds, future, log_fitted, log_sd_fitted, log_future, log_sd_future, width):
+    """Assemble the Prophet-shaped forecast frame from log-price means and standard deviations"""
+    z = NormalDist().inv_cdf(0.5 + width / 2)
+    mean = np.concatenate([log_fitted, log_future])
+    sd = np.concatenate([log_sd_fitted, log_sd_future])
+    return pd.DataFrame({
+        'ds': np.concatenate([ds.to_numpy(), future.to_numpy().astype(ds.dtype)]),
+        'yhat': np.exp(mean),
+        'yhat_lower': np.exp(mean - z * sd),
+        'yhat_upper': np.exp(mean + z * sd),
+    })
+
+
+def _history(df):
+    ds = pd.DatetimeIndex(df.index)
+    if ds.tz is not None:
+        ds = ds.tz_localize(None)
+    y = np.log(df['Close'].to_numpy(dtype='float64'))
+    if len(y) < 3:
+        raise ValueError("Not enough data points to train the model.")
+    return ds, y
+
+
+def drift_forecast(df, settings):
+    """Random walk with drift: log price moves by the mean historical return each bar"""
+    ds, y = _history(df)
+    future = future_dates(ds[-1], settings['periods'], settings['calendar'])
+    returns = np.diff(y)
+    mu, sigma = returns.mean(), returns.std(ddof=1)
+
+    fitted = np.concatenate([[y[0]], y[:-1] + mu])
+    h = np.arange(1, len(future) + 1)
+    # Step variance plus the uncertainty of the estimated drift
+    sd_future = sigma * np.sqrt(h * (1 + h / len(returns)))
+    return _frame(ds, future, fitted, np.full(len(y), sigma), y[-1] + mu * h, sd_future,
+                  settings['interval_width'])
+
+
+def _ets_sse(y, alpha, beta, phi, gamma, season_length):
+    """One-step squared error of ETS(A,Ad,A) for every parameter combination at once"""
+    k = len(alpha)
+    level = np.full(k, y[0])
+    trend = np.zeros(k)
+    season = np.zeros((k, season_length))
+    sse = np.zeros(k)
+    rows = np.arange(k)
+    for t in range(1, len(y)):
+        phase = t % season_length
+        s = season[rows, phase]
+        damped = phi * trend
+        err = y[t] - (level + damped + s)
+        sse += err * err
+        level = level + damped + alpha * err
+        trend = damped + alpha * beta * err
+        season[rows, phase] = s + gamma * err
+    return sse
+
+
+def holt_winters_forecast(df, settings):
+    """Additive damped-trend Holt-Winters on log prices with grid-searched smoothing parameters"""
+    ds, y = _history(df)
+    future = future_dates(ds[-1], settings['periods'], settings['calendar'])
+    m = max(int(settings['season_length']), 1)
+    gammas = GAMMAS if m > 1 else GAMMAS[:1]
+
+    grid = np.meshgrid(ALPHAS, BETAS, PHIS, gammas, indexing='ij')
+    alpha, beta, phi, gamma = (g.ravel() for g in grid)
+    best = np.argmin(_ets_sse(y, alpha, beta, phi, gamma, m))
+    alpha, beta, phi, gamma = alpha[best], beta[best], phi[best], gamma[best]
+
+    # Re-run the chosen model to keep its fitted values and final state
+    level, trend, season = y[0], 0.0, np.zeros(m)
+    fitted = np.empty(len(y))
+    fitted[0] = y[0]
+    for t in range(1, len(y)):
+        phase = t % m
+        fitted[t] = level + phi * trend + season[phase]
+        err = y[t] - fitted[t]
+        level, trend = level + phi * trend + alpha * err, phi * trend + alpha * beta * err
+        season[phase] += gamma * err
+    sigma = np.sqrt(np.mean((y[1:] - fitted[1:]) ** 2))
+
+    h = np.arange(1, len(future) + 1)
+    phi_sums = np.cumsum(phi ** h)
+    log_future = level + phi_sums * trend + season[(len(y) - 1 + h) % m]
+
+    # Forecast variance of ETS(A,Ad,A): sigma^2 * (1 + sum_{j<h} c_j^2)
+    c = alpha * (1 + beta * phi_sums) + gamma * (h % m == 0)
+    sd_future = sigma * np.sqrt(1 + np.concatenate([[0.0], np.cumsum(c[:-1] ** 2)]))
+    return _frame(ds, future, fitted, np.full(len(y), sigma), log_future, sd_future,
+                  settings['interval_width'])
+
+
+def ridge_forecast(df, settings):
+    """Ridge regression of the next log return on the previous ``lags`` returns, iterated forward"""
+    ds, y = _history(df)
+    future = future_dates(ds[-1], settings['periods'], settings['calendar'])
+    returns = np.diff(y)
+    p = int(settings['lags'])
+    if len(returns) <= 2 * p:
+        raise ValueError("Not enough data points to train the model.")
+
+    # Row i holds returns[i:i+p] (oldest first) and predicts returns[i+p]
+    lagged = np.lib.stride_tricks.sliding_window_view(returns[:-1], p)
+    target = returns[p:]
+    x_mean, y_mean = lagged.mean(axis=0), target.mean()
+    xc, yc = lagged - x_mean, target - y_mean
+    gram = xc.T @ xc
+    penalty = settings['ridge_alpha'] * np.trace(gram) / p
+    coef = np.linalg.solve(gram + penalty * np.eye(p), xc.T @ yc)
+    intercept = y_mean - x_mean @ coef
+
+    predicted = intercept + lagged @ coef
+    sigma = np.std(target - predicted, ddof=p + 1)
+    fitted = np.concatenate([y[:p + 1], y[p:-1] + predicted])
+
+    # Iterate the recursion; the model is linear, so feeding back means gives the mean path
+    n = len(future)
+    window = list(returns[-p:])
+    path = np.empty(n)
+    for i in range(n):
+        step = intercept + np.dot(coef, window[-p:])
+        path[i] = step
+        window.append(step)
+    log_future = y[-1] + np.cumsum(path)
+
+    # Cumulative-return variance from the AR impulse response: psi_j = sum_i coef_i psi_{j-i}
+    psi = np.zeros(n)
+    psi[0] = 1.0
+    reversed_coef = coef[::-1]
+    for j in range(1, n):
+        lo = max(0, j - p)
+        psi[j] = np.dot(reversed_coef[:j - lo], psi[lo:j][::-1])
+    cumulative = np.cumsum(psi)
+    sd_future = sigma * np.sqrt(np.cumsum(cumulative ** 2))
+    return _frame(ds, future, fitted, np.full(len(y), sigma), log_future, sd_future,
+                  settings['interval_width'])
+
+
+def prophet_forecast(df, settings, ticker=None, period=None):
+    from stock_analysis import predict_stock_price
+
+    prophet_settings = {k: v for k, v in settings.items() if k != 'engine'}
+    return predict_stock_price(df, ticker, period, settings=prophet_settings or None)
+
+
+ENGINES = {
+    'prophet': "Prophet",
+    'holt_winters': "Holt-Winters (ETS)",
+    'drift': "Drift (random walk)",
+    'ridge': "Ridge on lagged returns",
+}
+
+FORECASTERS = {
+    'holt_winters': holt_winters_forecast,
+    'drift': drift_forecast,
+    'ridge': ridge_forecast,
+}
+
+
+def forecast(df, settings=None, ticker=None, period=None):
+    """Forecast ``df['Close']`` with ``settings['engine']`` (Prophet when absent)"""
+    settings = settings or {}
+    engine = settings.get('engine', 'prophet')
+    if engine == 'prophet':
+        return prophet_forecast(df, settings, ticker, period)
+    if engine not in FORECASTERS:
+        raise ValueError(f"Unknown forecast engine: {engine}")
+    return FORECASTERS[engine](df, dict(FORECASTER_SETTINGS, **settings))
@@ -0,0 +1,99 @@
+"""Product frame overlay shared by monpura-agro.py and the batch framing pipeline.
+
+Uploaded photos are shown through ``open_preview``, which decodes them at
+display size; the full-resolution render (``open_full`` + ``add_frame``) only
+runs when the user downloads.
+"""
+import math
+
+from PIL import ExifTags, Image, ImageDraw, ImageFont, ImageOps
+
+from asset_cache import get_default_cache
+
+# Longest side of the on-screen preview in pixels
+PREVIEW_SIZE = 1600
+
+
+def open_preview(source, max_side=PREVIEW_SIZE):
+    """Decode an uploaded photo upright with its longest side at most ``max_side``.
+
+    For JPEGs, draft mode lets the decoder scale by 1/2, 1/4 or 1/8 while
+    decoding, so the full-resolution pixels are never materialized.
+    """
+    img = Image.open(source)
+    ratio = max_side / max(img.size)
+    if ratio < 1:
+        img.draft('RGB' if img.mode == 'RGB' else None,
+                  (math.ceil(img.width * ratio), math.ceil(img.height * ratio)))
+    img = ImageOps.exif_transpose(img)
+    img.thumbnail((max_side, max_side))
+    return img
+
+
+def open_full(source):
+    """Decode an uploaded photo at full resolution and make it upright without an extra copy"""
+    img = Image.open(source)
+    img.load()
+    ImageOps.exif_transpose(img, in_place=True)
+    return img
+
+
+def add_frame(img, custom_frame_path, product_id, price, copy=True):
+    """Paste the frame over ``img`` and write the product details; ``copy=False`` draws on ``img`` itself"""
+    # Ensure proper orientation of the input image
+    img = fix_orientation(img)
+
+    # Decoded and resized to the (upright) input image's dimensions once per process, then shared
+    custom_frame = get_default_cache().image(custom_frame_path, size=(img.width, img.height))
+
+    # Create a copy of the original image unless the caller hands it over
+    framed_img = img.copy() if copy else img
+
+    # Paste the custom frame onto the new image
+    framed_img.paste(custom_frame, (0, 0), custom_frame)
+
+    # Draw product details on the framed image
+    draw = ImageDraw.Draw(framed_img)
+
+    # Use default font for text drawing
+    font_size = 100
+    font = ImageFont.load_default()
+
+    text = f"Product ID: {product_id}\nPrice BDT: {price}"
+
+    # Calculate text size using draw.textbbox method
+    text_width, text_height = calculate_text_size(draw, text, font)
+
+    draw.text(((framed_img.width - text_width) // 8, framed_img.height - text_height - 40), text, font=font, fill=(255, 255, 255, 255))
+
+    return framed_img
+
+
+def calculate_text_size(draw, text, font):
+    # Measuring only reads the font, so the caller's draw works without a throwaway image
+    text_bbox = draw.textbbox((0, 0), text, font=font)
+
+    text_width = text_bbox[2] - text_bbox[0]
+    text_height = text_bbox[3] - text_bbox[1]
+
+    return text_width, text_height
+
+
+def fix_orientation(img):
+    try:
+        for orientation in ExifTags.TAGS.keys():
+            if ExifTags.TAGS[orientation] == 'Orientation':
+                break
+        exif = dict(img._getexif().items())
+
+        if exif[orientation] == 3:
+            img = img.rotate(180, expand=True)
+        elif exif[orientation] == 6:
+            img = img.rotate(270, expand=True)
+        elif exif[orientation] == 8:
+            img = img.rotate(90, expand=True)
+    except (AttributeError, KeyError, IndexError):
+        # No EXIF data, or certain keys not present
+        pass
+
+    return img
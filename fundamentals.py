@@ -0,0 +1,203 @@
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+# Root directory for persisted info dicts
+DEFAULT_ROOT = os.environ.get("STOCK_FUNDAMENTALS_DIR", os.path.join("data", "fundamentals"))
+
+# Fundamentals change quarterly; refresh twice a day and serve stale data for up to a week
+DEFAULT_TTL = 12 * 60 * 60
+DEFAULT_STALE_TTL = 7 * 24 * 60 * 60
+
+# Simplified assumption used by calculate_fair_value
+INDUSTRY_AVG_PE = 15
+
+
+def fetch_info(ticker):
+    """Fetch the yfinance info dict for ``ticker``"""
+    import yfinance as yf
+
+    return yf.Ticker(ticker).info
+
+
+class FundamentalsCache:
+    """Per-ticker cache of ``stock.info`` with a TTL and stale-while-revalidate.
+
+    Fresh entries (younger than ``ttl``) are returned directly. Entries older than
+    ``ttl`` but younger than ``stale_ttl`` are returned immediately while a
+    background thread refreshes them; anything older, or missing, is fetched
+    synchronously. Entries are also written to ``root`` so they survive restarts.
+    """
+
+    def __init__(self, root=DEFAULT_ROOT, fetcher=fetch_info, ttl=DEFAULT_TTL,
+                 stale_ttl=DEFAULT_STALE_TTL, max_workers=8, clock=time.time):
+        self.root = root
+        self.fetcher = fetcher
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.clock = clock
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self._entries = {}
+        self._refreshing = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers)
+
+    def info(self, ticker):
+        """Return the info dict for ``ticker``"""
+        ticker = ticker.upper()
+        entry = self._entry(ticker)
+        now = self.clock()
+        if entry is not None:
+            age = now - entry['fetched_at']
+            if age < self.ttl:
+                self.hits += 1
+                return entry['info']
+            if age < self.stale_ttl:
+                self.stale_hits += 1
+                self._revalidate(ticker)
+                return entry['info']
+        self.misses += 1
+        return self._refresh(ticker)
+
+    def prefetch(self, tickers):
+        """Fetch every ticker that is missing or expired, in parallel; returns {ticker: info}"""
+        tickers = [t.upper() for t in tickers]
+        now = self.clock()
+        expired = []
+        for ticker in tickers:
+            entry = self._entry(ticker)
+            if entry is None or now - entry['fetched_at'] >= self.ttl:
+                expired.append(ticker)
+        for future in [self._executor.submit(self._refresh, t) for t in expired]:
+            try:
+                future.result()
+            except Exception:
+                # A failed prefetch just leaves the ticker to be fetched on demand
+                pass
+        return {t: self._entries[t]['info'] for t in tickers if t in self._entries}
+
+    def stats(self):
+        return {'hits': self.hits, 'stale_hits': self.stale_hits, 'misses': self.misses,
+                'entries': len(self._entries)}
+
+    def _entry(self, ticker):
+        with self._lock:
+            entry = self._entries.get(ticker)
+        if entry is None:
+            entry = self._load(ticker)
+            if entry is not None:
+                with self._lock:
+                    self._entries[ticker] = entry
+        return entry
+
+    def _refresh(self, ticker):
+        info = self.fetcher(ticker) or {}
+        entry = {'fetched_at': self.clock(), 'info': info}
+        with self._lock:
+            self._entries[ticker] = entry
+        self._save(ticker, entry)
+        return info
+
+    def _revalidate(self, ticker):
+        with self._lock:
+            if ticker in self._refreshing:
+                return
+            self._refreshing.add(ticker)
+
+        def refresh():
+            try:
+                self._refresh(ticker)
+            except Exception:
+                # Keep serving the stale entry; the next expired read retries
+                pass
+            finally:
+                with self._lock:
+                    self._refreshing.discard(ticker)
+
+        self._executor.submit(refresh)
+
+    def _path(self, ticker):
+        return os.path.join(self.root, f"{ticker}.json")
+
+    def _load(self, ticker):
+        try:
+            with open(self._path(ticker)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save(self, ticker, entry):
+        try:
+            os.makedirs(self.root, exist_ok=True)
+            tmp = f"{self._path(ticker)}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, 'w') as f:
+                json.dump(entry, f, default=str)
+            os.replace(tmp, self._path(ticker))
+        except OSError:
+            pass
+
+
+_default_cache = None
+
+
+def get_default_cache():
+    """Return the process-wide fundamentals cache"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = FundamentalsCache()
+    return _default_cache
+
+
+def info_frame(infos, fields):
+    """Collect ``fields`` from {ticker: info} into a float DataFrame indexed by ticker"""
+    rows = {ticker: [info.get(field) for field in fields] for ticker, info in infos.items()}
+    frame = pd.DataFrame.from_dict(rows, orient='index', columns=fields)
+    return frame.apply(pd.to_numeric, errors='coerce')
+
+
+def fair_value_signals(infos, prices):
+    """Vectorized calculate_fair_value over a universe.
+
+    ``infos`` maps ticker to info dict and ``prices`` maps ticker to last close.
+    Returns a DataFrame with Fair Value and Signal columns per ticker.
+    """
+    frame = info_frame(infos, ['forwardPE', 'forwardEps'])
+    price = pd.Series(prices, dtype='float64').reindex(frame.index).to_numpy()
+    pe = frame['forwardPE'].to_numpy()
+    eps = frame['forwardEps'].to_numpy()
+
+    # Mirrors `if pe_ratio and eps`: both present and non-zero
+    available = ~np.isnan(pe) & (pe != 0) & ~np.isnan(eps) & (eps != 0)
+    fair_value = np.where(available, eps * INDUSTRY_AVG_PE, np.nan)
+    # A missing price (or an overflowing fair value) compares False both ways;
+    # without this it would fall through to "Fairly Valued"
+    signal = np.select(
+        [~available, ~np.isfinite(price) | ~np.isfinite(fair_value), price < fair_value, price > fair_value],
+        ["Data not available", "N/A", "Undervalued", "Overvalued"],
+        default="Fairly Valued",
+    )
+    return pd.DataFrame({'Price': price, 'Fair Value': fair_value, 'Signal': signal}, index=frame.index)
+
+
+def evaluate_signals(infos, prices):
+    """Vectorized evaluate_stock over a universe; returns a Valuation column per ticker"""
+    frame = info_frame(infos, ['forwardPE', 'fiftyTwoWeekHigh'])
+    price = pd.Series(prices, dtype='float64').reindex(frame.index).to_numpy()
+    pe = frame['forwardPE'].to_numpy()
+    avg_price_5y = frame['fiftyTwoWeekHigh'].to_numpy() * 0.7  # Simplified assumption
+
+    has_pe = ~np.isnan(pe) & (pe != 0)
+    valuation = np.select(
+        [np.isnan(avg_price_5y) | ~np.isfinite(price), has_pe & (price < avg_price_5y) & (pe < 15),
+         price > avg_price_5y],
+        ["Unknown", "Undervalued", "Overvalued"],
+        default="Fairly valued",
+    )
+    return pd.DataFrame({'Price': price, 'Valuation': valuation}, index=frame.index)
@@ -0,0 +1,287 @@
+import json
+import os
+import shutil
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Root directory of the on-disk history store
+DEFAULT_ROOT = os.environ.get("STOCK_HISTORY_DIR", os.path.join("data", "history"))
+
+# How long a ticker's tail is considered fresh before asking the provider again
+DEFAULT_MAX_AGE = pd.Timedelta(minutes=15)
+
+# Columns returned by yfinance's Ticker.history
+COLUMNS = ['Open', 'High', 'Low', 'Close', 'Volume', 'Dividends', 'Stock Splits']
+
+PERIODS = {
+    '1d': pd.DateOffset(days=1),
+    '5d': pd.DateOffset(days=5),
+    '1mo': pd.DateOffset(months=1),
+    '3mo': pd.DateOffset(months=3),
+    '6mo': pd.DateOffset(months=6),
+    '1y': pd.DateOffset(years=1),
+    '2y': pd.DateOffset(years=2),
+    '5y': pd.DateOffset(years=5),
+    '10y': pd.DateOffset(years=10),
+}
+
+EPOCH = pd.Timestamp('1970-01-01', tz='UTC')
+
+
+def period_start(period, now=None):
+    """Translate a yfinance-style period string into a UTC start timestamp"""
+    now = pd.Timestamp.now(tz='UTC') if now is None else pd.Timestamp(now)
+    if now.tzinfo is None:
+        now = now.tz_localize('UTC')
+    now = now.tz_convert('UTC').normalize()
+    if period == 'max':
+        return EPOCH
+    if period == 'ytd':
+        return now.replace(month=1, day=1)
+    if period not in PERIODS:
+        raise ValueError(f"Unsupported period: {period}")
+    return now - PERIODS[period]
+
+
+# Providers
+#
+# A provider is any object with a ``fetch(ticker, start, end)`` method that
+# returns an OHLCV DataFrame indexed by a DatetimeIndex named 'Date' and
+# covering [start, end). The store only talks to providers, so tests and
+# offline runs can swap yfinance for a CSV directory or in-memory frames.
+
+class YFinanceProvider:
+    """Fetch daily bars from Yahoo Finance"""
+
+    def fetch(self, ticker, start, end):
+        import yfinance as yf
+
+        return yf.Ticker(ticker).history(start=start, end=end)
+
+
+class FrameProvider:
+    """Serve bars from in-memory DataFrames keyed by ticker"""
+
+    def __init__(self, frames):
+        self.frames = {ticker.upper(): df for ticker, df in frames.items()}
+        self.calls = []
+
+    def fetch(self, ticker, start, end):
+        self.calls.append((ticker, start, end))
+        df = self.frames.get(ticker.upper())
+        if df is None:
+            return pd.DataFrame(columns=COLUMNS)
+        index = df.index if df.index.tz is not None else df.index.tz_localize('UTC')
+        start = _as_utc(start).tz_convert(index.tz)
+        end = _as_utc(end).tz_convert(index.tz)
+        return df[(index >= start) & (index < end)]
+
+
+class CSVProvider(FrameProvider):
+    """Serve bars from ``<directory>/<TICKER>.csv`` files with a Date column"""
+
+    def __init__(self, directory):
+        super().__init__({})
+        self.directory = directory
+
+    def fetch(self, ticker, start, end):
+        ticker = ticker.upper()
+        if ticker not in self.frames:
+            path = os.path.join(self.directory, f"{ticker}.csv")
+            if os.path.exists(path):
+                df = pd.read_csv(path)
+                df['Date'] = pd.to_datetime(df['Date'], utc=True)
+                self.frames[ticker] = df.set_index('Date').sort_index()
+        return super().fetch(ticker, start, end)
+
+
+def _as_utc(ts):
+    ts = pd.Timestamp(ts)
+    return ts.tz_localize('UTC') if ts.tzinfo is None else ts.tz_convert('UTC')
+
+
+class HistoryStore:
+    """On-disk OHLCV history keyed by ticker, stored as one raw column file per field.
+
+    Each ticker lives in ``<root>/<TICKER>/`` with a ``Date.i8`` file of UTC
+    nanosecond timestamps, one ``<column>.f8`` file per price column and a
+    ``meta.json`` recording the exchange timezone, the earliest date that has
+    been requested and when the tail was last refreshed. Reads memory-map the
+    column files and copy out only the requested slice; refreshes replace the
+    last stored bar (it may have been a partial session) with whatever the
+    provider returns from it onwards. Every column file is rewritten to a temp
+    file and renamed into place, and reads only use as many rows as the
+    shortest column holds, so a crash or a concurrent reader midway through a
+    refresh never sees misaligned columns; a full rewrite is built in a
+    sibling directory and swapped in whole.
+    """
+
+    def __init__(self, root=DEFAULT_ROOT, provider=None, max_age=DEFAULT_MAX_AGE):
+        self.root = root
+        self.provider = provider if provider is not None else YFinanceProvider()
+        self.max_age = pd.Timedelta(max_age)
+        self._lock = threading.Lock()
+
+    def history(self, ticker, period='2y', now=None):
+        """Return bars for ``ticker`` covering ``period``, fetching only what is missing"""
+        ticker = ticker.upper()
+        now = pd.Timestamp.now(tz='UTC') if now is None else _as_utc(now)
+        start = period_start(period, now)
+        with self._lock:
+            self._sync(ticker, start, now)
+            return self._read(ticker, start)
+
+    def last_bar(self, ticker):
+        """Return the newest stored bar's UTC timestamp without asking the provider, or None"""
+        ticker = ticker.upper()
+        with self._lock:
+            if self._read_meta(ticker) is None:
+                return None
+            dates = self._column(ticker, 'Date', 'i8')
+            return pd.Timestamp(int(dates[-1]), tz='UTC') if len(dates) else None
+
+    # Synchronisation with the provider
+
+    def _sync(self, ticker, start, now):
+        meta = self._read_meta(ticker)
+        end = now.normalize() + pd.Timedelta(days=1)
+
+        if meta is None:
+            df = self.provider.fetch(ticker, start, end)
+            if not df.empty:
+                self._write(ticker, df, start, now.isoformat())
+            return
+
+        covered = pd.Timestamp(meta['start'])
+        if start < covered:
+            head = self.provider.fetch(ticker, start, covered)
+            if not head.empty:
+                df = pd.concat([self._normalize(head, meta['columns']), self._read(ticker, EPOCH)])
+                self._write(ticker, df[~df.index.duplicated(keep='last')], start, meta['fetched_at'])
+                meta = self._read_meta(ticker)
+            else:
+                meta['start'] = start.isoformat()
+                self._write_meta(ticker, meta)
+
+        if now - pd.Timestamp(meta['fetched_at']) >= self.max_age:
+            dates = self._column(ticker, 'Date', 'i8')
+            last = pd.Timestamp(int(dates[-1]), tz='UTC')
+            del dates
+            tail = self.provider.fetch(ticker, last, end)
+            if not tail.empty:
+                self._append(ticker, self._normalize(tail, meta['columns']), meta)
+            meta['fetched_at'] = now.isoformat()
+            self._write_meta(ticker, meta)
+
+    def _normalize(self, df, columns):
+        df = df.reindex(columns=columns).fillna({'Dividends': 0.0, 'Stock Splits': 0.0})
+        df.index = pd.DatetimeIndex(df.index, name='Date')
+        if df.index.tz is None:
+            df.index = df.index.tz_localize('UTC')
+        return df.sort_index()
+
+    def _write(self, ticker, df, start, fetched_at):
+        columns = [c for c in COLUMNS if c in df.columns] or list(df.columns)
+        tz = str(df.index.tz) if getattr(df.index, 'tz', None) is not None else 'UTC'
+        df = self._normalize(df, columns)
+        # A full rewrite can shift every row (older bars prepended), so the new
+        # files are built in a sibling directory and swapped in as a whole
+        path = self._path(ticker)
+        tmp = f"{path}.{os.getpid()}.tmp"
+        shutil.rmtree(tmp, ignore_errors=True)
+        os.makedirs(tmp)
+        df.index.tz_convert('UTC').as_unit('ns').asi8.astype('<i8').tofile(os.path.join(tmp, 'Date.i8'))
+        for column in columns:
+            df[column].to_numpy(dtype='<f8').tofile(os.path.join(tmp, f"{column}.f8"))
+        with open(os.path.join(tmp, 'meta.json'), 'w') as f:
+            json.dump({
+                'tz': tz,
+                'columns': columns,
+                'start': start.isoformat(),
+                'fetched_at': fetched_at,
+            }, f)
+        if os.path.exists(path):
+            old = f"{path}.{os.getpid()}.old"
+            os.replace(path, old)
+            os.replace(tmp, path)
+            shutil.rmtree(old, ignore_errors=True)
+        else:
+            os.replace(tmp, path)
+
+    def _append(self, ticker, df, meta):
+        path = self._path(ticker)
+        dates = self._column(ticker, 'Date', 'i8')
+        first_new = df.index[0].tz_convert('UTC').as_unit('ns').value
+        keep = int(np.searchsorted(dates, first_new, side='left'))
+        del dates
+
+        # Dates go last: until they are replaced, readers see the old row count
+        files = [(c, 'f8', df[c].to_numpy(dtype='<f8')) for c in meta['columns']]
+        files += [('Date', 'i8', df.index.tz_convert('UTC').as_unit('ns').asi8.astype('<i8'))]
+        for column, kind, values in files:
+            prefix = self._column(ticker, column, kind)[:keep]
+            _replace_column(os.path.join(path, f"{column}.{kind}"), values, prefix)
+            del prefix
+
+    # Reading
+
+    def _read(self, ticker, start):
+        meta = self._read_meta(ticker)
+        if meta is None:
+            return pd.DataFrame(columns=COLUMNS, index=pd.DatetimeIndex([], name='Date'))
+        columns = {c: self._column(ticker, c, 'f8') for c in meta['columns']}
+        dates = self._column(ticker, 'Date', 'i8')
+        # A refresh interrupted between two column files leaves them at different
+        # lengths; only the rows every column holds are complete
+        rows = min([len(dates)] + [len(values) for values in columns.values()])
+        dates = dates[:rows]
+        lo = int(np.searchsorted(dates, start.as_unit('ns').value, side='left'))
+        index = pd.DatetimeIndex(np.array(dates[lo:]), tz='UTC', name='Date').tz_convert(meta['tz'])
+        data = {c: np.array(values[lo:rows]) for c, values in columns.items()}
+        return pd.DataFrame(data, index=index)
+
+    def _column(self, ticker, column, kind):
+        path = os.path.join(self._path(ticker), f"{column}.{kind}")
+        if os.path.getsize(path) == 0:
+            return np.empty(0, dtype=f"<{kind}")
+        return np.memmap(path, dtype=f"<{kind}", mode='r')
+
+    def _path(self, ticker):
+        return os.path.join(self.root, ticker)
+
+    def _read_meta(self, ticker):
+        path = os.path.join(self._path(ticker), 'meta.json')
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def _write_meta(self, ticker, meta):
+        path = os.path.join(self._path(ticker), 'meta.json')
+        tmp = f"{path}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            json.dump(meta, f)
+        os.replace(tmp, path)
+
+
+def _replace_column(path, values, prefix=None):
+    """Write ``prefix`` followed by ``values`` to a temp file and rename it over ``path``"""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'wb') as f:
+        if prefix is not None:
+            np.asarray(prefix).tofile(f)
+        values.tofile(f)
+    os.replace(tmp, path)
+
+
+_default_store = None
+
+
+def get_default_store():
+    """Return the process-wide store shared by the Streamlit apps"""
+    global _default_store
+    if _default_store is None:
+        _default_store = HistoryStore()
+    return _default_store
@@ -1,7 +1,8 @@
 import streamlit as st
 from PIL import Image
 import io
-import base64  # Add this import for base64
+
+from framing import open_full, open_preview
 
 
 # Streamlit app
@@ -18,8 +19,8 @@ def main():
 
     # Button to add frame to the image
     if uploaded_image is not None:
-        # Open the uploaded image
-        img = Image.open(uploaded_image)
+        # Decode the uploaded image at display size for the preview
+        img = open_preview(uploaded_image)
 
         # Add frame to the image
         framed_img = add_frame(img, frame_style)
@@ -27,9 +28,10 @@ def main():
         # Display the framed image
         st.image(framed_img, caption="Image with Frame", use_column_width=True)
 
-    # Download link for the framed image
+    # Download button for the framed image, rendered at full resolution only when clicked
     if framed_img is not None:
-        download_framed_image(framed_img)
+        photo = uploaded_image.getvalue()
+        download_framed_image(lambda: add_frame(open_full(io.BytesIO(photo)), frame_style))
 
 
 def add_frame(img, frame_style):
@@ -53,25 +55,15 @@ def add_frame(img, frame_style):
     return framed_img
 
 
-def download_framed_image(framed_img):
-    # Save the framed image to a BytesIO buffer
-    img_buffer = io.BytesIO()
-    framed_img.save(img_buffer, format="PNG")
-
-    # Convert BytesIO buffer to bytes
-    img_bytes = img_buffer.getvalue()
-
-    # Create a download link for the framed image
-    st.markdown(get_binary_file_downloader_html(img_bytes, 'framed_image.png', 'Download Framed Image'),
-                unsafe_allow_html=True)
-
+def download_framed_image(render):
+    def encode():
+        # Only runs when the user actually downloads: render at full resolution and encode
+        img_buffer = io.BytesIO()
+        render().save(img_buffer, format="PNG")
+        return img_buffer.getvalue()
 
-def get_binary_file_downloader_html(bin_file, file_label='File', button_label='Download'):
-    with io.BytesIO(bin_file) as f:
-        data = f.read()
-    bin_str = base64.b64encode(data).decode()
-    href = f'<a href="data:application/octet-stream;base64,{bin_str}" download="{file_label}">{button_label}</a>'
-    return href
+    st.download_button("Download Framed Image", data=encode, file_name='framed_image.png',
+                       mime='image/png', on_click='ignore')
 
 
 if __name__ == "__main__":
@@ -0,0 +1,171 @@
+import math
+from array import array
+
+import numpy as np
+
+
+class RollingMean:
+    """Constant-time rolling mean that reproduces ``Series.rolling(window).mean()`` bit for bit.
+
+    pandas keeps a Kahan-compensated running sum with separate compensation terms
+    for added and removed values, counts negative values so it can clamp results
+    that drift across zero, and returns the last value exactly when the whole
+    window holds the same value. This class carries the same state and a ring
+    buffer of the last ``window`` values so each update is O(1).
+    """
+
+    __slots__ = ('window', 'buffer', 'count', 'nobs', 'sum_x', 'neg_ct',
+                 'compensation_add', 'compensation_remove', 'same_ct', 'prev_value')
+
+    def __init__(self, window):
+        self.window = window
+        self.buffer = array('d', [math.nan] * window)
+        self.count = 0
+        self.nobs = 0
+        self.sum_x = 0.0
+        self.neg_ct = 0
+        self.compensation_add = 0.0
+        self.compensation_remove = 0.0
+        self.same_ct = 0
+        self.prev_value = math.nan
+
+    def update(self, value):
+        """Push one value and return the mean of the last ``window`` values (NaN until full)"""
+        value = float(value)
+        slot = self.count % self.window
+        if self.count == 0:
+            self.prev_value = value
+        elif self.count >= self.window:
+            self._remove(self.buffer[slot])
+        self.buffer[slot] = value
+        self.count += 1
+        self._add(value)
+        return self._mean()
+
+    def _add(self, value):
+        if value != value:
+            return
+        self.nobs += 1
+        y = value - self.compensation_add
+        t = self.sum_x + y
+        self.compensation_add = t - self.sum_x - y
+        self.sum_x = t
+        if math.copysign(1.0, value) < 0:
+            self.neg_ct += 1
+        if value == self.prev_value:
+            self.same_ct += 1
+        else:
+            self.same_ct = 1
+        self.prev_value = value
+
+    def _remove(self, value):
+        if value != value:
+            return
+        self.nobs -= 1
+        y = -value - self.compensation_remove
+        t = self.sum_x + y
+        self.compensation_remove = t - self.sum_x - y
+        self.sum_x = t
+        if math.copysign(1.0, value) < 0:
+            self.neg_ct -= 1
+
+    def _mean(self):
+        if self.nobs < self.window or self.nobs == 0:
+            return math.nan
+        if self.same_ct >= self.nobs:
+            return self.prev_value
+        result = self.sum_x / self.nobs
+        if self.neg_ct == 0 and result < 0:
+            return 0.0
+        if self.neg_ct == self.nobs and result > 0:
+            return 0.0
+        return result
+
+    def snapshot(self):
+        return {name: getattr(self, name) for name in self.__slots__ if name != 'buffer'} | {
+            'buffer': list(self.buffer)}
+
+    @classmethod
+    def restore(cls, snapshot):
+        state = cls(snapshot['window'])
+        for name in cls.__slots__:
+            if name == 'buffer':
+                state.buffer = array('d', snapshot['buffer'])
+            else:
+                setattr(state, name, snapshot[name])
+        return state
+
+
+class IndicatorState:
+    """Running MA20, MA50 and 14-period RSI for one ticker, updated in O(1) per bar.
+
+    Feeding the Close series through ``update`` yields exactly the MA20, MA50 and
+    RSI columns produced by ``calculate_technical_indicators``; ``snapshot`` and
+    ``restore`` let the state be persisted between intraday updates.
+    """
+
+    __slots__ = ('ma20', 'ma50', 'gain', 'loss', 'last_close', 'bars')
+
+    def __init__(self):
+        self.ma20 = RollingMean(20)
+        self.ma50 = RollingMean(50)
+        self.gain = RollingMean(14)
+        self.loss = RollingMean(14)
+        self.last_close = math.nan
+        self.bars = 0
+
+    def update(self, close):
+        """Push one closing price and return (MA20, MA50, RSI) for that bar"""
+        close = float(close)
+        # Mirror Close.diff() followed by where(delta > 0, 0) and -where(delta < 0, 0):
+        # the first bar and NaN deltas count as 0 gain and -0.0 loss
+        delta = close - self.last_close if self.bars else math.nan
+        gain = delta if delta > 0 else 0.0
+        loss = -(delta if delta < 0 else 0.0)
+        self.last_close = close
+        self.bars += 1
+
+        ma20 = self.ma20.update(close)
+        ma50 = self.ma50.update(close)
+        avg_gain = self.gain.update(gain)
+        avg_loss = self.loss.update(loss)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rs = np.float64(avg_gain) / np.float64(avg_loss)
+            rsi = float(100 - (100 / (1 + rs)))
+        return ma20, ma50, rsi
+
+    def update_many(self, closes):
+        """Push a batch of closing prices and return an (n, 3) array of MA20, MA50, RSI"""
+        closes = np.asarray(closes, dtype='float64')
+        out = np.empty((len(closes), 3))
+        for i, close in enumerate(closes):
+            out[i] = self.update(close)
+        return out
+
+    def snapshot(self):
+        """Return a JSON-serialisable copy of the running state"""
+        return {
+            'ma20': self.ma20.snapshot(),
+            'ma50': self.ma50.snapshot(),
+            'gain': self.gain.snapshot(),
+            'loss': self.loss.snapshot(),
+            'last_close': self.last_close,
+            'bars': self.bars,
+        }
+
+    @classmethod
+    def restore(cls, snapshot):
+        """Rebuild a state from ``snapshot()`` output"""
+        state = cls()
+        for name in ['ma20', 'ma50', 'gain', 'loss']:
+            setattr(state, name, RollingMean.restore(snapshot[name]))
+        state.last_close = snapshot['last_close']
+        state.bars = snapshot['bars']
+        return state
+
+    @classmethod
+    def from_frame(cls, df):
+        """Prime a state from a history frame with a Close column"""
+        state = cls()
+        state.update_many(df['Close'].to_numpy())
+        return state
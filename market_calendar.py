@@ -0,0 +1,47 @@
+import pandas as pd
+from pandas.tseries.holiday import (
+    AbstractHolidayCalendar,
+    GoodFriday,
+    Holiday,
+    USLaborDay,
+    USMartinLutherKingJr,
+    USMemorialDay,
+    USPresidentsDay,
+    USThanksgivingDay,
+    nearest_workday,
+)
+from pandas.tseries.offsets import CustomBusinessDay
+
+
+class NYSEHolidayCalendar(AbstractHolidayCalendar):
+    """Full-day NYSE closures (early closes are trading days)"""
+
+    rules = [
+        Holiday('New Years Day', month=1, day=1, observance=nearest_workday),
+        USMartinLutherKingJr,
+        USPresidentsDay,
+        GoodFriday,
+        USMemorialDay,
+        Holiday('Juneteenth', month=6, day=19, start_date='2022-01-01', observance=nearest_workday),
+        Holiday('Independence Day', month=7, day=4, observance=nearest_workday),
+        USLaborDay,
+        USThanksgivingDay,
+        Holiday('Christmas Day', month=12, day=25, observance=nearest_workday),
+    ]
+
+
+# Horizon frequencies by calendar name: every day, weekdays, or NYSE trading days
+CALENDARS = {
+    'calendar': 'D',
+    'business': 'B',
+    'nyse': CustomBusinessDay(calendar=NYSEHolidayCalendar()),
+}
+
+
+def future_dates(last_date, periods, calendar='calendar'):
+    """Return the first ``periods`` dates after ``last_date`` on the given calendar"""
+    if calendar not in CALENDARS:
+        raise ValueError(f"Unknown calendar: {calendar}")
+    # A range starting on a closed day rolls forward to the next open one
+    start = pd.Timestamp(last_date).normalize() + pd.Timedelta(days=1)
+    return pd.date_range(start, periods=periods, freq=CALENDARS[calendar])
@@ -0,0 +1,241 @@
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from forecast_cache import series_hash
+import tracing
+
+# Root directory of the persisted models
+DEFAULT_ROOT = os.environ.get("STOCK_MODEL_DIR", os.path.join("data", "models"))
+
+# Total size of all persisted models before the least recently used are evicted
+DEFAULT_MAX_BYTES = int(os.environ.get("STOCK_MODEL_MAX_BYTES", 512 * 1024 * 1024))
+
+KINDS = ['linear', 'prophet']
+
+
+def library_versions(kind):
+    """Versions that must match for a serialized model of ``kind`` to be trusted"""
+    versions = {
+        'python': sys.version.split()[0],
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+    }
+    if kind == 'linear':
+        import sklearn
+        versions['scikit-learn'] = sklearn.__version__
+    elif kind == 'prophet':
+        import prophet
+        versions['prophet'] = prophet.__version__
+    else:
+        raise ValueError(f"Unknown model kind: {kind}")
+    return versions
+
+
+def _dump(kind, model):
+    if kind == 'prophet':
+        from prophet.serialize import model_to_json
+        return model_to_json(model).encode()
+    return pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)
+
+
+def _load(kind, payload):
+    if kind == 'prophet':
+        from prophet.serialize import model_from_json
+        return model_from_json(payload.decode())
+    return pickle.loads(payload)
+
+
+class ModelRegistry:
+    """Fitted LinearRegression and Prophet models persisted per (kind, ticker, period, settings).
+
+    Each entry is a directory holding the serialized model and a ``meta.json``
+    with the ticker, data range, input hash, library versions and fit time. Only
+    the metadata is read to decide whether an entry is usable; the model itself
+    is deserialized lazily on first use and then kept in a small in-memory LRU.
+    An entry is invalidated when the input series extends past its recorded
+    range, and dropped when it was written by different library versions.
+    Disk usage is bounded by ``max_bytes``, evicting the least recently used
+    entries first.
+    """
+
+    def __init__(self, root=DEFAULT_ROOT, max_bytes=DEFAULT_MAX_BYTES, max_loaded=8):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.max_loaded = max_loaded
+        self.loads = 0
+        self.fits = 0
+        self.memory_hits = 0
+        self._loaded = OrderedDict()
+        self._lock = threading.Lock()
+
+    def entry_id(self, kind, ticker, period, settings):
+        """Directory name of the entry for one model configuration"""
+        digest = hashlib.sha256(json.dumps(settings or {}, sort_keys=True, default=str).encode()).hexdigest()[:12]
+        return f"{kind}-{(ticker or '').upper()}-{period or 'any'}-{digest}"
+
+    def metadata(self, kind, ticker, period, settings):
+        """Return the stored metadata for an entry or None"""
+        try:
+            with open(os.path.join(self.root, self.entry_id(kind, ticker, period, settings), 'meta.json')) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def get(self, kind, ticker, period, settings, series):
+        """Return the stored model fitted on exactly ``series``, or None when missing or stale"""
+        entry = self.entry_id(kind, ticker, period, settings)
+        data_hash = series_hash(series)
+        with self._lock:
+            if entry in self._loaded and self._loaded[entry][0] == data_hash:
+                self._loaded.move_to_end(entry)
+                self.memory_hits += 1
+                return self._loaded[entry][1]
+
+        meta = self.metadata(kind, ticker, period, settings)
+        if meta is None:
+            return None
+        if meta['versions'] != library_versions(kind) or series.index[-1] > pd.Timestamp(meta['end']):
+            # Newer bars (or a library upgrade) make the stored fit obsolete
+            self.invalidate(kind, ticker, period, settings)
+            return None
+        if meta['data_hash'] != data_hash:
+            return None
+
+        path = os.path.join(self.root, entry, 'model.bin')
+        try:
+            with open(path, 'rb') as f:
+                model = _load(kind, f.read())
+        except (OSError, ValueError, pickle.UnpicklingError, EOFError):
+            return None
+        # Touch the model file so disk eviction follows recency of use
+        os.utime(path)
+        with self._lock:
+            self.loads += 1
+            self._remember(entry, data_hash, model)
+        return model
+
+    def put(self, kind, ticker, period, settings, series, model, fit_seconds):
+        """Persist a freshly fitted model with its metadata"""
+        entry = self.entry_id(kind, ticker, period, settings)
+        data_hash = series_hash(series)
+        meta = {
+            'kind': kind,
+            'ticker': (ticker or '').upper(),
+            'period': period,
+            'settings': settings,
+            'start': pd.Timestamp(series.index[0]).isoformat(),
+            'end': pd.Timestamp(series.index[-1]).isoformat(),
+            'rows': len(series),
+            'data_hash': data_hash,
+            'versions': library_versions(kind),
+            'fit_seconds': fit_seconds,
+            'fitted_at': time.time(),
+        }
+        payload = _dump(kind, model)
+
+        directory = os.path.join(self.root, entry)
+        os.makedirs(directory, exist_ok=True)
+        for name, content in [('model.bin', payload), ('meta.json', json.dumps(meta, default=str).encode())]:
+            path = os.path.join(directory, name)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, 'wb') as f:
+                f.write(content)
+            os.replace(tmp, path)
+
+        with self._lock:
+            self._remember(entry, data_hash, model)
+        self._evict_disk()
+
+    def get_or_fit(self, kind, ticker, period, settings, series, fit):
+        """Return the stored model for ``series``, calling ``fit()`` and persisting it on a miss"""
+        model = self.get(kind, ticker, period, settings, series)
+        tracing.tag(model_loaded=model is not None)
+        if model is None:
+            started = time.perf_counter()
+            model = fit()
+            fit_seconds = time.perf_counter() - started
+            with self._lock:
+                self.fits += 1
+            self.put(kind, ticker, period, settings, series, model, fit_seconds)
+        return model
+
+    def invalidate(self, kind, ticker, period, settings):
+        """Remove one entry from memory and disk"""
+        entry = self.entry_id(kind, ticker, period, settings)
+        with self._lock:
+            self._loaded.pop(entry, None)
+        shutil.rmtree(os.path.join(self.root, entry), ignore_errors=True)
+
+    def stats(self):
+        """Return load/fit counters and the on-disk footprint"""
+        entries = self._entries()
+        with self._lock:
+            return {
+                'fits': self.fits,
+                'loads': self.loads,
+                'memory_hits': self.memory_hits,
+                'loaded': len(self._loaded),
+                'entries': len(entries),
+                'bytes': sum(size for _, size, _ in entries),
+            }
+
+    def clear(self):
+        """Drop every entry from memory and disk"""
+        with self._lock:
+            self._loaded.clear()
+        for entry, _, _ in self._entries():
+            shutil.rmtree(os.path.join(self.root, entry), ignore_errors=True)
+
+    def _remember(self, entry, data_hash, model):
+        self._loaded[entry] = (data_hash, model)
+        self._loaded.move_to_end(entry)
+        while len(self._loaded) > self.max_loaded:
+            self._loaded.popitem(last=False)
+
+    def _entries(self):
+        """(entry, bytes, last used) for every complete entry on disk"""
+        if not os.path.isdir(self.root):
+            return []
+        entries = []
+        for entry in os.listdir(self.root):
+            path = os.path.join(self.root, entry, 'model.bin')
+            try:
+                stat = os.stat(path)
+                size = stat.st_size + os.path.getsize(os.path.join(self.root, entry, 'meta.json'))
+            except OSError:
+                # Partially written or concurrently evicted
+                continue
+            entries.append((entry, size, stat.st_mtime))
+        return entries
+
+    def _evict_disk(self):
+        entries = sorted(self._entries(), key=lambda item: item[2])
+        total = sum(size for _, size, _ in entries)
+        for entry, size, _ in entries[:-1]:
+            if total <= self.max_bytes:
+                break
+            with self._lock:
+                self._loaded.pop(entry, None)
+            shutil.rmtree(os.path.join(self.root, entry), ignore_errors=True)
+            total -= size
+
+
+_default_registry = None
+
+
+def get_default_registry():
+    """Return the process-wide model registry"""
+    global _default_registry
+    if _default_registry is None:
+        _default_registry = ModelRegistry()
+    return _default_registry
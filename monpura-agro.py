@@ -1,13 +1,20 @@
 import streamlit as st
-from PIL import Image, ExifTags, ImageDraw, ImageFont
 import io
-import base64
+import os
+import tempfile
 from PIL import UnidentifiedImageError
 
+import batch_framing
+from framing import add_frame, open_full, open_preview
+
 # Streamlit app
 def main():
     st.title("Image Frame Adder")
 
+    if st.sidebar.radio("Mode", ["Single image", "Batch"]) == "Batch":
+        batch_page()
+        return
+
     # File uploader for image
     uploaded_image = st.file_uploader("Choose an image:", type=["jpg", "jpeg", "png"])
 
@@ -23,103 +30,85 @@ def main():
     try:
         # Button to add frame to the image
         if uploaded_image is not None:
-            # Open the uploaded image
-            img = Image.open(uploaded_image)
+            # Decode the uploaded image at display size for the preview
+            img = open_preview(uploaded_image)
 
-            # Add custom frame and product details to the image
-            framed_img = add_frame(img, custom_frame_path, product_id, price)
+            # Add custom frame and product details to the preview
+            framed_img = add_frame(img, custom_frame_path, product_id, price, copy=False)
 
             # Display the framed image
             st.image(framed_img, caption="Image with Custom Frame", use_column_width=True)
 
-        # Download link for the framed image
+        # Download button for the framed image
         if framed_img is not None:
-            download_framed_image(framed_img)
+            photo = uploaded_image.getvalue()
+            download_framed_image(lambda: add_frame(open_full(io.BytesIO(photo)), custom_frame_path,
+                                                    product_id, price, copy=False))
 
     except UnidentifiedImageError:
         st.error("Error: Unable to identify the image. Please make sure it is a valid image file.")
 
-def add_frame(img, custom_frame_path, product_id, price):
-    # Open the custom frame image
-    custom_frame = Image.open(custom_frame_path).convert("RGBA")
-
-    # Resize the frame to match the dimensions of the input image
-    custom_frame = custom_frame.resize((img.width, img.height))
-
-    # Ensure proper orientation of the input image
-    img = fix_orientation(img)
-
-    # Create a copy of the original image
-    framed_img = img.copy()
-
-    # Paste the custom frame onto the new image
-    framed_img.paste(custom_frame, (0, 0), custom_frame)
-
-    # Draw product details on the framed image
-    draw = ImageDraw.Draw(framed_img)
-
-    # Use default font for text drawing
-    font_size = 100
-    font = ImageFont.load_default()
-
-    text = f"Product ID: {product_id}\nPrice BDT: {price}"
+def batch_page():
+    st.write("Frame a whole catalog at once: upload a ZIP of photos and a CSV with "
+             "`filename`, `product_id` and `price` columns.")
+    uploaded_zip = st.file_uploader("Photos (ZIP):", type=["zip"])
+    uploaded_csv = st.file_uploader("Catalog (CSV):", type=["csv"])
+    output_format = st.selectbox("Output format:", list(batch_framing.FORMATS))
 
-    # Calculate text size using draw.textbbox method
-    text_width, text_height = calculate_text_size(draw, text, font)
+    if uploaded_zip is None or uploaded_csv is None or not st.button("Frame all images"):
+        return
 
-    draw.text(((framed_img.width - text_width) // 8, framed_img.height - text_height - 40), text, font=font, fill=(255, 255, 255, 255))
-
-
-    return framed_img
-
-
-def calculate_text_size(draw, text, font):
-    # Calculate text size using draw.textbbox method
-    dummy_img = Image.new('RGBA', (1, 1), (0, 0, 0, 0))
-    dummy_draw = ImageDraw.Draw(dummy_img)
-    text_bbox = dummy_draw.textbbox((0, 0), text, font=font)
-
-    text_width = text_bbox[2] - text_bbox[0]
-    text_height = text_bbox[3] - text_bbox[1]
-
-    return text_width, text_height
-
-def fix_orientation(img):
     try:
-        for orientation in ExifTags.TAGS.keys():
-            if ExifTags.TAGS[orientation] == 'Orientation':
-                break
-        exif = dict(img._getexif().items())
-
-        if exif[orientation] == 3:
-            img = img.rotate(180, expand=True)
-        elif exif[orientation] == 6:
-            img = img.rotate(270, expand=True)
-        elif exif[orientation] == 8:
-            img = img.rotate(90, expand=True)
-    except (AttributeError, KeyError, IndexError):
-        # No EXIF data, or certain keys not present
-        pass
-
-    return img
-
-def download_framed_image(framed_img):
-    # Save the framed image to a BytesIO buffer
-    img_buffer = io.BytesIO()
-    framed_img.save(img_buffer, format="PNG")
-
-    # Convert BytesIO buffer to bytes
-    img_bytes = img_buffer.getvalue()
-
-    # Create a download link for the framed image
-    st.markdown(get_binary_file_downloader_html(img_bytes, 'framed_image.png', 'Download Framed Image'), unsafe_allow_html=True)
-
-def get_binary_file_downloader_html(bin_file, file_label='File', button_label='Download'):
-    with io.BytesIO(bin_file) as f:
-        data = f.read()
-    bin_str = base64.b64encode(data).decode()
-    href = f'<a href="data:application/octet-stream;base64,{bin_str}" download="{file_label}">{button_label}</a>'
-    return href
+        catalog = batch_framing.read_catalog(io.TextIOWrapper(uploaded_csv, encoding='utf-8-sig', newline=''))
+    except (ValueError, UnicodeDecodeError) as e:
+        st.error(f"Error reading the catalog: {e}")
+        return
+
+    progress = st.progress(0.0, text="Framing images...")
+
+    def on_result(done, total, result):
+        progress.progress(done / total, text=f"{done}/{total} {result['name']}")
+
+    # The framed images are streamed into a file on disk rather than kept in memory. The
+    # directory lives until the session's next batch replaces it (or the session ends),
+    # and the download callback holds on to it until the button is gone
+    workdir = tempfile.TemporaryDirectory(prefix='framed-')
+    st.session_state['batch_workdir'] = workdir
+    output = os.path.join(workdir.name, 'framed_images.zip')
+    try:
+        report = batch_framing.run_batch(uploaded_zip, catalog, output, fmt=output_format,
+                                         on_result=on_result)
+    except Exception as e:
+        workdir.cleanup()
+        st.error(f"Error reading the photos: {e}")
+        return
+
+    st.success(f"Framed {report['succeeded']} of {report['images']} images in {report['seconds']:.1f}s "
+               f"({report['images_per_second']:.1f} images/sec)")
+    if report['errors']:
+        st.warning(f"{report['failed']} images failed:")
+        st.dataframe([{'File': name, 'Error': error} for name, error in report['errors'].items()],
+                     hide_index=True)
+    if report['succeeded']:
+        def read_output(workdir=workdir):
+            # Only runs when the user actually downloads
+            with open(os.path.join(workdir.name, 'framed_images.zip'), 'rb') as f:
+                return f.read()
+
+        st.download_button("Download framed images", data=read_output, file_name='framed_images.zip',
+                           mime='application/zip', on_click='ignore')
+    else:
+        workdir.cleanup()
+
+def download_framed_image(render):
+    def encode():
+        # Only runs when the user actually downloads: render at full resolution and encode
+        img_buffer = io.BytesIO()
+        render().save(img_buffer, format="PNG")
+        return img_buffer.getvalue()
+
+    st.download_button("Download Framed Image", data=encode, file_name='framed_image.png',
+                       mime='image/png', on_click='ignore')
 
 if __name__ == "__main__":
     main()
@@ -1,13 +1,12 @@
 import streamlit as st
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw
 
-# Load the predefined farm logo
+from asset_cache import get_default_cache
 
+# The predefined farm logo, decoded once per process and kept as RGBA to handle transparency
 logo_path = "images/logo1.png"  # Path to your predefined logo file
-logo = Image.open(logo_path)
-
-# Convert logo to RGBA mode to handle transparency
-logo = logo.convert("RGBA")
+assets = get_default_cache()
+logo = assets.image(logo_path)
 
 # Streamlit app title
 st.title("Animal Farm Image Customizer")
@@ -29,7 +28,7 @@ if uploaded_file:
         logo_width = image.width  # Make the logo as wide as the image
         logo_ratio = logo.width / logo.height
         logo_height = int(logo_width / logo_ratio)
-        logo = logo.resize((logo_width, logo_height))
+        logo = assets.image(logo_path, size=(logo_width, logo_height))
 
         # Create space for the logo and text at the bottom of the image
         total_height = image.height + logo.height + 100  # Adding 100px for text space
@@ -44,7 +43,7 @@ if uploaded_file:
 
         # Define font size and load a TTF font
         font_size = 40
-        font = ImageFont.truetype("arial.ttf", font_size)  # Use a TTF font like Arial
+        font = assets.font("arial.ttf", font_size)  # Use a TTF font like Arial
 
         # Define the text content
         text = f"Price: {price}\nWeight: {weight} kg\nTag: {tag}"
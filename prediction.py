@@ -0,0 +1,155 @@
+import streamlit as st
+import pandas as pd
+import numpy as np
+from sklearn.linear_model import LinearRegression
+import matplotlib.dates as mdates
+
+import fundamentals
+import rendering
+from history_store import get_default_store
+from model_registry import get_default_registry
+from regression import EPOCH_ORDINAL, date_ordinals
+
+
+# Function to load stock data and company info
+def load_data(ticker, store=None):
+    store = store if store is not None else get_default_store()
+    data = store.history(ticker, period="5y")
+    if data.empty:
+        raise ValueError(f"No data found for ticker {ticker}.")
+    data.reset_index(inplace=True)
+    return data, fundamentals.get_default_cache().info(ticker)
+
+
+# Function to prepare the data
+def prepare_data(data):
+    data['Date'] = pd.to_datetime(data['Date'])
+    data['Date_ordinal'] = date_ordinals(data['Date'])
+    X = data[['Date_ordinal']]
+    y = data['Close']
+    return X, y, data['Date']
+
+
+# Function to train the model
+def train_model(X, y, ticker=None, registry=None):
+    if len(X) > 1:
+        def fit():
+            model = LinearRegression()
+            model.fit(X, y)
+            return model
+
+        if not ticker:
+            return fit()
+        # Reuse the persisted model when it was fitted on exactly this series
+        registry = registry if registry is not None else get_default_registry()
+        dates = pd.to_datetime(X['Date_ordinal'].to_numpy() - EPOCH_ORDINAL, unit='D')
+        series = pd.Series(np.asarray(y, dtype='float64'), index=dates)
+        return registry.get_or_fit('linear', ticker, '5y', {}, series, fit)
+    else:
+        raise ValueError("Not enough data points to train the model.")
+
+
+# Function to plot predictions including future dates
+def plot_predictions(model, X, y, dates, days_to_predict=365, cache=None):
+    y_pred = model.predict(X)
+
+    # Extend the date range into the future
+    future_dates = pd.date_range(dates.iloc[-1], periods=days_to_predict, freq='D')
+    future_X = pd.DataFrame({'Date_ordinal': date_ordinals(future_dates)})
+    future_pred = model.predict(future_X)
+
+    # Plot results
+    def draw(fig):
+        ax = fig.add_subplot()
+        ax.plot(dates, y, label="Close Price", color="blue")
+        ax.plot(dates, y_pred, label="Predicted Prices", color="orange")
+        ax.plot(future_dates, future_pred, label="Future Predictions", color="green", linestyle='dashed')
+        ax.set_title("Stock Price Prediction")
+        ax.set_xlabel("Date")
+        ax.set_ylabel("Price")
+        ax.legend()
+        _format_date_axis(fig, ax)
+
+    cache = cache if cache is not None else rendering.get_default_cache()
+    key = rendering.plot_key('predictions', [dates, y, y_pred, future_pred], {'days_to_predict': days_to_predict})
+    st.image(cache.get_or_render(key, draw))
+
+
+# Improve date formatting on x-axis
+def _format_date_axis(fig, ax):
+    ax.xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m'))
+    ax.xaxis.set_major_locator(mdates.MonthLocator(interval=6))
+    fig.autofmt_xdate()  # Rotate date labels to fit
+    ax.grid(True)
+
+
+# Function to evaluate stock valuation
+def evaluate_stock(info, current_price):
+    try:
+        if current_price is None or not np.isfinite(current_price):
+            return "Unknown", "No current price is available to evaluate the stock."
+        pe_ratio = info.get('forwardPE')
+        avg_price_5y = info.get('fiftyTwoWeekHigh') * 0.7  # Simplified assumption
+
+        if pe_ratio and current_price < avg_price_5y and pe_ratio < 15:
+            valuation = "Undervalued"
+            advice = "The stock appears to be undervalued based on its P/E ratio and historical price. It might be a good time to buy."
+        elif current_price > avg_price_5y:
+            valuation = "Overvalued"
+            advice = "The stock appears to be overvalued based on its historical price. It might be a good idea to wait for a better entry point."
+        else:
+            valuation = "Fairly valued"
+            advice = "The stock appears to be fairly valued. Consider buying if you believe in the company's future prospects."
+
+        return valuation, advice
+    except Exception as e:
+        return "Unknown", f"An error occurred during evaluation: {e}"
+
+
+# Function to calculate moving averages
+def calculate_moving_averages(data, short_window=20, long_window=50, prefix=None):
+    # Reuse precomputed prefix sums when given, so changing a window never rescans the series
+    if prefix is not None:
+        data['Short_MA'] = prefix.moving_average(short_window)
+        data['Long_MA'] = prefix.moving_average(long_window)
+        return data
+    data['Short_MA'] = data['Close'].rolling(window=short_window).mean()
+    data['Long_MA'] = data['Close'].rolling(window=long_window).mean()
+    return data
+
+
+# Function to plot the crossover sweep as a heatmap of total returns
+def plot_crossover_heatmap(returns, short_windows, long_windows, ticker, cache=None):
+    def draw(fig):
+        ax = fig.add_subplot()
+        image = ax.imshow(returns, origin='lower', aspect='auto', cmap='RdYlGn',
+                          extent=[long_windows[0] - 0.5, long_windows[-1] + 0.5,
+                                  short_windows[0] - 0.5, short_windows[-1] + 0.5])
+        fig.colorbar(image, ax=ax, label="Total Return (%)")
+        ax.set_title(f"MA Crossover Returns for {ticker.upper()}")
+        ax.set_xlabel("Long-Term Window")
+        ax.set_ylabel("Short-Term Window")
+
+    cache = cache if cache is not None else rendering.get_default_cache()
+    key = rendering.plot_key('crossover_heatmap', [returns, list(short_windows), list(long_windows)],
+                             {'ticker': ticker.upper()})
+    st.image(cache.get_or_render(key, draw))
+
+
+# Function to plot moving averages
+def plot_moving_averages(data, ticker, short_window=20, long_window=50, cache=None):
+    def draw(fig):
+        ax = fig.add_subplot()
+        ax.plot(data['Date'], data['Close'], label="Close Price", color="blue")
+        ax.plot(data['Date'], data['Short_MA'], label=f"Short-Term ({short_window}-day) MA", color="orange")
+        ax.plot(data['Date'], data['Long_MA'], label=f"Long-Term ({long_window}-day) MA", color="green")
+        ax.set_title(f"Moving Average Analysis for {ticker.upper()}")
+        ax.set_xlabel("Date")
+        ax.set_ylabel("Price")
+        ax.legend()
+        _format_date_axis(fig, ax)
+
+    cache = cache if cache is not None else rendering.get_default_cache()
+    key = rendering.plot_key('moving_averages', [data['Date'], data['Close']],
+                             {'ticker': ticker.upper(), 'short_window': short_window, 'long_window': long_window})
+    st.image(cache.get_or_render(key, draw))
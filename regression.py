@@ -0,0 +1,75 @@
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+# pd.Timestamp('1970-01-01').toordinal()
+EPOCH_ORDINAL = 719163
+
+TrendFit = namedtuple('TrendFit', ['coef', 'intercept', 'fitted'])
+
+
+def date_ordinals(dates):
+    """Vectorized ``pd.Timestamp.toordinal`` for a Series, Index or array of datetimes.
+
+    Timezone-aware values use their local calendar date, as ``toordinal`` does.
+    """
+    dates = pd.DatetimeIndex(dates)
+    if dates.tz is not None:
+        dates = dates.tz_localize(None)
+    days = dates.to_numpy().astype('datetime64[D]').astype('int64')
+    return days + EPOCH_ORDINAL
+
+
+def fit_trends(x, y):
+    """Least-squares linear trend for every row of stacked arrays in one call.
+
+    ``x`` and ``y`` are (N, T) arrays (or 1-D for a single series); NaNs in ``y``
+    mark missing observations so ragged histories can share one array. Rows are
+    centred before solving the 2x2 normal equations, which keeps ordinal-scale
+    inputs well conditioned. Returns a TrendFit of (N,) slopes, (N,) intercepts
+    and the (N, T) fitted values.
+    """
+    x = np.atleast_2d(np.asarray(x, dtype='float64'))
+    y = np.atleast_2d(np.asarray(y, dtype='float64'))
+    x = np.broadcast_to(x, y.shape)
+
+    weight = ~np.isnan(y)
+    count = weight.sum(axis=1)
+    if (count < 2).any():
+        raise ValueError("Not enough data points to train the model.")
+
+    x_mean = np.where(weight, x, 0.0).sum(axis=1) / count
+    y_mean = np.where(weight, y, 0.0).sum(axis=1) / count
+    xc = np.where(weight, x - x_mean[:, None], 0.0)
+    yc = np.where(weight, y - y_mean[:, None], 0.0)
+
+    sxx = np.einsum('ij,ij->i', xc, xc)
+    sxy = np.einsum('ij,ij->i', xc, yc)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        coef = np.where(sxx > 0, sxy / sxx, 0.0)
+    intercept = y_mean - coef * x_mean
+    fitted = intercept[:, None] + coef[:, None] * x
+    return TrendFit(coef, intercept, fitted)
+
+
+def predict_trends(fit, x):
+    """Evaluate fitted trends at ``x`` ((T,) shared or (N, T) per row)"""
+    x = np.atleast_2d(np.asarray(x, dtype='float64'))
+    return fit.intercept[:, None] + fit.coef[:, None] * x
+
+
+def stack_series(series):
+    """Align {ticker: Close series indexed by date} into (tickers, ordinals (T,), closes (N, T))"""
+    tickers = list(series)
+    frame = pd.DataFrame({t: s for t, s in series.items()}).sort_index()
+    return tickers, date_ordinals(frame.index), frame.to_numpy(dtype='float64').T
+
+
+def rolling_windows(x, y, window, step=1):
+    """Stack every ``window``-long slice of one series (every ``step`` bars) for ``fit_trends``"""
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+    xs = np.lib.stride_tricks.sliding_window_view(x, window)[::step]
+    ys = np.lib.stride_tricks.sliding_window_view(y, window)[::step]
+    return xs, ys
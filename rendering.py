@@ -0,0 +1,111 @@
+import hashlib
+import io
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+import tracing
+
+
+def plot_key(name, arrays, params):
+    """Hash the plotted arrays and plot parameters into a cache key"""
+    digest = hashlib.sha256(name.encode())
+    for values in arrays:
+        if isinstance(values, (pd.Series, pd.Index)) and pd.api.types.is_datetime64_any_dtype(values):
+            values = pd.DatetimeIndex(values).as_unit('ns').asi8
+        values = np.asarray(values)
+        if values.dtype.kind == 'M':
+            values = values.astype('datetime64[ns]').view('int64')
+        values = np.ascontiguousarray(values, dtype='float64' if values.dtype.kind not in 'iu' else None)
+        digest.update(str(values.shape).encode())
+        digest.update(values.tobytes())
+    digest.update(json.dumps(params, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+
+def render_png(draw, figsize=(10, 6), dpi=100):
+    """Draw onto a standalone Figure and return it rasterized as PNG bytes.
+
+    The Figure is never registered with pyplot, so nothing keeps it alive after
+    this call; it is cleared explicitly anyway to drop artist references early.
+    """
+    fig = Figure(figsize=figsize, dpi=dpi)
+    FigureCanvasAgg(fig)
+    try:
+        draw(fig)
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format='png')
+        return buffer.getvalue()
+    finally:
+        fig.clear()
+
+
+class PlotCache:
+    """Bounded LRU of rendered PNG bytes keyed by ``plot_key``.
+
+    Evicts the least recently used images once either ``max_entries`` or
+    ``max_bytes`` is exceeded; ``max_entries=0`` disables caching.
+    """
+
+    def __init__(self, max_entries=64, max_bytes=64 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._images = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get_or_render(self, key, draw, figsize=(10, 6), dpi=100):
+        """Return cached PNG bytes for ``key``, rendering with ``draw(fig)`` on a miss"""
+        with self._lock:
+            if key in self._images:
+                self._images.move_to_end(key)
+                self.hits += 1
+                tracing.tag(plot_cache_hit=True)
+                return self._images[key]
+            self.misses += 1
+
+        tracing.tag(plot_cache_hit=False)
+        with tracing.span('matplotlib_render'):
+            png = render_png(draw, figsize, dpi)
+        with self._lock:
+            if self.max_entries > 0 and key not in self._images:
+                self._images[key] = png
+                self._bytes += len(png)
+                while self._images and (len(self._images) > self.max_entries or self._bytes > self.max_bytes):
+                    _, old = self._images.popitem(last=False)
+                    self._bytes -= len(old)
+        return png
+
+    def stats(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'entries': len(self._images),
+                'bytes': self._bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._images.clear()
+            self._bytes = 0
+
+
+_default_cache = None
+
+
+def get_default_cache():
+    """Return the process-wide plot cache shared by Streamlit sessions"""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = PlotCache()
+    return _default_cache
@@ -1,56 +1,108 @@
-import os
-
-import requests
-
-hosts = ["httpbin.org", "portswigger.net"]  # Add your 18 hosts here
-#hosts = ["http://httpbin.org", "host2", "host3"]  # Add your 18 hosts here
-ports = [80, 443]  # Add the 3 ports
-apps = ["get", "hello"]  # Add the 20 applications
-#apps = ["app1", "app2", "app3", ... ]  # Add the 20 applications
-
-failures = []
-success = []
-
-for host in hosts:
-    for port in ports:
-        for app in apps:
-            url = f"http://{host}:{port}/{app}"
-            try:
-                response = requests.get(url)
-                if response.status_code == 200:
-                    success.append(url)
-                else:
-                    failures.append(url)
-            except requests.exceptions.RequestException as e:
-                failures.append(url)
-
-# Generate a simple report
-print("Validation Summary")
-print(f"Total Successful: {len(success)}")
-print(f"Total Failed: {len(failures)}")
-print("\nFailed URLs:")
-for url in failures:
-    print(url)
-
-#Optionally, save the results to a file
-with open("validation_report.txt", "w") as report:
-    report.write(f"Total Successful: {len(success)}\n")
-    report.write(f"Total Failed: {len(failures)}\n")
-    report.write("\nFailed URLs:\n")
+"""Validate every host x port x app endpoint of a JSON matrix concurrently.
+
+Usage:
+    python sanity-test.py                               # validation_matrix.json
+    python sanity-test.py --config my_matrix.json
+    python sanity-test.py --concurrency 32 --per-host 4 --retries 3
+    python sanity-test.py --results results.csv --slo-p95 0.5 --slo-max-failures 0
+
+Results stream to --results (JSON lines, or CSV for a .csv path) as they
+complete. The exit code is 1 when any SLO threshold from the matrix's 'slo'
+section or the --slo-* options is breached, so the script can gate a deploy.
+See endpoint_validator.DEFAULT_CONFIG for every matrix setting.
+"""
+import argparse
+import sys
+import time
+
+from endpoint_validator import ReportWriter, Validator, load_matrix, slo_violations, summarize
+
+
+def _ms(seconds):
+    return '-' if seconds is None else f"{seconds * 1000:.0f}"
+
+
+def latency_table(results, by):
+    lines = [f"{by.capitalize():30s} {'n':>4s} {'fail':>4s} {'p50 ms':>8s} {'p95 ms':>8s} {'p99 ms':>8s}"]
+    for key, stats in sorted(summarize(results, by).items()):
+        lines.append(f"{str(key):30s} {stats['count']:4d} {stats['failed']:4d} {_ms(stats['p50']):>8s} "
+                     f"{_ms(stats['p95']):>8s} {_ms(stats['p99']):>8s}")
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate every endpoint of a host x port x app matrix")
+    parser.add_argument('--config', default='validation_matrix.json', help="JSON matrix file")
+    parser.add_argument('--report', default='validation_report.txt')
+    parser.add_argument('--results', default='validation_results.jsonl',
+                        help="Per-endpoint results streamed as they complete (.jsonl or .csv)")
+    parser.add_argument('--concurrency', type=int, help="Requests in flight overall")
+    parser.add_argument('--per-host', type=int, help="Requests in flight per host")
+    parser.add_argument('--connect-timeout', type=float)
+    parser.add_argument('--read-timeout', type=float)
+    parser.add_argument('--retries', type=int)
+    for name in ['p50', 'p95', 'p99', 'max']:
+        parser.add_argument(f'--slo-{name}', type=float, help=f"SLO threshold for {name} latency in seconds")
+    parser.add_argument('--slo-max-failures', type=int, help="SLO threshold for the number of failed endpoints")
+    parser.add_argument('-v', '--verbose', action='store_true', help="Print every result as it completes")
+    args = parser.parse_args()
+
+    config = load_matrix(args.config)
+    for key in ['concurrency', 'per_host', 'connect_timeout', 'read_timeout', 'retries']:
+        if getattr(args, key) is not None:
+            config[key] = getattr(args, key)
+    slo = dict(config['slo'])
+    for key in ['p50', 'p95', 'p99', 'max', 'max_failures']:
+        if getattr(args, f'slo_{key}') is not None:
+            slo[key] = getattr(args, f'slo_{key}')
+
+    with ReportWriter(args.results) as writer:
+        def on_result(result):
+            writer.write(result)
+            if args.verbose:
+                outcome = result['status'] if result['error'] is None else result['error']
+                print(f"{'OK ' if result['ok'] else 'FAIL'} {result['url']} {outcome} "
+                      f"(dns {_ms(result['dns'])} / connect {_ms(result['connect'])} / "
+                      f"ttfb {_ms(result['ttfb'])} / total {_ms(result['total'])} ms, {result['attempts']} attempts)")
+
+        started = time.perf_counter()
+        results = Validator(config).run(on_result=on_result)
+        elapsed = time.perf_counter() - started
+
+    success = [r['url'] for r in results if r['ok']]
+    failures = sorted(r['url'] for r in results if not r['ok'])
+
+    # Generate a simple report
+    print("Validation Summary")
+    print(f"Total Successful: {len(success)}")
+    print(f"Total Failed: {len(failures)}")
+    print(f"Elapsed: {elapsed:.2f}s")
+    print("\nFailed URLs:")
     for url in failures:
-        report.write(f"{url}\n")
-
-# Ensure directory is writable and save the report
-# report_file_path = "validation_report.txt"
-#
-#
-# try:
-#     with open(report_file_path, "w") as report:
-#         report.write(f"Total Successful: {len(success)}\n")
-#         report.write(f"Total Failed: {len(failures)}\n")
-#         report.write("\nFailed URLs:\n")
-#         for url in failures:
-#             report.write(f"{url}\n")
-#     print(f"\nReport successfully saved to {os.path.abspath(report_file_path)}")
-# except IOError as e:
-#     print(f"Error saving report: {e}")
+        print(url)
+    tables = ['', *latency_table(results, 'host'), '', *latency_table(results, 'app')]
+    print('\n'.join(tables))
+
+    violations = slo_violations(results, slo)
+    if violations:
+        print("\nSLO violations:")
+        for violation in violations:
+            print(violation)
+
+    with open(args.report, "w") as report:
+        report.write(f"Total Successful: {len(success)}\n")
+        report.write(f"Total Failed: {len(failures)}\n")
+        report.write("\nFailed URLs:\n")
+        for url in failures:
+            report.write(f"{url}\n")
+        report.write('\n'.join(tables) + '\n')
+        if violations:
+            report.write("\nSLO violations:\n")
+            for violation in violations:
+                report.write(f"{violation}\n")
+
+    sys.exit(1 if violations else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+import numpy as np
+import pandas as pd
+
+from history_store import get_default_store
+
+# Tickers processed per vectorized block; bounds the temporaries to a few block-sized arrays
+CHUNK_SIZE = 512
+
+
+def load_panel(tickers, period='2y', store=None):
+    """Load Close prices for ``tickers`` into one (N tickers x T bars) float64 array.
+
+    Rows are aligned on the union of trading dates; a ticker without a bar on a
+    given date has NaN there. Returns (tickers, dates, closes), dropping tickers
+    with no data.
+    """
+    store = store if store is not None else get_default_store()
+    series = {}
+    for ticker in tickers:
+        df = store.history(ticker, period=period)
+        if not df.empty:
+            index = df.index.tz_localize(None).normalize() if df.index.tz is not None else df.index.normalize()
+            series[ticker.upper()] = pd.Series(df['Close'].to_numpy(), index=index)
+    return panel_from_series(series)
+
+
+def panel_from_series(series):
+    """Align a {ticker: Close series} mapping into (tickers, dates, closes)"""
+    if not series:
+        return [], pd.DatetimeIndex([]), np.empty((0, 0))
+    dates = pd.DatetimeIndex(sorted(set().union(*(s.index for s in series.values()))))
+    closes = np.full((len(series), len(dates)), np.nan)
+    for row, s in enumerate(series.values()):
+        closes[row, dates.get_indexer(s.index)] = s.to_numpy(dtype='float64')
+    return list(series), dates, closes
+
+
+def rolling_mean(values, window):
+    """Row-wise trailing mean over ``window`` columns; NaN unless the whole window is present"""
+    valid = ~np.isnan(values)
+    # Subtract each row's first valid value before summing to keep the prefix sums small
+    first = np.argmax(valid, axis=1)
+    offset = np.where(valid.any(axis=1), values[np.arange(len(values)), first], 0.0)[:, None]
+    filled = np.where(valid, values - offset, 0.0)
+
+    csum = np.cumsum(filled, axis=1)
+    ccount = np.cumsum(valid, axis=1)
+    sums = csum.copy()
+    counts = ccount.copy()
+    sums[:, window:] -= csum[:, :-window]
+    counts[:, window:] -= ccount[:, :-window]
+
+    out = sums / window + offset
+    out[counts < window] = np.nan
+    return out
+
+
+def panel_indicators(closes):
+    """Compute MA20, MA50 and RSI(14) for every row of a (N x T) close array in one pass"""
+    ma20 = rolling_mean(closes, 20)
+    ma50 = rolling_mean(closes, 50)
+
+    delta = np.full_like(closes, np.nan)
+    delta[:, 1:] = closes[:, 1:] - closes[:, :-1]
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+    avg_gain = rolling_mean(gain, 14)
+    avg_loss = rolling_mean(loss, 14)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100 - (100 / (1 + avg_gain / avg_loss))
+    return ma20, ma50, rsi
+
+
+def screen(tickers, dates, closes, rsi_below=None, rsi_above=None, cross=None, lookback=5):
+    """Evaluate the latest indicators for every ticker and apply the filters.
+
+    ``cross`` may be 'golden' (MA20 crossed above MA50) or 'death' (crossed
+    below) within the last ``lookback`` bars. Returns a DataFrame with one row
+    per ticker that passes every filter.
+    """
+    rows = []
+    for lo in range(0, len(tickers), CHUNK_SIZE):
+        block = closes[lo:lo + CHUNK_SIZE]
+        ma20, ma50, rsi = panel_indicators(block)
+
+        last = _last_valid_index(block)
+        take = np.arange(len(block))
+        spread = ma20 - ma50
+        # The lookback + 1 spreads ending at each ticker's own last bar, so a ticker whose
+        # data stops before the union calendar still has its crossovers checked
+        columns = last[:, None] - np.arange(lookback, -1, -1)
+        window = np.where(columns >= 0, spread[take[:, None], np.maximum(columns, 0)], np.nan)
+        above = window > 0
+        below = window < 0
+        golden = (below[:, :-1] & above[:, 1:]).any(axis=1)
+        death = (above[:, :-1] & below[:, 1:]).any(axis=1)
+
+        rows.append(pd.DataFrame({
+            'Ticker': tickers[lo:lo + CHUNK_SIZE],
+            'Date': dates[last] if len(dates) else [],
+            'Close': block[take, last],
+            'MA20': ma20[take, last],
+            'MA50': ma50[take, last],
+            'RSI': rsi[take, last],
+            'Golden Cross': golden,
+            'Death Cross': death,
+        }))
+
+    result = pd.concat(rows, ignore_index=True) if rows else pd.DataFrame(
+        columns=['Ticker', 'Date', 'Close', 'MA20', 'MA50', 'RSI', 'Golden Cross', 'Death Cross'])
+
+    mask = pd.Series(True, index=result.index)
+    if rsi_below is not None:
+        mask &= result['RSI'] < rsi_below
+    if rsi_above is not None:
+        mask &= result['RSI'] > rsi_above
+    if cross == 'golden':
+        mask &= result['Golden Cross']
+    elif cross == 'death':
+        mask &= result['Death Cross']
+    return result[mask].reset_index(drop=True)
+
+
+def _last_valid_index(values):
+    """Column index of the last non-NaN value in each row (0 for all-NaN rows)"""
+    valid = ~np.isnan(values)
+    last = values.shape[1] - 1 - np.argmax(valid[:, ::-1], axis=1)
+    return np.where(valid.any(axis=1), last, 0)
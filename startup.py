@@ -0,0 +1,59 @@
+import logging
+import os
+import threading
+import time
+
+# Set STOCK_PREWARM=1 to load Prophet's Stan model and run a tiny fit when the server starts
+PREWARM = os.environ.get("STOCK_PREWARM", "0") == "1"
+
+logger = logging.getLogger(__name__)
+
+_timings = {}
+_lock = threading.Lock()
+_prewarm_thread = None
+
+
+def record(name, seconds):
+    """Record a startup latency the first time it is seen in this process; returns False on repeats"""
+    with _lock:
+        if name in _timings:
+            return False
+        _timings[name] = seconds
+    logger.info("startup %s: %.3fs", name, seconds)
+    return True
+
+
+def timings():
+    """Return every latency recorded so far, in seconds"""
+    with _lock:
+        return dict(_timings)
+
+
+def prewarm_prophet():
+    """Import Prophet, load its Stan backend and run a tiny fit so the first real fit skips that cost"""
+    started = time.perf_counter()
+    try:
+        import numpy as np
+        import pandas as pd
+        from prophet import Prophet
+
+        record('prophet_import', time.perf_counter() - started)
+        logging.getLogger('cmdstanpy').disabled = True
+        history = pd.DataFrame({'ds': pd.date_range('2020-01-01', periods=30), 'y': np.linspace(1.0, 2.0, 30)})
+        model = Prophet(yearly_seasonality=False, weekly_seasonality=False,
+                        daily_seasonality=False, uncertainty_samples=0)
+        model.fit(history)
+        model.predict(history.tail(1))
+        record('prewarm', time.perf_counter() - started)
+    except Exception:
+        logger.exception("Prophet pre-warm failed")
+
+
+def start_prewarm():
+    """Run ``prewarm_prophet`` once per process on a background thread"""
+    global _prewarm_thread
+    with _lock:
+        if _prewarm_thread is None:
+            _prewarm_thread = threading.Thread(target=prewarm_prophet, name='prewarm', daemon=True)
+            _prewarm_thread.start()
+        return _prewarm_thread
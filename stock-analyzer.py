@@ -1,248 +1,232 @@
+import time
+
+# Measured before the heavier imports below; reported once per process
+_import_started = time.perf_counter()
+
 import streamlit as st
-import yfinance as yf
-import pandas as pd
-import numpy as np
-from datetime import datetime, timedelta
-from prophet import Prophet
-import plotly.graph_objects as go
-from plotly.subplots import make_subplots
 import warnings
+from concurrent.futures import CancelledError
 
-warnings.filterwarnings('ignore')
+from background import cancel_stale, start_analysis
+from batch_forecast import load_results, parse_watchlist
+from figures import build_analysis_figure, build_forecast_figure
+from forecast_cache import get_default_cache
+from history_store import get_default_store
+import screener
+import startup
+import tracing
+from forecasters import ENGINES, FORECASTER_SETTINGS
+from stock_analysis import FAST_FORECAST_SETTINGS, FORECAST_SETTINGS, compare_forecast_settings
 
-# Configure page
-st.set_page_config(page_title="Stock Analysis & Prediction App", layout="wide")
+startup.record('import', time.perf_counter() - _import_started)
 
-def get_stock_data(ticker, period='2y'):
-    """Fetch stock data using yfinance"""
-    stock = yf.Ticker(ticker)
-    df = stock.history(period=period)
-    return stock, df
-
-def calculate_technical_indicators(df):
-    """Calculate technical indicators"""
-    # Moving averages
-    df['MA20'] = df['Close'].rolling(window=20).mean()
-    df['MA50'] = df['Close'].rolling(window=50).mean()
-
-    # RSI
-    delta = df['Close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-    rs = gain / loss
-    df['RSI'] = 100 - (100 / (1 + rs))
-
-    return df
-
-def predict_stock_price(df):
-    """Predict future stock prices using Prophet"""
-    # Prepare data for Prophet
-    prophet_df = df.reset_index()[['Date', 'Close']].rename(
-        columns={'Date': 'ds', 'Close': 'y'})
-
-    # Remove timezone information from the 'ds' column
-    prophet_df['ds'] = prophet_df['ds'].dt.tz_localize(None)
-
-    # Create and fit model
-    model = Prophet(daily_seasonality=True, weekly_seasonality=True)
-    model.fit(prophet_df)
-
-    # Make future dataframe for prediction (1 year = 365 days)
-    future = model.make_future_dataframe(periods=365)
-    forecast = model.predict(future)
-
-    return forecast
-
-
-
-def calculate_fair_value(stock):
-    """Calculate a simple fair value estimate and provide valuation signal"""
-    try:
-        # Get financial data
-        pe_ratio = stock.info.get('forwardPE', None)
-        eps = stock.info.get('forwardEps', None)
-        current_price = stock.history(period='1d')['Close'][-1]
-
-        # Simple fair value calculation
-        if pe_ratio and eps:
-            industry_avg_pe = 15  # This is a simplified assumption
-            fair_value = eps * industry_avg_pe
-
-            # Determine valuation signal
-            if current_price < fair_value:
-                signal = "Undervalued"
-            elif current_price > fair_value:
-                signal = "Overvalued"
-            else:
-                signal = "Fairly Valued"
+# Optionally load the Stan model in the background so the first fit after a scale-out is warm
+if startup.PREWARM:
+    startup.start_prewarm()
 
-            return fair_value, signal
+warnings.filterwarnings('ignore')
 
-        return None, "Data not available"
-    except Exception as e:
-        return None, str(e)
+# Configure page
+st.set_page_config(page_title="Stock Analysis & Prediction App", layout="wide")
 
 
 def main():
     st.title("📈 Stock Analysis & Prediction App")
 
+    mode = st.sidebar.radio("Mode:", ("Single Ticker", "Screener"))
+    if mode == "Screener":
+        screener_page()
+        return
+
     # User input
     ticker = st.text_input("Enter Stock Ticker:", "AAPL").upper()
 
     # Select period for stock data
     period = st.selectbox("Select period:", ['1mo', '3mo', '6mo', '1y', '2y', '5y'], index=4)
 
-    if st.button("Analyze"):
-        with st.spinner('Analyzing stock data...'):
-            # Get stock data
-            stock, df = get_stock_data(ticker, period=period)
-
-            # Calculate indicators
-            df = calculate_technical_indicators(df)
-
-            # Create columns for layout
-            col1, col2 = st.columns([2, 1])
-
-            with col1:
-                # Stock price chart
-                fig = make_subplots(rows=2, cols=1, shared_xaxes=True,
-                                    vertical_spacing=0.03, row_heights=[0.7, 0.3])
-
-                # Candlestick chart
-                fig.add_trace(
-                    go.Candlestick(
-                        x=df.index,
-                        open=df['Open'],
-                        high=df['High'],
-                        low=df['Low'],
-                        close=df['Close'],
-                        name='OHLC'
-                    ),
-                    row=1, col=1
-                )
-
-                # Add Moving Averages
-                fig.add_trace(
-                    go.Scatter(
-                        x=df.index,
-                        y=df['MA20'],
-                        name='MA20',
-                        line=dict(color='orange', width=2)
-                    ),
-                    row=1, col=1
-                )
-
-                fig.add_trace(
-                    go.Scatter(
-                        x=df.index,
-                        y=df['MA50'],
-                        name='MA50',
-                        line=dict(color='blue', width=2)
-                    ),
-                    row=1, col=1
-                )
-
-                # Add RSI
-                fig.add_trace(
-                    go.Scatter(
-                        x=df.index,
-                        y=df['RSI'],
-                        name='RSI',
-                        line=dict(color='purple', width=2)
-                    ),
-                    row=2, col=1
-                )
-
-                # Update layout
-                fig.update_layout(
-                    title=f'{ticker} Stock Analysis',
-                    title_font=dict(size=24),  # Adjust title font size
-                    yaxis_title='Stock Price (USD)',
-                    yaxis2_title='RSI',
-                    xaxis_rangeslider_visible=False,
-                    height=800,
-                    margin=dict(l=0, r=0, t=80, b=40)
-                )
-
-                # Add RSI lines
-                fig.add_hline(y=70, line_dash="dash", line_color="red", row=2, col=1)
-                fig.add_hline(y=30, line_dash="dash", line_color="green", row=2, col=1)
+    # Prophet is the accurate engine; the NumPy engines forecast in milliseconds
+    engine = st.selectbox("Forecast engine:", list(ENGINES), format_func=ENGINES.get)
+    compare = False
+    if engine == 'prophet':
+        # Forecast profile: Prophet's defaults, or the faster trading-calendar profile
+        profile = st.selectbox("Forecast profile:", ["Accurate", "Fast"])
+        settings = FORECAST_SETTINGS if profile == "Accurate" else fast_settings_form()
+        compare = profile == "Fast" and st.checkbox("Compare against the accurate profile")
+    else:
+        settings = engine_settings_form(engine)
 
-                st.plotly_chart(fig, use_container_width=True)
+    # Prefer the nightly batch output (batch_forecast.py) over computing live
+    use_batch = st.checkbox("Use nightly batch results when available", value=True)
 
-                # Display stock data table
-                st.dataframe(df.tail())
+    # A fit still running for a previous ticker, period or profile is no longer wanted
+    cancel_stale(st.session_state, ticker, period, settings)
 
-            with col2:
-                # Prophet stock prediction
+    if st.button("Analyze"):
+        request_started = time.perf_counter()
+        # The batch job runs the accurate profile only
+        # Stale results (behind the store's newest bar, or past the max age) are recomputed live
+        batch = (load_results(ticker, period, last_bar=get_default_store().last_bar(ticker))
+                 if use_batch and settings is FORECAST_SETTINGS else None)
+
+        if batch is not None:
+            df, forecast, summary = batch
+            job = None
+            st.caption(f"Showing batch results generated at {summary['generated_at']}")
+        else:
+            # Fetch and indicators run in the background, and the forecast fit is
+            # queued right behind them so it overlaps with drawing the chart
+            job = start_analysis(st.session_state, ticker, period, settings)
+            with st.spinner('Fetching stock data...'):
+                stock, df = job.history.result()
+            forecast = None
+        trace = job.trace if job is not None else tracing.Trace('stock-analyzer', ticker=ticker, period=period,
+                                                                source='batch')
+
+        # Create columns for layout
+        col1, col2 = st.columns([2, 1])
+
+        with col2:
+            # Prophet stock prediction
+            if settings is FORECAST_SETTINGS:
                 st.subheader("Stock Price Prediction (Next 1 Year)")
+            elif 'engine' in settings:
+                st.subheader(f"{ENGINES[engine]} Prediction (Next {settings['periods']} Trading Days)")
+            else:
+                st.subheader(f"Stock Price Prediction (Next {settings['periods']} Trading Days)")
+            forecast_panel = st.empty()
+            if forecast is None:
+                forecast_panel.info("Fitting forecast model...")
+
+        with col1:
+            with trace.span('analysis_chart', rows=len(df)):
+                fig = build_analysis_figure(ticker, df)
+                st.plotly_chart(fig, use_container_width=True)
 
-                forecast = predict_stock_price(df)
-
-                fig2 = go.Figure()
-
-                # Add historical data
-                fig2.add_trace(go.Scatter(
-                    x=df.index, y=df['Close'], name='Historical',
-                    mode='lines', line=dict(color='blue', width=2),
-                    hovertemplate="<b>Date:</b> %{x}<br><b>Price:</b> $%{y:.2f}<extra></extra>"
-                ))
-
-                # Add forecast data
-                fig2.add_trace(go.Scatter(
-                    x=forecast['ds'], y=forecast['yhat'], name='Forecast',
-                    mode='lines', line=dict(color='green', width=2, dash='dash'),
-                    hovertemplate="<b>Forecast Date:</b> %{x}<br><b>Predicted Price:</b> $%{y:.2f}<extra></extra>"
-                ))
-
-                # Add upper bound (yhat_upper) for confidence interval
-                fig2.add_trace(go.Scatter(
-                    x=forecast['ds'], y=forecast['yhat_upper'], name='Upper Bound',
-                    mode='lines', line=dict(color='rgba(0, 255, 0, 0.2)', width=0),
-                    showlegend=False, hoverinfo='skip'
-                ))
-
-                # Add lower bound (yhat_lower) for confidence interval
-                fig2.add_trace(go.Scatter(
-                    x=forecast['ds'], y=forecast['yhat_lower'], name='Lower Bound',
-                    mode='lines', fill='tonexty', fillcolor='rgba(0, 255, 0, 0.1)',
-                    line=dict(color='rgba(0, 255, 0, 0.2)', width=0),
-                    showlegend=False, hoverinfo='skip'
-                ))
-
-                # Customize layout to make it more attractive
-                fig2.update_layout(
-                    xaxis=dict(
-                        title="Date",
-                        tickformat="%B",  # Display month names
-                        showgrid=True, gridcolor='rgba(200, 200, 200, 0.2)',  # Light grid lines
-                    ),
-                    yaxis=dict(
-                        title="Stock Price (USD)",
-                        showgrid=True, gridcolor='rgba(200, 200, 200, 0.2)',  # Light grid lines
-                    ),
-                    title={
-                        'text': f"{ticker} Stock Price Prediction for Next 1 Year",
-                        'y': 0.9,
-                        'x': 0.5,
-                        'xanchor': 'center',
-                        'yanchor': 'top',
-                        'font': dict(size=24, color='darkblue')  # Title styling
-                    },
-                    legend=dict(
-                        orientation="h",  # Horizontal legend
-                        yanchor="bottom", y=1.02, xanchor="center", x=0.5,
-                        bgcolor='rgba(255, 255, 255, 0.7)', bordercolor='rgba(0, 0, 0, 0.1)',
-                        borderwidth=1
-                    ),
-                    hovermode="x",  # Hover mode to show details on the x-axis
-                    plot_bgcolor='rgba(0, 0, 0, 0)',  # Transparent background
-                    paper_bgcolor='rgba(0, 0, 0, 0)',  # Transparent background
-                    height=600  # Adjust height
-                )
-
-                # Display the chart
-                st.plotly_chart(fig2, use_container_width=True)
+            # Display stock data table
+            st.dataframe(df.tail())
+
+        with col2:
+            if forecast is None:
+                future = job.wait_forecast()
+                if future is None:
+                    forecast_panel.warning("Forecast cancelled.")
+                    return
+                while not future.done():
+                    forecast_panel.info(f"Fitting forecast model... {job.forecast_elapsed():.0f}s elapsed")
+                    time.sleep(0.25)
+                try:
+                    forecast = future.result()
+                except CancelledError:
+                    forecast_panel.warning("Forecast cancelled.")
+                    return
+                stats = get_default_cache().stats()
+                st.caption(f"Forecast cache: {stats['hits'] + stats['disk_hits']} hits, {stats['misses']} misses "
+                           f"(fit {job.forecast_elapsed():.1f}s)")
+
+            with trace.span('forecast_chart', rows=len(forecast)):
+                fig2 = build_forecast_figure(ticker, df, forecast)
+
+                # Display the chart in place of the progress placeholder
+                forecast_panel.plotly_chart(fig2, use_container_width=True)
+            startup.record('first_request', time.perf_counter() - request_started)
+            tracing.finish(trace, st.session_state)
+
+            if compare:
+                with st.spinner('Fitting both profiles on a 20-bar holdout...'):
+                    report = compare_forecast_settings(df, settings)
+                st.caption(f"Fast profile: {report['speedup']:.1f}x faster "
+                           f"({report['profile_seconds']:.1f}s vs {report['baseline_seconds']:.1f}s), "
+                           f"holdout MAE {report['profile_mae']:.2f} vs {report['baseline_mae']:.2f} "
+                           f"({report['mae_delta']:+.2f}), interval coverage "
+                           f"{report['profile_coverage']:.0f}% vs {report['baseline_coverage']:.0f}%")
+
+    startup_panel()
+    tracing.timing_panel()
+
+
+def fast_settings_form():
+    """Options for the fast forecast profile; returns its settings dict"""
+    with st.expander("Fast profile options"):
+        periods = st.slider("Horizon (trading days)", min_value=21, max_value=504,
+                            value=FAST_FORECAST_SETTINGS['periods'])
+        calendar = st.selectbox("Horizon calendar:", ['nyse', 'business'],
+                                format_func=lambda c: {'nyse': "NYSE trading days", 'business': "Weekdays"}[c])
+        weekly = st.checkbox("Weekly seasonality", value=FAST_FORECAST_SETTINGS['weekly_seasonality'])
+        daily = st.checkbox("Daily seasonality", value=FAST_FORECAST_SETTINGS['daily_seasonality'])
+        interval = st.radio("Uncertainty interval:", ['analytic', 'sampled'],
+                            format_func=lambda i: {'analytic': "Analytic (no sampling)", 'sampled': "Sampled"}[i])
+        settings = dict(FAST_FORECAST_SETTINGS, periods=periods, calendar=calendar,
+                        weekly_seasonality=weekly, daily_seasonality=daily, interval=interval)
+        if interval == 'sampled':
+            settings['uncertainty_samples'] = st.slider("Uncertainty samples", min_value=50, max_value=1000, value=200)
+    return settings
+
+
+def engine_settings_form(engine):
+    """Options for the NumPy forecast engines; returns the settings dict including the engine"""
+    with st.expander("Forecast options"):
+        settings = {
+            'engine': engine,
+            'periods': st.slider("Horizon (trading days)", min_value=21, max_value=504,
+                                 value=FORECASTER_SETTINGS['periods']),
+            'calendar': st.selectbox("Horizon calendar:", ['nyse', 'business'],
+                                     format_func=lambda c: {'nyse': "NYSE trading days", 'business': "Weekdays"}[c]),
+        }
+        if engine == 'holt_winters':
+            settings['season_length'] = st.selectbox("Seasonal cycle (bars):", [5, 1, 21],
+                                                     format_func=lambda m: {5: "Weekly (5)", 1: "None", 21: "Monthly (21)"}[m])
+        elif engine == 'ridge':
+            settings['lags'] = st.slider("Lagged returns", min_value=1, max_value=60, value=FORECASTER_SETTINGS['lags'])
+    return settings
+
+
+def startup_panel():
+    """Sidebar report of this process's import, pre-warm and first-request latencies"""
+    timings = startup.timings()
+    with st.sidebar.expander("Startup latency"):
+        for name, seconds in timings.items():
+            st.write(f"{name.replace('_', ' ').capitalize()}: {seconds:.2f}s")
+        if 'prewarm' not in timings and startup.PREWARM:
+            st.caption("Prophet pre-warm running...")
+
+
+def screener_page():
+    st.subheader("Multi-Ticker Screener")
+
+    watchlist = st.text_area("Tickers (comma or newline separated):", "AAPL, MSFT, GOOGL, AMZN, META, NVDA, TSLA")
+    uploaded = st.file_uploader("...or upload a watchlist file:", type=["txt", "csv"])
+    period = st.selectbox("Select period:", ['6mo', '1y', '2y', '5y'], index=2)
+
+    rsi_filter = st.selectbox("RSI filter:", ["Any", "Oversold (RSI below)", "Overbought (RSI above)"])
+    rsi_level = st.slider("RSI level", min_value=5, max_value=95, value=30)
+    cross_options = {
+        "Any": None,
+        "Golden cross (MA20 above MA50)": 'golden',
+        "Death cross (MA20 below MA50)": 'death',
+    }
+    cross = st.selectbox("MA20/MA50 crossover:", list(cross_options))
+    lookback = st.slider("Crossover within the last N bars", min_value=1, max_value=30, value=5)
+
+    if st.button("Screen"):
+        text = uploaded.getvalue().decode() if uploaded is not None else watchlist
+        tickers = parse_watchlist(text)
+        if not tickers:
+            st.warning("Please enter at least one ticker.")
+            return
+
+        with st.spinner(f'Screening {len(tickers)} tickers...'):
+            names, dates, closes = screener.load_panel(tickers, period=period)
+            results = screener.screen(
+                names, dates, closes,
+                rsi_below=rsi_level if rsi_filter.startswith("Oversold") else None,
+                rsi_above=rsi_level if rsi_filter.startswith("Overbought") else None,
+                cross=cross_options[cross],
+                lookback=lookback,
+            )
+
+        missing = len(tickers) - len(names)
+        st.write(f"{len(results)} of {len(names)} tickers match" + (f" ({missing} without data)" if missing else ""))
+        st.dataframe(results.sort_values('RSI'), use_container_width=True)
 
 
 if __name__ == "__main__":
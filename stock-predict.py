@@ -1,115 +1,18 @@
-import streamlit as st
-import yfinance as yf
-import pandas as pd
 import numpy as np
-from sklearn.linear_model import LinearRegression
-import matplotlib.pyplot as plt
-import matplotlib.dates as mdates
-
-
-# Function to load stock data and company info
-def load_data(ticker):
-    stock = yf.Ticker(ticker)
-    data = stock.history(period="5y")
-    if data.empty:
-        raise ValueError(f"No data found for ticker {ticker}.")
-    data.reset_index(inplace=True)
-    return data, stock.info
-
-
-# Function to prepare the data
-def prepare_data(data):
-    data['Date'] = pd.to_datetime(data['Date'])
-    data['Date_ordinal'] = data['Date'].map(pd.Timestamp.toordinal)
-    X = data[['Date_ordinal']]
-    y = data['Close']
-    return X, y, data['Date']
-
-
-# Function to train the model
-def train_model(X, y):
-    if len(X) > 1:
-        model = LinearRegression()
-        model.fit(X, y)
-        return model
-    else:
-        raise ValueError("Not enough data points to train the model.")
-
-
-# Function to plot predictions including future dates
-def plot_predictions(model, X, y, dates, days_to_predict=365):
-    y_pred = model.predict(X)
-
-    # Extend the date range into the future
-    future_dates = pd.date_range(dates.iloc[-1], periods=days_to_predict, freq='D')
-    future_X = np.array(future_dates.map(pd.Timestamp.toordinal)).reshape(-1, 1)
-    future_pred = model.predict(future_X)
-
-    # Plot results
-    plt.figure(figsize=(10, 6))
-    plt.plot(dates, y, label="Close Price", color="blue")
-    plt.plot(dates, y_pred, label="Predicted Prices", color="orange")
-    plt.plot(future_dates, future_pred, label="Future Predictions", color="green", linestyle='dashed')
-    plt.title("Stock Price Prediction")
-    plt.xlabel("Date")
-    plt.ylabel("Price")
-    plt.legend()
-
-    # Improve date formatting on x-axis
-    plt.gca().xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m'))
-    plt.gca().xaxis.set_major_locator(mdates.MonthLocator(interval=6))
-    plt.gcf().autofmt_xdate()  # Rotate date labels to fit
-
-    plt.grid(True)
-    st.pyplot(plt)
-
-
-# Function to evaluate stock valuation
-def evaluate_stock(info, current_price):
-    try:
-        pe_ratio = info.get('forwardPE')
-        avg_price_5y = info.get('fiftyTwoWeekHigh') * 0.7  # Simplified assumption
-
-        if pe_ratio and current_price < avg_price_5y and pe_ratio < 15:
-            valuation = "Undervalued"
-            advice = "The stock appears to be undervalued based on its P/E ratio and historical price. It might be a good time to buy."
-        elif current_price > avg_price_5y:
-            valuation = "Overvalued"
-            advice = "The stock appears to be overvalued based on its historical price. It might be a good idea to wait for a better entry point."
-        else:
-            valuation = "Fairly valued"
-            advice = "The stock appears to be fairly valued. Consider buying if you believe in the company's future prospects."
-
-        return valuation, advice
-    except Exception as e:
-        return "Unknown", f"An error occurred during evaluation: {e}"
-
-
-# Function to calculate moving averages
-def calculate_moving_averages(data, short_window=20, long_window=50):
-    data['Short_MA'] = data['Close'].rolling(window=short_window).mean()
-    data['Long_MA'] = data['Close'].rolling(window=long_window).mean()
-    return data
-
-
-# Function to plot moving averages
-def plot_moving_averages(data, ticker):
-    plt.figure(figsize=(10, 6))
-    plt.plot(data['Date'], data['Close'], label="Close Price", color="blue")
-    plt.plot(data['Date'], data['Short_MA'], label=f"Short-Term ({short_window}-day) MA", color="orange")
-    plt.plot(data['Date'], data['Long_MA'], label=f"Long-Term ({long_window}-day) MA", color="green")
-    plt.title(f"Moving Average Analysis for {ticker.upper()}")
-    plt.xlabel("Date")
-    plt.ylabel("Price")
-    plt.legend()
-
-    # Improve date formatting on x-axis
-    plt.gca().xaxis.set_major_formatter(mdates.DateFormatter('%Y-%m'))
-    plt.gca().xaxis.set_major_locator(mdates.MonthLocator(interval=6))
-    plt.gcf().autofmt_xdate()  # Rotate date labels to fit
+import streamlit as st
 
-    plt.grid(True)
-    st.pyplot(plt)
+from crossover import LONG_WINDOWS, PrefixSums, SHORT_WINDOWS, crossover_returns
+from prediction import (
+    calculate_moving_averages,
+    evaluate_stock,
+    load_data,
+    plot_crossover_heatmap,
+    plot_moving_averages,
+    plot_predictions,
+    prepare_data,
+    train_model,
+)
+import tracing
 
 
 # Main layout
@@ -129,21 +32,27 @@ if option == "Stock Price Prediction":
 
     if col1.button("Predict"):  # Button to trigger the prediction
         if ticker:
+            trace = tracing.Trace('stock-predict', ticker=ticker.upper(), page='prediction')
             try:
                 # Load and prepare data
-                data, info = load_data(ticker)
+                with trace.span('fetch', ticker=ticker.upper()) as tags:
+                    data, info = load_data(ticker)
+                    tags['rows'] = len(data)
 
                 if data.empty or len(data) < 2:
                     raise ValueError("Not enough data available to make predictions.")
 
-                X, y, dates = prepare_data(data)
+                with trace.span('prepare', rows=len(data)):
+                    X, y, dates = prepare_data(data)
 
                 # Train the model
-                model = train_model(X, y)
+                with trace.span('train', rows=len(X)):
+                    model = train_model(X, y, ticker)
 
                 # Display predictions
                 col2.subheader(f"Stock Price Prediction for {ticker.upper()}")
-                plot_predictions(model, X, y, dates)
+                with trace.span('predictions_chart', rows=len(X)):
+                    plot_predictions(model, X, y, dates)
 
                 # Display valuation analysis
                 current_price = data['Close'].iloc[-1]
@@ -153,6 +62,7 @@ if option == "Stock Price Prediction":
                 col2.write(advice)
             except Exception as e:
                 col1.error(f"An error occurred: {e}")
+            tracing.finish(trace, st.session_state)
         else:
             col1.warning("Please enter a valid stock ticker symbol.")
 
@@ -160,23 +70,54 @@ elif option == "Moving Average Analysis":
     col1.subheader("Moving Average Analysis")
     ticker = col1.text_input("Enter Stock Ticker for Analysis (e.g., AAPL, MSFT):")
 
+    # Sliders live outside the button so moving them reuses the loaded series
+    short_window = col1.slider("Short-Term Moving Average Window", min_value=5, max_value=50, value=20)
+    long_window = col1.slider("Long-Term Moving Average Window", min_value=20, max_value=200, value=50)
+    run_sweep = col1.checkbox("Sweep all window pairs (crossover return heatmap)")
+
     if col1.button("Analyze"):
         if ticker:
             try:
-                # Load data and calculate moving averages
-                data, _ = load_data(ticker)
+                # Load data once and precompute prefix sums for every later window choice
+                trace = tracing.Trace('stock-predict', ticker=ticker.upper(), page='moving_averages')
+                with trace.span('fetch', ticker=ticker.upper()) as tags:
+                    data, _ = load_data(ticker)
+                    tags['rows'] = len(data)
                 if data.empty:
                     raise ValueError("No data available for the given ticker.")
-
-                short_window = col1.slider("Short-Term Moving Average Window", min_value=5, max_value=50, value=20)
-                long_window = col1.slider("Long-Term Moving Average Window", min_value=20, max_value=200, value=50)
-
-                data = calculate_moving_averages(data, short_window, long_window)
-
-                # Plot moving averages
-                col2.subheader(f"Moving Average Analysis for {ticker.upper()}")
-                plot_moving_averages(data, ticker)
+                with trace.span('prefix_sums', rows=len(data)):
+                    prefix = PrefixSums(data['Close'])
+                st.session_state['ma_analysis'] = (ticker.upper(), data, prefix)
+                st.session_state['ma_trace'] = trace
             except Exception as e:
                 col1.error(f"An error occurred: {e}")
         else:
             col1.warning("Please enter a valid stock ticker symbol.")
+
+    loaded = st.session_state.get('ma_analysis')
+    if loaded is not None and loaded[0] == ticker.upper():
+        loaded_ticker, data, prefix = loaded
+        # Slider reruns reuse the loaded series, so they get a trace without a fetch stage
+        trace = st.session_state.pop('ma_trace', None) or tracing.Trace(
+            'stock-predict', ticker=loaded_ticker, page='moving_averages')
+        with trace.span('moving_averages', rows=len(data)):
+            data = calculate_moving_averages(data.copy(), short_window, long_window, prefix)
+
+        # Plot moving averages
+        col2.subheader(f"Moving Average Analysis for {loaded_ticker}")
+        with col2:
+            with trace.span('moving_averages_chart', rows=len(data)):
+                plot_moving_averages(data, loaded_ticker, short_window, long_window)
+
+            if run_sweep:
+                with trace.span('crossover_sweep', pairs=len(SHORT_WINDOWS) * len(LONG_WINDOWS)):
+                    returns = crossover_returns(data['Close'], SHORT_WINDOWS, LONG_WINDOWS, prefix)
+                best = np.unravel_index(np.nanargmax(returns), returns.shape)
+                st.subheader("Crossover Sweep")
+                st.write(f"Best pair: {SHORT_WINDOWS[best[0]]}/{LONG_WINDOWS[best[1]]}-day "
+                         f"with {returns[best]:.1f}% total return")
+                with trace.span('heatmap_chart'):
+                    plot_crossover_heatmap(returns, SHORT_WINDOWS, LONG_WINDOWS, loaded_ticker)
+        tracing.finish(trace, st.session_state)
+
+tracing.timing_panel()
@@ -0,0 +1,250 @@
+import copy
+import time
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from forecast_cache import forecast_key, get_default_cache
+import fundamentals
+from history_store import get_default_store
+from market_calendar import future_dates
+from model_registry import get_default_registry
+import tracing
+import warm_start
+
+
+def get_stock_data(ticker, period='2y', store=None):
+    """Fetch stock data through the local history store, downloading only missing bars"""
+    import yfinance as yf
+
+    store = store if store is not None else get_default_store()
+    stock = yf.Ticker(ticker)
+    df = store.history(ticker, period=period)
+    return stock, df
+
+def calculate_technical_indicators(df):
+    """Calculate technical indicators"""
+    # Moving averages
+    df['MA20'] = df['Close'].rolling(window=20).mean()
+    df['MA50'] = df['Close'].rolling(window=50).mean()
+
+    # RSI
+    delta = df['Close'].diff()
+    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
+    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
+    rs = gain / loss
+    df['RSI'] = 100 - (100 / (1 + rs))
+
+    return df
+
+# Prophet settings used by predict_stock_price; part of the forecast cache key
+FORECAST_SETTINGS = {
+    'daily_seasonality': True,
+    'weekly_seasonality': True,
+    'periods': 365,
+    # Initialise each refit from the ticker's previous fit when the changepoint grid allows it
+    'warm_start': True,
+}
+
+# Faster profile for daily bars: one trading year on the NYSE calendar, no intraday
+# seasonality (there is one bar per day) and closed-form intervals instead of
+# Prophet's 1,000 simulated trend paths
+FAST_FORECAST_SETTINGS = {
+    'daily_seasonality': False,
+    'weekly_seasonality': True,
+    'periods': 252,
+    'calendar': 'nyse',
+    'interval': 'analytic',
+    'warm_start': True,
+}
+
+FORECAST_PROFILES = {
+    'accurate': FORECAST_SETTINGS,
+    'fast': FAST_FORECAST_SETTINGS,
+}
+
+# Settings that only change prediction, not the fitted parameters
+PREDICTION_SETTINGS = ['periods', 'calendar', 'interval', 'uncertainty_samples']
+
+
+def predict_stock_price(df, ticker=None, period=None, cache=None, settings=None, registry=None, warm_starts=None):
+    """Predict future stock prices using Prophet, reusing cached forecasts for identical inputs.
+
+    ``cache``, ``registry`` and ``warm_starts`` default to the process-wide stores.
+    """
+    settings = settings if settings is not None else FORECAST_SETTINGS
+    cache = cache if cache is not None else get_default_cache()
+    key = forecast_key(ticker, period, settings, df['Close'])
+    forecast = cache.get(key)
+    tracing.tag(cache_hit=forecast is not None)
+    if forecast is None:
+        forecast = fit_prophet_forecast(df, settings, ticker, warm_starts, period, registry)
+        cache.put(key, forecast)
+    return forecast
+
+
+def fit_prophet_forecast(df, settings, ticker=None, warm_starts=None, period=None, registry=None):
+    """Fit Prophet on the Close series and forecast ``settings['periods']`` days ahead.
+
+    With a ticker, a model already fitted on the same series is loaded from the
+    model registry instead of refitted. With ``settings['warm_start']`` a refit
+    starts from the ticker's previous fit (k, m, delta, beta, sigma_obs) and
+    falls back to a cold fit when the changepoint grid or seasonal terms have
+    changed.
+
+    ``settings['calendar']`` ('calendar', 'business' or 'nyse') picks the
+    horizon dates. ``settings['interval']`` is 'sampled' (Prophet's simulation
+    with ``uncertainty_samples`` draws, 1,000 by default) or 'analytic'.
+    """
+    # Prepare data for Prophet
+    prophet_df = df.reset_index()[['Date', 'Close']].rename(
+        columns={'Date': 'ds', 'Close': 'y'})
+
+    # Remove timezone information from the 'ds' column
+    prophet_df['ds'] = prophet_df['ds'].dt.tz_localize(None)
+
+    def fit():
+        from prophet import Prophet
+
+        # Create and fit model
+        model = Prophet(daily_seasonality=settings['daily_seasonality'],
+                        weekly_seasonality=settings['weekly_seasonality'])
+        init = None
+        if settings.get('warm_start') and ticker:
+            starts = warm_starts if warm_starts is not None else warm_start.get_default_store()
+            init = starts.init_for(ticker, prophet_df['ds'], settings)
+
+        started = time.perf_counter()
+        with tracing.span('prophet_fit', rows=len(prophet_df), warm=init is not None):
+            if init is not None:
+                model.fit(prophet_df, init=init)
+            else:
+                model.fit(prophet_df)
+        if settings.get('warm_start') and ticker:
+            starts.save(ticker, model, prophet_df['ds'], settings,
+                        time.perf_counter() - started, warm=init is not None)
+        return model
+
+    if ticker:
+        registry = registry if registry is not None else get_default_registry()
+        # Prediction-only settings don't change the fit, so every horizon and interval shares one stored model
+        model_settings = {k: v for k, v in settings.items() if k not in PREDICTION_SETTINGS}
+        model = registry.get_or_fit('prophet', ticker, period, model_settings, df['Close'], fit)
+    else:
+        model = fit()
+
+    # Make future dataframe for prediction (1 year = 365 days by default)
+    calendar = settings.get('calendar', 'calendar')
+    if calendar == 'calendar':
+        future = model.make_future_dataframe(periods=settings['periods'])
+    else:
+        horizon = future_dates(prophet_df['ds'].iloc[-1], settings['periods'], calendar)
+        future = pd.DataFrame({'ds': pd.concat([prophet_df['ds'], pd.Series(horizon)], ignore_index=True)})
+
+    analytic = settings.get('interval', 'sampled') == 'analytic'
+    # The fitted model is shared through the registry across sessions and threads, so
+    # the interval setting goes on a shallow per-call copy (predict only reads the fit)
+    model = copy.copy(model)
+    model.uncertainty_samples = 0 if analytic else settings.get('uncertainty_samples', 1000)
+    with tracing.span('prophet_predict', rows=len(future), samples=model.uncertainty_samples):
+        forecast = model.predict(future)
+    if analytic:
+        forecast['yhat_lower'], forecast['yhat_upper'] = analytic_interval(model, forecast['ds'], forecast['yhat'])
+
+    return forecast
+
+
+def analytic_interval(model, ds, yhat):
+    """Closed-form version of Prophet's simulated uncertainty interval.
+
+    Prophet simulates future trend changepoints at the historical rate (one per
+    ``len(changepoints_t)`` per unit of scaled time) with Laplace(0, mean |delta|)
+    rate changes, and adds Gaussian noise with ``sigma_obs``. Those slope changes
+    accumulate into a trend deviation with variance ``2 * rate * lambda**2 * h**3 / 3``
+    at ``h`` scaled time past the history, so the interval is yhat plus or minus
+    z times the combined standard deviation, without sampling.
+    """
+    t = (pd.to_datetime(ds) - model.start) / model.t_scale
+    h = np.clip(t.to_numpy(dtype='float64') - 1, 0, None)
+    rate = len(model.changepoints_t)
+    lam = np.mean(np.abs(model.params['delta'])) + 1e-8
+    sigma_obs = float(np.mean(model.params['sigma_obs']))
+    sd = model.y_scale * np.sqrt(sigma_obs ** 2 + 2 * rate * lam ** 2 * h ** 3 / 3)
+    z = NormalDist().inv_cdf(0.5 + model.interval_width / 2)
+    return yhat - z * sd, yhat + z * sd
+
+
+def compare_forecast_settings(df, settings, baseline=FORECAST_SETTINGS, holdout=20):
+    """Time ``settings`` against ``baseline`` and compare their accuracy on the last ``holdout`` bars.
+
+    Both profiles are fitted cold (no ticker, so no registry or warm start) on
+    everything but the holdout. Returns seconds, speedup, holdout MAE and
+    interval coverage for each, and the mean absolute gap between the two
+    forecasts over the holdout.
+    """
+    train, test = df.iloc[:-holdout], df.iloc[-holdout:]
+    test_ds = test.index.tz_localize(None) if test.index.tz is not None else test.index
+    test_ds = test_ds.normalize()
+
+    report = {'holdout': holdout}
+    predictions = {}
+    for name, profile in [('baseline', baseline), ('profile', settings)]:
+        # The horizon has to reach past the holdout on either calendar
+        profile = dict(profile, periods=max(profile['periods'], 2 * holdout))
+        started = time.perf_counter()
+        forecast = fit_prophet_forecast(train, profile)
+        report[f'{name}_seconds'] = time.perf_counter() - started
+
+        forecast = forecast.set_index(forecast['ds'].dt.normalize())
+        matched = forecast.reindex(test_ds)
+        actual = test['Close'].to_numpy()
+        inside = (actual >= matched['yhat_lower'].to_numpy()) & (actual <= matched['yhat_upper'].to_numpy())
+        predictions[name] = matched['yhat'].to_numpy()
+        report[f'{name}_mae'] = float(np.nanmean(np.abs(predictions[name] - actual)))
+        report[f'{name}_coverage'] = float(np.mean(inside) * 100)
+        report[f'{name}_rows'] = len(forecast)
+
+    report['speedup'] = report['baseline_seconds'] / report['profile_seconds']
+    report['mae_delta'] = report['profile_mae'] - report['baseline_mae']
+    report['forecast_gap'] = float(np.nanmean(np.abs(predictions['profile'] - predictions['baseline'])))
+    return report
+
+
+def calculate_fair_value(stock, df=None, fundamentals_cache=None):
+    """Calculate a simple fair value estimate and provide valuation signal.
+
+    ``stock.info`` is read once through the TTL-cached fundamentals service, and
+    the current price is the last close of ``df`` when history is already loaded.
+    """
+    fundamentals_cache = fundamentals_cache if fundamentals_cache is not None else fundamentals.get_default_cache()
+    try:
+        # Get financial data
+        info = fundamentals_cache.info(stock.ticker)
+        pe_ratio = info.get('forwardPE', None)
+        eps = info.get('forwardEps', None)
+        if df is not None and not df.empty:
+            current_price = df['Close'].iloc[-1]
+        else:
+            current_price = stock.history(period='1d')['Close'].iloc[-1]
+
+        # Simple fair value calculation
+        if pe_ratio and eps:
+            industry_avg_pe = fundamentals.INDUSTRY_AVG_PE  # This is a simplified assumption
+            fair_value = eps * industry_avg_pe
+
+            # Determine valuation signal
+            if not (np.isfinite(current_price) and np.isfinite(fair_value)):
+                signal = "N/A"
+            elif current_price < fair_value:
+                signal = "Undervalued"
+            elif current_price > fair_value:
+                signal = "Overvalued"
+            else:
+                signal = "Fairly Valued"
+
+            return fair_value, signal
+
+        return None, "Data not available"
+    except Exception as e:
+        return None, str(e)
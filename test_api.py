@@ -0,0 +1,217 @@
+import json
+import threading
+from concurrent.futures import Future
+
+import pandas as pd
+import pytest
+
+import api
+import fundamentals
+import stock_analysis
+import warm_start
+from api import ApiService
+from bench import synthetic_ohlcv
+from forecast_cache import ForecastCache
+from fundamentals import FundamentalsCache
+from history_store import FrameProvider, HistoryStore
+from model_registry import ModelRegistry
+from warm_start import WarmStartStore
+
+
+class InlineExecutor:
+    """Runs each job during submit, so its future is already done when submit returns"""
+
+    def submit(self, fn):
+        future = Future()
+        future.set_result(fn())
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        pass
+
+
+def make_service(tmp_path):
+    store = HistoryStore(str(tmp_path / 'history'), provider=FrameProvider({}))
+    cache = FundamentalsCache(str(tmp_path / 'fundamentals'), fetcher=lambda ticker: {})
+    return ApiService(store=store, fundamentals_cache=cache)
+
+
+def call_with_timeout(fn, timeout=5):
+    result = {}
+    thread = threading.Thread(target=lambda: result.setdefault('value', fn()), daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "call did not return (deadlock?)"
+    return result['value']
+
+
+def test_fit_that_finishes_immediately_does_not_deadlock(tmp_path):
+    service = make_service(tmp_path)
+    service._fits = InlineExecutor()
+
+    body = call_with_timeout(lambda: service._body('"tag"', lambda: {'ok': True}, slow=True))
+
+    assert body == b'{"ok": true}'
+    assert service._inflight == {}
+    assert service._responses['"tag"'] == body
+    status, _, _ = call_with_timeout(lambda: service.handle('/health'))
+    assert status == 200
+
+
+def test_concurrent_fast_fits_share_the_pool(tmp_path):
+    service = make_service(tmp_path)
+    try:
+        results = [None] * 8
+
+        def request(i):
+            results[i] = service._body(f'"tag-{i % 2}"', lambda: {'i': i % 2}, slow=True)
+
+        threads = [threading.Thread(target=request, args=(i,), daemon=True) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(5)
+        assert not any(thread.is_alive() for thread in threads)
+        assert sorted(set(results)) == [b'{"i": 0}', b'{"i": 1}']
+    finally:
+        service.close()
+
+
+def recent_csv_dir(tmp_path, tickers=('AAPL',), bars=600):
+    # Bars ending today, so every period of the history store has data
+    directory = tmp_path / 'csv'
+    directory.mkdir()
+    start = (pd.Timestamp.now().normalize() - pd.offsets.BDay(bars - 1)).strftime('%Y-%m-%d')
+    for seed, ticker in enumerate(tickers):
+        synthetic_ohlcv(bars, seed=seed, start=start).to_csv(directory / f'{ticker}.csv')
+    return str(directory)
+
+
+def test_offline_service_never_uses_the_live_stores(tmp_path, monkeypatch):
+    def live(*args, **kwargs):
+        raise AssertionError("offline service used a live store")
+
+    for module, name in [(api, 'get_default_store'), (fundamentals, 'get_default_cache'),
+                         (stock_analysis, 'get_default_cache'), (stock_analysis, 'get_default_registry'),
+                         (warm_start, 'get_default_store')]:
+        monkeypatch.setattr(module, name, live)
+
+    root = tmp_path / 'scratch'
+    service = api.offline_service(recent_csv_dir(tmp_path), str(root))
+    try:
+        status, _, body = service.handle('/valuation?tickers=AAPL')
+        assert status == 200
+        assert json.loads(body)['rows'][0]['Valuation'] == 'Unknown'
+
+        status, _, body = service.handle('/forecast/AAPL?period=1y')
+        assert status == 200, body
+    finally:
+        service.close()
+    assert {'history', 'forecasts', 'models', 'warm_start'} <= {path.name for path in root.iterdir()}
+
+
+INFOS = {'AAPL': {'forwardPE': 20.0, 'forwardEps': 6.0, 'fiftyTwoWeekHigh': 150.0}}
+
+
+@pytest.fixture
+def service(tmp_path):
+    start = (pd.Timestamp.now().normalize() - pd.offsets.BDay(599)).strftime('%Y-%m-%d')
+    store = HistoryStore(str(tmp_path / 'history'), provider=FrameProvider({'AAPL': synthetic_ohlcv(600, start=start)}))
+    service = ApiService(
+        store=store,
+        fundamentals_cache=FundamentalsCache(str(tmp_path / 'fundamentals'), fetcher=lambda ticker: INFOS.get(ticker)),
+        forecast_cache=ForecastCache(str(tmp_path / 'forecasts')),
+        registry=ModelRegistry(str(tmp_path / 'models')),
+        warm_starts=WarmStartStore(str(tmp_path / 'warm_start')),
+        workers=1, max_pending=1)
+    yield service
+    service.close()
+
+
+def get_json(service, path):
+    status, headers, body = service.handle(path)
+    assert status == 200, body
+    return headers, json.loads(body)
+
+
+def test_indicators_endpoint(service):
+    headers, payload = get_json(service, '/indicators/aapl?period=1y')
+    assert headers['ETag'].startswith('"')
+    assert (payload['ticker'], payload['period']) == ('AAPL', '1y')
+    assert set(payload['rows'][0]) == {'Date', 'Close', 'MA20', 'MA50', 'RSI'}
+    assert payload['rows'][-1]['MA50'] is not None
+
+
+def test_linear_endpoint(service):
+    _, payload = get_json(service, '/linear/AAPL?period=2y&days=30')
+    assert set(payload) == {'ticker', 'period', 'coef', 'intercept', 'last_close', 'predictions'}
+    assert len(payload['predictions']) == 30
+    assert set(payload['predictions'][0]) == {'Date', 'Predicted'}
+
+
+def test_forecast_endpoint(service):
+    _, payload = get_json(service, '/forecast/AAPL?period=1y')
+    assert set(payload['rows'][0]) == {'ds', 'yhat', 'yhat_lower', 'yhat_upper'}
+    assert len(payload['rows']) > 252
+
+
+def test_valuation_endpoint(service):
+    _, payload = get_json(service, '/valuation?tickers=AAPL,MISSING')
+    rows = {row['Ticker']: row for row in payload['rows']}
+    assert set(rows['AAPL']) == {'Ticker', 'Price', 'Fair Value', 'Signal', 'Valuation'}
+    assert rows['AAPL']['Fair Value'] == pytest.approx(6.0 * fundamentals.INDUSTRY_AVG_PE)
+    assert rows['MISSING']['Signal'] == 'Data not available'
+
+
+def test_health_endpoint(service):
+    get_json(service, '/indicators/AAPL')
+    _, payload = get_json(service, '/health')
+    assert payload['requests'] == 2
+    assert payload['computed'] == 1
+
+
+def test_matching_etag_returns_304_without_computing(service):
+    headers, _ = get_json(service, '/indicators/AAPL')
+    status, again, body = service.handle('/indicators/AAPL', if_none_match=f'"other", {headers["ETag"]}')
+    assert (status, body) == (304, b'')
+    assert again['ETag'] == headers['ETag']
+    assert service.handle('/indicators/AAPL?period=5y', headers['ETag'])[0] == 200
+    assert (service.not_modified, service.computed) == (1, 2)
+
+
+def test_fits_beyond_max_pending_get_503(service, monkeypatch):
+    started, release = threading.Event(), threading.Event()
+
+    def slow_fit(df, ticker, period, **kwargs):
+        started.set()
+        release.wait(5)
+        return pd.DataFrame({'ds': [], 'yhat': [], 'yhat_lower': [], 'yhat_upper': []})
+
+    monkeypatch.setattr(api, 'predict_stock_price', slow_fit)
+    first = threading.Thread(target=service.handle, args=('/forecast/AAPL?period=1y',), daemon=True)
+    first.start()
+    assert started.wait(5)
+    try:
+        status, headers, body = service.handle('/forecast/AAPL?period=2y')
+    finally:
+        release.set()
+        first.join(5)
+    assert status == 503
+    assert headers['Retry-After'] == '5'
+    assert 'error' in json.loads(body)
+
+
+@pytest.mark.parametrize('path, status', [
+    ('/indicators/MISSING', 404),
+    ('/nowhere/AAPL', 404),
+    ('/indicators', 404),
+    ('/indicators/AAPL/extra', 404),
+    ('/indicators/AAPL?period=3w', 400),
+    ('/linear/AAPL?days=0', 400),
+    ('/linear/AAPL?days=soon', 400),
+    ('/valuation', 400),
+])
+def test_bad_requests(service, path, status):
+    got, _, body = service.handle(path)
+    assert got == status
+    assert 'error' in json.loads(body)
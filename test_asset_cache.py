@@ -0,0 +1,74 @@
+import os
+
+from PIL import Image
+
+from asset_cache import AssetCache
+
+
+def write_png(path, size=(10, 10), color='red'):
+    Image.new('RGBA', size, color).save(path)
+    return str(path)
+
+
+def test_rewritten_file_is_decoded_again(tmp_path):
+    path = write_png(tmp_path / 'frame.png', color='red')
+    cache = AssetCache()
+    assert cache.image(path).getpixel((0, 0)) == (255, 0, 0, 255)
+
+    write_png(path, color='blue')
+    # Force a different mtime even on file systems with coarse timestamps
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    assert cache.image(path).getpixel((0, 0)) == (0, 0, 255, 255)
+    assert cache.stats()['misses'] == 2
+
+
+def test_eviction_stays_within_budget_in_lru_order(tmp_path):
+    # Each 10x10 RGBA image is 400 bytes, so three fit in the budget
+    paths = [write_png(tmp_path / f'{i}.png') for i in range(4)]
+    cache = AssetCache(max_bytes=1200)
+    for path in paths[:3]:
+        cache.image(path)
+    cache.image(paths[0])  # now the most recently used
+    cache.image(paths[3])  # evicts paths[1], the least recently used
+
+    assert cache.stats()['bytes'] <= 1200
+    assert cache.stats()['entries'] == 3
+    misses = cache.stats()['misses']
+    cache.image(paths[0])
+    cache.image(paths[2])
+    assert cache.stats()['misses'] == misses
+    cache.image(paths[1])
+    assert cache.stats()['misses'] == misses + 1
+
+
+def test_asset_over_budget_is_not_stored(tmp_path):
+    path = write_png(tmp_path / 'big.png', size=(20, 20))
+    cache = AssetCache(max_bytes=1000)
+    first = cache.image(path)
+    second = cache.image(path)
+
+    assert first.size == second.size == (20, 20)
+    assert cache.stats()['entries'] == 0
+    assert cache.stats()['bytes'] == 0
+    assert cache.stats()['misses'] == 2
+
+
+def test_resized_variant_reuses_the_full_size_decode(tmp_path, monkeypatch):
+    path = write_png(tmp_path / 'logo.png', size=(40, 20))
+    opened = []
+    real_open = Image.open
+    monkeypatch.setattr(Image, 'open', lambda *args, **kwargs: opened.append(args[0]) or real_open(*args, **kwargs))
+    cache = AssetCache()
+    cache.image(path)
+    assert (cache.stats()['hits'], cache.stats()['misses']) == (0, 1)
+
+    small = cache.image(path, size=(20, 10))
+    # The resized key misses, but its source is the cached full-size decode
+    assert small.size == (20, 10)
+    assert (cache.stats()['hits'], cache.stats()['misses']) == (1, 2)
+
+    cache.image(path, size=(20, 10))
+    assert (cache.stats()['hits'], cache.stats()['misses']) == (2, 2)
+    assert opened == [path]
@@ -0,0 +1,45 @@
+import sys
+
+import pandas as pd
+import pytest
+
+import backtest
+from bench import synthetic_ohlcv
+
+
+@pytest.fixture
+def tz_offset_csv(tmp_path):
+    # Spans DST changes, so the Date column mixes -05:00 and -04:00 like a yfinance export
+    path = tmp_path / 'AAPL.csv'
+    synthetic_ohlcv(300).to_csv(path)
+    return path
+
+
+def test_read_history_csv_parses_dst_offsets(tz_offset_csv):
+    df = backtest.read_history_csv(tz_offset_csv)
+    assert isinstance(df.index, pd.DatetimeIndex)
+    assert str(df.index.tz) == 'UTC'
+    assert df.index.is_monotonic_increasing
+
+
+def test_walk_forward_on_tz_offset_csv(tz_offset_csv):
+    df = backtest.read_history_csv(tz_offset_csv)
+    results = backtest.walk_forward(df, train_window=100, step=20, horizons=[1, 5], models=['linear'])
+    assert list(results['horizon']) == [1, 5]
+    assert (results['folds'] > 0).all()
+
+
+def test_main_with_tz_offset_csv(tz_offset_csv, tmp_path, monkeypatch, capsys):
+    out = tmp_path / 'results.json'
+    monkeypatch.setattr(sys, 'argv', ['backtest.py', '--csv', str(tz_offset_csv), '--train-window', '100',
+                                      '--step', '20', '--horizons', '1', '5', '--models', 'linear',
+                                      '--out', str(out)])
+    backtest.main()
+    assert len(pd.read_json(out)) == 2
+    assert 'linear' in capsys.readouterr().out
+
+
+def test_walk_forward_rejects_a_non_datetime_index():
+    df = synthetic_ohlcv(300).reset_index()
+    with pytest.raises(ValueError, match='DatetimeIndex'):
+        backtest.walk_forward(df, train_window=100, step=20, horizons=[1], models=['linear'])
@@ -0,0 +1,40 @@
+import io
+import zipfile
+
+from PIL import Image
+
+from batch_framing import output_names, run_batch
+
+
+def photo_bytes(fmt):
+    buffer = io.BytesIO()
+    Image.new('RGB', (64, 48), 'green').save(buffer, format=fmt)
+    return buffer.getvalue()
+
+
+def test_output_names_are_unique():
+    names = ['a/x.jpg', 'b/x.jpg', 'x.jpg', 'X.png', 'x-2.jpg']
+    assert output_names(names, '.png') == {
+        'a/x.jpg': 'a/x.png',
+        'b/x.jpg': 'b/x.png',
+        'x.jpg': 'x.png',
+        'X.png': 'X-2.png',
+        'x-2.jpg': 'x-2-2.png',
+    }
+
+
+def test_same_name_in_different_folders_keeps_both(tmp_path):
+    source = tmp_path / 'photos.zip'
+    with zipfile.ZipFile(source, 'w') as archive:
+        archive.writestr('a/x.jpg', photo_bytes('JPEG'))
+        archive.writestr('b/x.jpg', photo_bytes('JPEG'))
+        archive.writestr('x.png', photo_bytes('PNG'))
+        archive.writestr('x.jpg', photo_bytes('JPEG'))
+    catalog = {'x.jpg': ('P1', '10'), 'x.png': ('P2', '20')}
+    output = tmp_path / 'framed.zip'
+
+    report = run_batch(str(source), catalog, str(output), workers=1)
+
+    assert report['succeeded'] == 4
+    with zipfile.ZipFile(output) as archive:
+        assert sorted(archive.namelist()) == ['a/x.png', 'b/x.png', 'x-2.png', 'x.png']
@@ -0,0 +1,54 @@
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from endpoint_validator import Endpoint, Validator
+
+
+class OkHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), OkHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_local_endpoint_passes(server):
+    validator = Validator({'connect_timeout': 1.0, 'read_timeout': 1.0, 'retries': 0})
+    result = validator.check(Endpoint('http', '127.0.0.1', server.server_port, 'health'))
+    assert result['ok'] and result['status'] == 200
+    assert result['dns'] is not None
+
+
+def test_hung_resolver_is_bounded_by_the_connect_timeout(server, monkeypatch):
+    real_getaddrinfo = socket.getaddrinfo
+
+    def hung_getaddrinfo(*args, **kwargs):
+        time.sleep(5)
+        return real_getaddrinfo(*args, **kwargs)
+
+    monkeypatch.setattr(socket, 'getaddrinfo', hung_getaddrinfo)
+    validator = Validator({'connect_timeout': 0.2, 'read_timeout': 1.0, 'retries': 0})
+    started = time.perf_counter()
+    result = validator.check(Endpoint('http', '127.0.0.1', server.server_port, 'health'))
+
+    assert time.perf_counter() - started < 2
+    assert not result['ok']
+    assert result['error'] == 'dns'
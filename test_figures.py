@@ -0,0 +1,26 @@
+import pandas as pd
+
+from bench import synthetic_ohlcv
+from figures import build_forecast_figure
+
+
+def flat_forecast(df, periods, freq):
+    history = df.index.tz_localize(None)
+    ds = history.append(pd.date_range(history[-1], periods=periods + 1, freq=freq)[1:])
+    return pd.DataFrame({'ds': ds, 'yhat': 100.0, 'yhat_lower': 90.0, 'yhat_upper': 110.0})
+
+
+def test_forecast_title_follows_the_horizon():
+    df = synthetic_ohlcv(300)
+    title = build_forecast_figure('AAPL', df, flat_forecast(df, 21, 'B')).layout.title.text
+    end = df.index[-1].tz_localize(None) + pd.offsets.BDay(21)
+    assert title == f"AAPL Stock Price Prediction for the Next 21 Days (to {end:%b} {end.day}, {end.year})"
+
+    title = build_forecast_figure('AAPL', df, flat_forecast(df, 504, 'B')).layout.title.text
+    assert "Next 504 Days" in title
+
+
+def test_forecast_title_without_future_rows():
+    df = synthetic_ohlcv(300)
+    title = build_forecast_figure('AAPL', df, flat_forecast(df, 0, 'B')).layout.title.text
+    assert title == "AAPL Stock Price Prediction"
@@ -0,0 +1,55 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from indicators import IndicatorState, RollingMean
+from stock_analysis import calculate_technical_indicators
+
+
+def random_walk(n=600, seed=0):
+    rng = np.random.default_rng(seed)
+    return 100 * np.exp(np.cumsum(rng.normal(0, 0.02, n)))
+
+
+def flat_runs(n=600, seed=1):
+    # Long stretches of identical closes exercise the same-value shortcut in pandas
+    rng = np.random.default_rng(seed)
+    return np.repeat(np.round(rng.uniform(50, 150, n // 40), 2), 40)[:n]
+
+
+def nan_gaps(n=600, seed=2):
+    closes = random_walk(n, seed)
+    closes[[5, 6, 7, 100, 101, 300, 450, 451, 452, 453]] = np.nan
+    return closes
+
+
+def expected(closes):
+    df = pd.DataFrame({'Close': closes}, index=pd.date_range('2020-01-01', periods=len(closes), freq='B'))
+    return calculate_technical_indicators(df)[['MA20', 'MA50', 'RSI']].to_numpy()
+
+
+@pytest.mark.parametrize('closes', [random_walk(), flat_runs(), nan_gaps()], ids=['random_walk', 'flat_runs', 'nan_gaps'])
+def test_incremental_matches_pandas_exactly(closes):
+    np.testing.assert_array_equal(IndicatorState().update_many(closes), expected(closes))
+
+
+@pytest.mark.parametrize('closes', [random_walk(), flat_runs(), nan_gaps()], ids=['random_walk', 'flat_runs', 'nan_gaps'])
+def test_snapshot_round_trip_through_json(closes):
+    split = len(closes) // 2
+    state = IndicatorState()
+    head = state.update_many(closes[:split])
+
+    restored = IndicatorState.restore(json.loads(json.dumps(state.snapshot())))
+    tail = restored.update_many(closes[split:])
+
+    np.testing.assert_array_equal(np.vstack([head, tail]), expected(closes))
+
+
+def test_rolling_mean_matches_pandas_across_zero():
+    # Values straddling zero hit the negative-count clamping
+    values = np.random.default_rng(3).normal(0, 1e-3, 500)
+    rolling = RollingMean(20)
+    actual = [rolling.update(value) for value in values]
+    np.testing.assert_array_equal(actual, pd.Series(values).rolling(window=20).mean().to_numpy())
@@ -0,0 +1,72 @@
+import gc
+import os
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from rendering import PlotCache, plot_key, render_png
+
+RENDERS = 1000
+WARMUP = 50
+
+
+def draw_series(values):
+    def draw(fig):
+        ax = fig.add_subplot(111)
+        ax.plot(values)
+        ax.set_title("Close")
+    return draw
+
+
+def rss_bytes():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+def render_loop(cache, start, stop):
+    rng = np.random.default_rng(start)
+    for i in range(start, stop):
+        values = rng.normal(size=200).cumsum()
+        key = plot_key('series', [values], {'i': i})
+        cache.get_or_render(key, draw_series(values), figsize=(4, 3), dpi=50)
+
+
+def test_render_png_returns_png():
+    png = render_png(draw_series(np.arange(10.0)), figsize=(2, 2), dpi=50)
+    assert png.startswith(b'\x89PNG')
+
+
+def test_cache_hit_skips_rendering():
+    cache = PlotCache(max_entries=4)
+    values = np.arange(10.0)
+    key = plot_key('series', [values], {})
+    first = cache.get_or_render(key, draw_series(values), figsize=(2, 2), dpi=50)
+    second = cache.get_or_render(key, lambda fig: pytest.fail("rendered twice"), figsize=(2, 2), dpi=50)
+    assert first is second
+    assert cache.stats()['hits'] == 1
+
+
+def test_memory_flat_over_1000_renders():
+    # Every key is new, so each iteration renders and the bounded cache evicts.
+    # RSS is cheap to read on Linux and covers Agg's C buffers; elsewhere fall
+    # back to tracemalloc, which only sees Python allocations and is much slower
+    cache = PlotCache(max_entries=16, max_bytes=1024 * 1024)
+    use_rss = os.path.exists('/proc/self/statm')
+    measure = rss_bytes if use_rss else lambda: tracemalloc.get_traced_memory()[0]
+    if not use_rss:
+        tracemalloc.start()
+    try:
+        render_loop(cache, 0, WARMUP)
+        gc.collect()
+        before = measure()
+        render_loop(cache, WARMUP, RENDERS)
+        gc.collect()
+        after = measure()
+    finally:
+        if not use_rss:
+            tracemalloc.stop()
+
+    assert cache.stats()['entries'] <= 16
+    assert cache.stats()['bytes'] <= 1024 * 1024
+    assert after - before < (20 if use_rss else 2) * 1024 * 1024
@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+
+from screener import panel_from_series, screen
+
+
+def v_series(dates, bottom):
+    # Falls, then rises: MA20 drops below MA50 first, then crosses back above
+    n = len(dates)
+    values = np.r_[np.linspace(200, 100, bottom), np.linspace(100, 200, n - bottom)]
+    return pd.Series(values, index=dates)
+
+
+def golden_cross_bar(series):
+    spread = series.rolling(20).mean() - series.rolling(50).mean()
+    crossed = (spread.shift(1) < 0) & (spread > 0)
+    return int(np.flatnonzero(crossed.to_numpy())[-1])
+
+
+def test_golden_cross_found_for_ticker_missing_trailing_dates():
+    dates = pd.bdate_range('2024-01-01', periods=200)
+    full = v_series(dates, 120)
+    cross = golden_cross_bar(full)
+    # The short ticker's data ends two bars after its crossover, well before the union calendar ends
+    short = full.iloc[:cross + 3]
+    tickers, panel_dates, closes = panel_from_series({'LONG': full, 'SHORT': short})
+
+    result = screen(tickers, panel_dates, closes, cross='golden', lookback=5).set_index('Ticker')
+
+    assert 'SHORT' in result.index
+    assert result.loc['SHORT', 'Date'] == short.index[-1]
+    assert result.loc['SHORT', 'Close'] == short.iloc[-1]
+    assert 'LONG' not in result.index
+
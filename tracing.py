@@ -0,0 +1,260 @@
+"""Per-stage timing spans for the Streamlit apps, with a rolling JSON-lines metrics file.
+
+Usage:
+    python tracing.py                 # p50/p95 per stage from the metrics file
+    python tracing.py --prometheus    # the same summary in Prometheus text format
+
+A ``Trace`` collects the spans of one analysis run. ``activate(trace)`` makes
+it current for the calling thread; ``span(stage, **tags)`` then times a block
+and ``tag(**tags)`` annotates the innermost open span (e.g. ``cache_hit``).
+Without an active trace both are a thread-local lookup and nothing else, so
+library code can be instrumented unconditionally.
+"""
+import argparse
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import numpy as np
+
+# Rolling file of finished traces, one JSON object per line
+DEFAULT_PATH = os.environ.get("STOCK_METRICS_FILE", os.path.join("data", "metrics", "timings.jsonl"))
+
+# Once the file holds this many traces, the oldest half is dropped
+DEFAULT_MAX_LINES = 5000
+
+_local = threading.local()
+
+
+class Trace:
+    """Spans of one run; safe to add to from the background threads working on the same run"""
+
+    def __init__(self, name, **tags):
+        self.name = name
+        self.tags = tags
+        self.created = time.time()
+        self.started = time.perf_counter()
+        self.finished = None
+        self.spans = []
+        self._lock = threading.Lock()
+
+    def add(self, stage, started, seconds, depth, tags):
+        with self._lock:
+            self.spans.append({'stage': stage, 'start': started - self.started, 'seconds': seconds,
+                               'depth': depth, 'tags': tags})
+
+    @contextmanager
+    def span(self, stage, **tags):
+        """Make this trace current on the calling thread and time ``stage``"""
+        with activate(self), span(stage, **tags) as tags:
+            yield tags
+
+    def finish(self):
+        if self.finished is None:
+            self.finished = time.perf_counter()
+
+    def elapsed(self):
+        return (self.finished or time.perf_counter()) - self.started
+
+    def to_dict(self):
+        with self._lock:
+            spans = list(self.spans)
+        return {
+            'time': self.created,
+            'name': self.name,
+            'tags': self.tags,
+            'total': self.elapsed(),
+            'spans': spans,
+        }
+
+
+@contextmanager
+def activate(trace):
+    """Make ``trace`` the current trace of this thread for the duration of the block"""
+    previous = getattr(_local, 'trace', None), getattr(_local, 'stack', None)
+    _local.trace, _local.stack = trace, []
+    try:
+        yield trace
+    finally:
+        _local.trace, _local.stack = previous
+
+
+def current():
+    """Return this thread's active trace or None"""
+    return getattr(_local, 'trace', None)
+
+
+@contextmanager
+def span(stage, **tags):
+    """Time the block as ``stage`` of the active trace; yields the span's tag dict"""
+    trace = getattr(_local, 'trace', None)
+    if trace is None:
+        yield tags
+        return
+    stack = _local.stack
+    stack.append(tags)
+    started = time.perf_counter()
+    try:
+        yield tags
+    except BaseException as e:
+        tags['error'] = type(e).__name__
+        raise
+    finally:
+        stack.pop()
+        trace.add(stage, started, time.perf_counter() - started, len(stack), tags)
+
+
+def tag(**tags):
+    """Add tags to the innermost open span of the active trace, if any"""
+    stack = getattr(_local, 'stack', None)
+    if stack:
+        stack[-1].update(tags)
+
+
+class MetricsLog:
+    """Append-only JSON-lines file of finished traces, trimmed to the newest ``max_lines``"""
+
+    def __init__(self, path=DEFAULT_PATH, max_lines=DEFAULT_MAX_LINES):
+        self.path = path
+        self.max_lines = max_lines
+        self._lines = None
+        self._lock = threading.Lock()
+
+    def append(self, trace):
+        """Finish ``trace`` and append it to the file"""
+        trace.finish()
+        line = json.dumps(trace.to_dict(), default=str)
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+            if self._lines is None:
+                self._lines = len(self._read_lines())
+            with open(self.path, 'a') as f:
+                f.write(line + '\n')
+            self._lines += 1
+            if self._lines > self.max_lines:
+                self._trim()
+
+    def records(self):
+        """Return every stored trace as a dict, skipping lines that fail to parse"""
+        records = []
+        for line in self._read_lines():
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue
+        return records
+
+    def summary(self):
+        """Return {stage: {'count', 'p50', 'p95'}} in seconds, including the 'total' of each run"""
+        durations = {}
+        for record in self.records():
+            durations.setdefault('total', []).append(record['total'])
+            for item in record['spans']:
+                durations.setdefault(item['stage'], []).append(item['seconds'])
+        return {
+            stage: {
+                'count': len(values),
+                'p50': float(np.percentile(values, 50)),
+                'p95': float(np.percentile(values, 95)),
+            }
+            for stage, values in durations.items()
+        }
+
+    def prometheus(self):
+        """Render ``summary`` in the Prometheus text exposition format"""
+        lines = [
+            '# HELP stock_stage_seconds Duration of each analysis stage.',
+            '# TYPE stock_stage_seconds summary',
+        ]
+        for stage, stats in sorted(self.summary().items()):
+            lines.append(f'stock_stage_seconds{{stage="{stage}",quantile="0.5"}} {stats["p50"]:.6f}')
+            lines.append(f'stock_stage_seconds{{stage="{stage}",quantile="0.95"}} {stats["p95"]:.6f}')
+            lines.append(f'stock_stage_seconds_count{{stage="{stage}"}} {stats["count"]}')
+        return '\n'.join(lines) + '\n'
+
+    def _read_lines(self):
+        try:
+            with open(self.path) as f:
+                return [line for line in f.read().splitlines() if line]
+        except OSError:
+            return []
+
+    def _trim(self):
+        keep = self._read_lines()[-(self.max_lines // 2):]
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp, 'w') as f:
+            f.write(''.join(line + '\n' for line in keep))
+        os.replace(tmp, self.path)
+        self._lines = len(keep)
+
+
+def breakdown(trace):
+    """Rows of (stage, start, milliseconds, tags) in start order, nested stages indented"""
+    rows = []
+    for item in sorted(trace.to_dict()['spans'], key=lambda s: (s['start'], s['depth'])):
+        tags = ', '.join(f"{k}={v}" for k, v in item['tags'].items())
+        rows.append({
+            'Stage': '\u00a0\u00a0' * item['depth'] + item['stage'],
+            'Start ms': round(item['start'] * 1000, 1),
+            'ms': round(item['seconds'] * 1000, 1),
+            'Tags': tags,
+        })
+    return rows
+
+
+_default_log = None
+
+
+def get_default_log():
+    """Return the process-wide metrics log"""
+    global _default_log
+    if _default_log is None:
+        _default_log = MetricsLog()
+    return _default_log
+
+
+def finish(trace, state):
+    """Append a finished run to the metrics file and keep it as the session's latest trace"""
+    get_default_log().append(trace)
+    state['last_trace'] = trace
+
+
+def timing_panel():
+    """Streamlit sidebar breakdown of the latest run and p50/p95 per stage; nothing is computed while hidden"""
+    import streamlit as st
+
+    if not st.sidebar.checkbox("Show timing breakdown"):
+        return
+    with st.sidebar.expander("Timing breakdown", expanded=True):
+        trace = st.session_state.get('last_trace')
+        if trace is None:
+            st.caption("Run an analysis to see its stages.")
+        else:
+            st.write(f"Latest run: {trace.tags.get('ticker')} in {trace.elapsed():.2f}s")
+            st.dataframe(breakdown(trace), hide_index=True)
+        summary = get_default_log().summary()
+        if summary:
+            st.caption("p50 / p95 over the metrics file")
+            st.dataframe([{'Stage': stage, 'Runs': stats['count'], 'p50 ms': round(stats['p50'] * 1000, 1),
+                           'p95 ms': round(stats['p95'] * 1000, 1)} for stage, stats in summary.items()],
+                         hide_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize the stage timings in the metrics file")
+    parser.add_argument('--path', default=DEFAULT_PATH)
+    parser.add_argument('--prometheus', action='store_true', help="Print Prometheus text format")
+    args = parser.parse_args()
+
+    log = MetricsLog(args.path)
+    if args.prometheus:
+        print(log.prometheus(), end='')
+        return
+    for stage, stats in sorted(log.summary().items(), key=lambda item: -item[1]['p50']):
+        print(f"{stage:25s} n={stats['count']:6d}  p50={stats['p50'] * 1000:10.1f} ms  p95={stats['p95'] * 1000:10.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+import json
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+# Root directory for per-ticker Prophet parameters
+DEFAULT_ROOT = os.environ.get("STOCK_WARM_START_DIR", os.path.join("data", "warm_start"))
+
+# How far (in days) any changepoint may drift before a warm start is refused
+DEFAULT_MAX_SHIFT_DAYS = 7
+
+# Prophet's defaults for the automatic changepoint grid
+N_CHANGEPOINTS = 25
+CHANGEPOINT_RANGE = 0.8
+
+
+def changepoint_grid(ds, n_changepoints=N_CHANGEPOINTS, changepoint_range=CHANGEPOINT_RANGE):
+    """Return the changepoint dates Prophet will place on ``ds`` (mirrors Prophet.set_changepoints)"""
+    ds = pd.Series(pd.to_datetime(ds)).sort_values().reset_index(drop=True)
+    hist_size = int(np.floor(len(ds) * changepoint_range))
+    n_changepoints = min(n_changepoints, hist_size - 1)
+    if n_changepoints <= 0:
+        return pd.Series(pd.to_datetime([]), name='ds')
+    cp_indexes = np.linspace(0, hist_size - 1, n_changepoints + 1).round().astype(int)
+    return ds.iloc[cp_indexes].tail(-1).reset_index(drop=True)
+
+
+def seasonality_signature(ds, settings):
+    """Describe which seasonal terms Prophet will include, so the beta vector length is comparable"""
+    ds = pd.to_datetime(ds)
+    return {
+        'daily': bool(settings.get('daily_seasonality')),
+        'weekly': bool(settings.get('weekly_seasonality')),
+        # Prophet turns yearly seasonality on automatically with two years of history
+        'yearly': bool(ds.max() - ds.min() >= pd.Timedelta(days=730)),
+    }
+
+
+def warm_start_params(model):
+    """Extract the fitted parameters of a Prophet model in the form ``fit(init=...)`` expects"""
+    params = {}
+    for name in ['k', 'm', 'sigma_obs']:
+        params[name] = float(model.params[name][0][0])
+    for name in ['delta', 'beta']:
+        params[name] = [float(v) for v in model.params[name][0]]
+    return params
+
+
+class WarmStartStore:
+    """Per-ticker store of the last Prophet fit, used to initialise the next one.
+
+    A stored fit is only reused when the new history produces a changepoint grid
+    of the same size whose points each moved by at most ``max_shift_days`` and the
+    same set of seasonal terms; otherwise ``init_for`` returns None and the
+    caller does a cold fit.
+    """
+
+    def __init__(self, root=DEFAULT_ROOT, max_shift_days=DEFAULT_MAX_SHIFT_DAYS):
+        self.root = root
+        self.max_shift_days = max_shift_days
+        self.warm_fits = 0
+        self.cold_fits = 0
+        self._lock = threading.Lock()
+
+    def init_for(self, ticker, ds, settings):
+        """Return Prophet init values for ``ticker`` if the previous fit is still compatible"""
+        state = self._load(ticker)
+        if state is None or state['signature'] != seasonality_signature(ds, settings):
+            return None
+
+        grid = changepoint_grid(ds)
+        previous = pd.to_datetime(pd.Series(state['changepoints']))
+        if len(grid) != len(previous) or len(grid) != len(state['params']['delta']):
+            return None
+        if len(grid) and (grid - previous).abs().max() > pd.Timedelta(days=self.max_shift_days):
+            return None
+
+        params = dict(state['params'])
+        params['delta'] = np.array(params['delta'])
+        params['beta'] = np.array(params['beta'])
+        return params
+
+    def save(self, ticker, model, ds, settings, fit_seconds, warm):
+        """Record the parameters of a freshly fitted model for ``ticker``"""
+        state = {
+            'params': warm_start_params(model),
+            'changepoints': [ts.isoformat() for ts in changepoint_grid(ds)],
+            'signature': seasonality_signature(ds, settings),
+            'fit_seconds': fit_seconds,
+            'warm': warm,
+        }
+        with self._lock:
+            if warm:
+                self.warm_fits += 1
+            else:
+                self.cold_fits += 1
+            os.makedirs(self.root, exist_ok=True)
+            path = self._path(ticker)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, 'w') as f:
+                json.dump(state, f)
+            os.replace(tmp, path)
+
+    def last_fit(self, ticker):
+        """Return the stored state for ``ticker`` (params, grid, timing) or None"""
+        return self._load(ticker)
+
+    def _path(self, ticker):
+        return os.path.join(self.root, f"{ticker.upper()}.json")
+
+    def _load(self, ticker):
+        if not ticker:
+            return None
+        try:
+            with open(self._path(ticker)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+
+_default_store = None
+
+
+def get_default_store():
+    """Return the process-wide warm-start store"""
+    global _default_store
+    if _default_store is None:
+        _default_store = WarmStartStore()
+    return _default_store